@@ -0,0 +1,400 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from cache_resultados import huella_datos
+from formato_resultados import ARCHIVO_RESULTADOS, cargar_resultados_archivo
+from bloqueo_archivos import bloqueo_archivo
+
+ESCENARIO_PREDETERMINADO = "predeterminado"
+
+# Partes de los resultados que se guardan por separado para poder leerlas sin cargar el resto
+PARTES_RESULTADOS = ("familias", "flujos", "rutas")
+
+PATRON_ESCENARIO = re.compile(r"^[\w.\- ]{1,100}$")
+
+def validar_escenario(escenario):
+    escenario = escenario or ESCENARIO_PREDETERMINADO
+    if not PATRON_ESCENARIO.match(escenario):
+        raise ValueError("Identificador de escenario no válido: use hasta 100 letras, números, espacios, '.', '-' o '_'")
+    return escenario
+
+def _empaquetar(valor):
+    return zlib.compress(json.dumps(valor, separators=(',', ':')).encode('utf-8'), 6)
+
+def _desempaquetar(contenido):
+    return json.loads(zlib.decompress(contenido).decode('utf-8'))
+
+def _dividir_resultados(resultados):
+    # Cabecera (estado, objetivo, resumen, etc.) y partes grandes por separado
+    cabecera = {clave: valor for clave, valor in resultados.items()
+                if clave not in PARTES_RESULTADOS and clave != 'registro'}
+    partes = {parte: resultados.get(parte) for parte in PARTES_RESULTADOS}
+    return cabecera, partes
+
+class AlmacenSQLite:
+    def __init__(self, ruta='escenarios.db', max_versiones=20):
+        # Datos y resultados como registros versionados por escenario; solo se conservan las
+        # últimas max_versiones de cada escenario
+        self.ruta = ruta
+        self.max_versiones = max_versiones
+        self._local = threading.local()
+        self._conexion().executescript("""
+                CREATE TABLE IF NOT EXISTS datos (
+                    escenario TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    huella TEXT NOT NULL,
+                    creado REAL NOT NULL,
+                    contenido BLOB NOT NULL,
+                    PRIMARY KEY (escenario, version)
+                );
+                CREATE INDEX IF NOT EXISTS datos_huella ON datos (huella);
+                CREATE TABLE IF NOT EXISTS resultados (
+                    escenario TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    huella_datos TEXT,
+                    version_datos INTEGER,
+                    creado REAL NOT NULL,
+                    status TEXT,
+                    valor_objetivo REAL,
+                    cabecera BLOB NOT NULL,
+                    familias BLOB,
+                    flujos BLOB,
+                    rutas BLOB,
+                    PRIMARY KEY (escenario, version)
+                );
+                CREATE INDEX IF NOT EXISTS resultados_huella ON resultados (huella_datos);
+            """)
+
+    def _conexion(self):
+        # Una conexión por hilo; WAL permite leer mientras otro hilo escribe
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def _insertar(self, tabla, escenario, valores):
+        # Asignar la siguiente versión del escenario dentro de una transacción de escritura
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            version = conexion.execute(
+                f"SELECT COALESCE(MAX(version), 0) + 1 FROM {tabla} WHERE escenario = ?", (escenario,)
+            ).fetchone()[0]
+            valores = dict(valores, escenario=escenario, version=version)
+            conexion.execute(
+                f"INSERT INTO {tabla} ({', '.join(valores)}) VALUES ({', '.join('?' * len(valores))})",
+                tuple(valores.values())
+            )
+            conexion.execute(
+                f"DELETE FROM {tabla} WHERE escenario = ? AND version <= ?",
+                (escenario, version - self.max_versiones)
+            )
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+        return version
+
+    def guardar_datos(self, escenario, datos):
+        # Nueva versión de los datos, salvo que coincidan con la última guardada
+        huella = huella_datos(datos)
+        ultima = self._conexion().execute(
+            "SELECT version, huella FROM datos WHERE escenario = ? ORDER BY version DESC LIMIT 1", (escenario,)
+        ).fetchone()
+        if ultima and ultima[1] == huella:
+            return ultima[0]
+        return self._insertar("datos", escenario, {
+            "huella": huella,
+            "creado": time.time(),
+            "contenido": _empaquetar(datos)
+        })
+
+    def obtener_datos(self, escenario, version=None):
+        consulta = "SELECT contenido FROM datos WHERE escenario = ?"
+        parametros = [escenario]
+        if version is not None:
+            consulta += " AND version = ?"
+            parametros.append(int(version))
+        fila = self._conexion().execute(consulta + " ORDER BY version DESC LIMIT 1", parametros).fetchone()
+        return _desempaquetar(fila[0]) if fila else None
+
+    def guardar_resultados(self, escenario, resultados, datos=None):
+        # Los resultados quedan enlazados con la versión de los datos del escenario que los produjo
+        huella = huella_datos(datos) if datos else None
+        version_datos = None
+        if huella:
+            fila = self._conexion().execute(
+                "SELECT MAX(version) FROM datos WHERE escenario = ? AND huella = ?", (escenario, huella)
+            ).fetchone()
+            version_datos = fila[0] if fila else None
+        cabecera, partes = _dividir_resultados(resultados)
+        return self._insertar("resultados", escenario, dict(
+            {
+                "huella_datos": huella,
+                "version_datos": version_datos,
+                "creado": time.time(),
+                "status": resultados.get('status'),
+                "valor_objetivo": resultados.get('valor_objetivo'),
+                "cabecera": _empaquetar(cabecera)
+            },
+            **{parte: _empaquetar(valor) for parte, valor in partes.items() if valor is not None}
+        ))
+
+    def obtener_resultados(self, escenario, version=None, partes=PARTES_RESULTADOS):
+        # Cabecera de los resultados más las partes pedidas (por ejemplo solo "familias" y "rutas")
+        partes = [parte for parte in PARTES_RESULTADOS if parte in partes]
+        columnas = ["version", "version_datos", "huella_datos", "creado", "cabecera"] + partes
+        consulta = f"SELECT {', '.join(columnas)} FROM resultados WHERE escenario = ?"
+        parametros = [escenario]
+        if version is not None:
+            consulta += " AND version = ?"
+            parametros.append(int(version))
+        fila = self._conexion().execute(consulta + " ORDER BY version DESC LIMIT 1", parametros).fetchone()
+        if fila is None:
+            return None
+        resultados = _desempaquetar(fila[4])
+        for parte, contenido in zip(partes, fila[5:]):
+            if contenido is not None:
+                resultados[parte] = _desempaquetar(contenido)
+        resultados['registro'] = {
+            "escenario": escenario,
+            "version": fila[0],
+            "version_datos": fila[1],
+            "huella_datos": fila[2],
+            "creado": fila[3]
+        }
+        return resultados
+
+    def versiones(self, escenario):
+        # Última versión de datos y de resultados (None si no hay)
+        conexion = self._conexion()
+        datos = conexion.execute("SELECT MAX(version) FROM datos WHERE escenario = ?", (escenario,)).fetchone()[0]
+        resultados = conexion.execute("SELECT MAX(version) FROM resultados WHERE escenario = ?", (escenario,)).fetchone()[0]
+        return datos, resultados
+
+    def historial(self, escenario):
+        conexion = self._conexion()
+        return {
+            "datos": [
+                {"version": version, "huella": huella, "creado": creado}
+                for version, huella, creado in conexion.execute(
+                    "SELECT version, huella, creado FROM datos WHERE escenario = ? ORDER BY version", (escenario,))
+            ],
+            "resultados": [
+                {"version": version, "version_datos": version_datos, "huella_datos": huella,
+                 "creado": creado, "status": status, "valor_objetivo": valor}
+                for version, version_datos, huella, creado, status, valor in conexion.execute(
+                    "SELECT version, version_datos, huella_datos, creado, status, valor_objetivo "
+                    "FROM resultados WHERE escenario = ? ORDER BY version", (escenario,))
+            ]
+        }
+
+    def buscar_por_huella(self, huella):
+        # Escenarios y versiones cuyos datos tienen esta huella de contenido
+        return [
+            {"escenario": escenario, "version": version}
+            for escenario, version in self._conexion().execute(
+                "SELECT escenario, version FROM datos WHERE huella = ? ORDER BY creado", (huella,))
+        ]
+
+    def listar_escenarios(self):
+        filas = self._conexion().execute("""
+            SELECT escenario, MAX(version), MAX(creado) FROM datos GROUP BY escenario
+            UNION ALL
+            SELECT escenario, NULL, MAX(creado) FROM resultados GROUP BY escenario
+        """).fetchall()
+        escenarios = {}
+        for escenario, version_datos, creado in filas:
+            registro = escenarios.setdefault(escenario, {"escenario": escenario, "version_datos": None, "actualizado": 0})
+            if version_datos is not None:
+                registro["version_datos"] = version_datos
+            registro["actualizado"] = max(registro["actualizado"], creado)
+        for escenario, registro in escenarios.items():
+            registro["version_resultados"] = self.versiones(escenario)[1]
+        return sorted(escenarios.values(), key=lambda registro: -registro["actualizado"])
+
+    def eliminar(self, escenario):
+        conexion = self._conexion()
+        borrados = conexion.execute("DELETE FROM datos WHERE escenario = ?", (escenario,)).rowcount
+        borrados += conexion.execute("DELETE FROM resultados WHERE escenario = ?", (escenario,)).rowcount
+        return borrados > 0
+
+class AlmacenMongo:
+    def __init__(self, base_datos, max_versiones=20):
+        # base_datos: base de pymongo (o un sustituto compatible); mismas operaciones que AlmacenSQLite
+        from pymongo import ASCENDING, DESCENDING
+        from pymongo.errors import DuplicateKeyError
+        self._descendente = DESCENDING
+        self._duplicado = DuplicateKeyError
+        self.max_versiones = max_versiones
+        self.datos = base_datos['datos']
+        self.resultados = base_datos['resultados']
+        for coleccion, huella in ((self.datos, 'huella'), (self.resultados, 'huella_datos')):
+            coleccion.create_index([('escenario', ASCENDING), ('version', DESCENDING)], unique=True)
+            coleccion.create_index([(huella, ASCENDING)])
+
+    def _ultimo(self, coleccion, escenario, version=None, proyeccion=None):
+        filtro = {'escenario': escenario}
+        if version is not None:
+            filtro['version'] = int(version)
+        return coleccion.find_one(filtro, proyeccion, sort=[('version', self._descendente)])
+
+    def _insertar(self, coleccion, escenario, documento):
+        # El índice único sobre (escenario, version) resuelve las escrituras simultáneas: si otra
+        # escritura tomó la versión, se reintenta con la siguiente
+        while True:
+            ultimo = self._ultimo(coleccion, escenario, proyeccion={'version': 1})
+            version = (ultimo['version'] if ultimo else 0) + 1
+            try:
+                coleccion.insert_one(dict(documento, escenario=escenario, version=version))
+            except self._duplicado:
+                continue
+            coleccion.delete_many({'escenario': escenario, 'version': {'$lte': version - self.max_versiones}})
+            return version
+
+    def guardar_datos(self, escenario, datos):
+        huella = huella_datos(datos)
+        ultimo = self._ultimo(self.datos, escenario, proyeccion={'version': 1, 'huella': 1})
+        if ultimo and ultimo['huella'] == huella:
+            return ultimo['version']
+        return self._insertar(self.datos, escenario, {
+            'huella': huella,
+            'creado': time.time(),
+            'contenido': _empaquetar(datos)
+        })
+
+    def obtener_datos(self, escenario, version=None):
+        documento = self._ultimo(self.datos, escenario, version, {'contenido': 1})
+        return _desempaquetar(documento['contenido']) if documento else None
+
+    def guardar_resultados(self, escenario, resultados, datos=None):
+        huella = huella_datos(datos) if datos else None
+        version_datos = None
+        if huella:
+            documento = self.datos.find_one({'escenario': escenario, 'huella': huella}, {'version': 1},
+                                            sort=[('version', self._descendente)])
+            version_datos = documento['version'] if documento else None
+        cabecera, partes = _dividir_resultados(resultados)
+        documento = {
+            'huella_datos': huella,
+            'version_datos': version_datos,
+            'creado': time.time(),
+            'status': resultados.get('status'),
+            'valor_objetivo': resultados.get('valor_objetivo'),
+            'cabecera': _empaquetar(cabecera)
+        }
+        documento.update({parte: _empaquetar(valor) for parte, valor in partes.items() if valor is not None})
+        return self._insertar(self.resultados, escenario, documento)
+
+    def obtener_resultados(self, escenario, version=None, partes=PARTES_RESULTADOS):
+        partes = [parte for parte in PARTES_RESULTADOS if parte in partes]
+        proyeccion = {campo: 1 for campo in ['version', 'version_datos', 'huella_datos', 'creado', 'cabecera'] + partes}
+        documento = self._ultimo(self.resultados, escenario, version, proyeccion)
+        if documento is None:
+            return None
+        resultados = _desempaquetar(documento['cabecera'])
+        for parte in partes:
+            if documento.get(parte) is not None:
+                resultados[parte] = _desempaquetar(documento[parte])
+        resultados['registro'] = {
+            "escenario": escenario,
+            "version": documento['version'],
+            "version_datos": documento.get('version_datos'),
+            "huella_datos": documento.get('huella_datos'),
+            "creado": documento['creado']
+        }
+        return resultados
+
+    def versiones(self, escenario):
+        datos = self._ultimo(self.datos, escenario, proyeccion={'version': 1})
+        resultados = self._ultimo(self.resultados, escenario, proyeccion={'version': 1})
+        return (datos['version'] if datos else None), (resultados['version'] if resultados else None)
+
+    def historial(self, escenario):
+        return {
+            "datos": [
+                {"version": d['version'], "huella": d['huella'], "creado": d['creado']}
+                for d in self.datos.find({'escenario': escenario}, {'version': 1, 'huella': 1, 'creado': 1}).sort('version', 1)
+            ],
+            "resultados": [
+                {"version": r['version'], "version_datos": r.get('version_datos'), "huella_datos": r.get('huella_datos'),
+                 "creado": r['creado'], "status": r.get('status'), "valor_objetivo": r.get('valor_objetivo')}
+                for r in self.resultados.find(
+                    {'escenario': escenario},
+                    {'version': 1, 'version_datos': 1, 'huella_datos': 1, 'creado': 1, 'status': 1, 'valor_objetivo': 1}
+                ).sort('version', 1)
+            ]
+        }
+
+    def buscar_por_huella(self, huella):
+        return [
+            {"escenario": d['escenario'], "version": d['version']}
+            for d in self.datos.find({'huella': huella}, {'escenario': 1, 'version': 1}).sort('creado', 1)
+        ]
+
+    def listar_escenarios(self):
+        escenarios = {}
+        for coleccion in (self.datos, self.resultados):
+            for documento in coleccion.find({}, {'escenario': 1, 'creado': 1}):
+                registro = escenarios.setdefault(documento['escenario'], {"escenario": documento['escenario'], "actualizado": 0})
+                registro["actualizado"] = max(registro["actualizado"], documento['creado'])
+        for escenario, registro in escenarios.items():
+            registro["version_datos"], registro["version_resultados"] = self.versiones(escenario)
+        return sorted(escenarios.values(), key=lambda registro: -registro["actualizado"])
+
+    def eliminar(self, escenario):
+        borrados = self.datos.delete_many({'escenario': escenario}).deleted_count
+        borrados += self.resultados.delete_many({'escenario': escenario}).deleted_count
+        return borrados > 0
+
+def importar_archivos_anteriores(almacen, ruta_datos='datos_optimizacion.json', ruta_resultados=ARCHIVO_RESULTADOS):
+    # Pasar al escenario predeterminado los archivos JSON que usaban las versiones anteriores;
+    # con varios workers arrancando a la vez, solo uno los importa
+    if not any(os.path.exists(ruta) for ruta in (ruta_datos, ruta_resultados, f"{ruta_resultados}.gz")):
+        return
+    with bloqueo_archivo(f"{ruta_datos}.bloqueo"):
+        if almacen.versiones(ESCENARIO_PREDETERMINADO) != (None, None):
+            return
+        datos = None
+        if os.path.exists(ruta_datos):
+            with open(ruta_datos, 'r') as f:
+                datos = json.load(f)
+            almacen.guardar_datos(ESCENARIO_PREDETERMINADO, datos)
+        resultados = cargar_resultados_archivo(ruta_resultados)
+        if resultados is not None:
+            almacen.guardar_resultados(ESCENARIO_PREDETERMINADO, resultados, datos)
+
+_almacen = None
+_lock_almacen = threading.Lock()
+
+def crear_almacen(ruta=None):
+    # SQLite en ruta (por defecto ALMACEN_ESCENARIOS_RUTA) o MongoDB si se define
+    # ALMACEN_ESCENARIOS_MONGO con la URI del servidor
+    max_versiones = int(os.environ.get('ALMACEN_ESCENARIOS_MAX_VERSIONES', 20))
+    uri_mongo = os.environ.get('ALMACEN_ESCENARIOS_MONGO')
+    if uri_mongo:
+        from pymongo import MongoClient
+        cliente = MongoClient(uri_mongo)
+        almacen = AlmacenMongo(cliente.get_default_database('herramientacom'), max_versiones)
+    else:
+        almacen = AlmacenSQLite(ruta or os.environ.get('ALMACEN_ESCENARIOS_RUTA', 'escenarios.db'), max_versiones)
+    importar_archivos_anteriores(almacen)
+    return almacen
+
+def obtener_almacen():
+    # Almacén compartido por el proceso para el uso fuera del servidor (scripts y pruebas de
+    # rendimiento); cada aplicación de app.py crea el suyo
+    global _almacen
+    with _lock_almacen:
+        if _almacen is None:
+            _almacen = crear_almacen()
+        return _almacen
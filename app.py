@@ -1,28 +1,195 @@
 # Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
 # Licencia MIT - Ver archivo LICENSE para detalles
-from flask import Flask, request, jsonify, render_template
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, render_template, send_file, g
+import gzip
 import json
 import os
 import sys
+import time
 import webbrowser
-from threading import Timer
-from optimizacion import ejecutar_optimizacion  # Importa la función de optimización
+from collections import OrderedDict
+from threading import BoundedSemaphore, Lock, Timer
+from optimizacion import ejecutar_optimizacion, cargar_datos_escenario, guardar_resultados  # Importa la función de optimización
+from trabajos import GestorTrabajos
+from cache_resultados import crear_cache
+from sesion_modelo import SesionModelo
+from estocastico import generar_escenarios, resolver_escenarios, EstadisticasEscenarios
+from configuracion_solver import configuracion_desde_peticion
+from servicio_grafo import ServicioGrafo
+from formato_resultados import expandir_resultados, vista_flujos_por_familia, iterar_rutas, total_rutas
+from almacen_escenarios import crear_almacen, validar_escenario
+from metricas import registro, registrar_peticion
+from reportes import FORMATOS_REPORTE, crear_cache_reportes
 
-app = Flask(__name__)
+# Enfoques de modelado que se resuelven como un único MILP, y el determinista por descomposición
+ENFOQUES = ("determinista", "robusto", "dos_fases", "heuristico")
+
+# Configuración del servidor; cada clave puede cambiarse con la variable de entorno
+# HERRAMIENTA_<CLAVE> (por ejemplo HERRAMIENTA_PORT=8000 o HERRAMIENTA_DIRECTORIO_DATOS=/srv/datos)
+CONFIGURACION_PREDETERMINADA = {
+    "HOST": "127.0.0.1",
+    "PORT": 5000,
+    "DIRECTORIO_DATOS": ".",          # escenarios.db, cache_resultados/, cache_reportes/ y trabajos/
+    "MAX_TRABAJOS_OPTIMIZACION": int(os.environ.get('MAX_TRABAJOS_OPTIMIZACION', 2)),
+    "MAX_SESIONES_MODELO": int(os.environ.get('MAX_SESIONES_MODELO', 8)),
+    # Lotes estocásticos: escenarios por lote y lotes resolviéndose a la vez en cada worker
+    "MAX_ESCENARIOS_ESTOCASTICO": int(os.environ.get('MAX_ESCENARIOS_ESTOCASTICO', 1000)),
+    "MAX_LOTES_ESTOCASTICOS": int(os.environ.get('MAX_LOTES_ESTOCASTICOS', 1)),
+    # Rutas del almacén y de las cachés; sin valor, dentro del directorio de datos
+    "ALMACEN_ESCENARIOS_RUTA": os.environ.get('ALMACEN_ESCENARIOS_RUTA'),
+    "CACHE_RESULTADOS_DIR": os.environ.get('CACHE_RESULTADOS_DIR'),
+    "CACHE_REPORTES_DIR": os.environ.get('CACHE_REPORTES_DIR'),
+    "ABRIR_NAVEGADOR": True           # solo al ejecutar app.py directamente
+}
+
+class EstadoServidor:
+    def __init__(self, configuracion):
+        # Almacén de escenarios y cachés propios de la aplicación: dos aplicaciones con directorios
+        # de datos distintos no comparten nada
+        directorio = configuracion['DIRECTORIO_DATOS']
+        self.almacen = crear_almacen(configuracion['ALMACEN_ESCENARIOS_RUTA'] or os.path.join(directorio, 'escenarios.db'))
+        self.cache = crear_cache(configuracion['CACHE_RESULTADOS_DIR'] or os.path.join(directorio, 'cache_resultados'))
+        self.cache_reportes = crear_cache_reportes(configuracion['CACHE_REPORTES_DIR']
+                                                   or os.path.join(directorio, 'cache_reportes'))
+
+        # Resoluciones en segundo plano con un número acotado de procesos simultáneos; su estado
+        # se publica en el directorio de datos para los demás workers
+        self.gestor_trabajos = GestorTrabajos(
+            max_trabajos=int(configuracion['MAX_TRABAJOS_OPTIMIZACION']),
+            cache=self.cache,
+            directorio=os.path.join(directorio, 'trabajos'),
+            almacen=self.almacen
+        )
+
+        # Modelos persistentes (uno por escenario, los más recientes) para re-resolver rápidamente
+        # cuando solo cambian parámetros
+        self.max_sesiones_modelo = int(configuracion['MAX_SESIONES_MODELO'])
+        self.sesiones_modelo = OrderedDict()
+        self.lock_sesiones = Lock()
+
+        # Cada lote estocástico ocupa hasta un proceso por núcleo: se limita cuántos se resuelven
+        # a la vez para no saturar la máquina con peticiones concurrentes
+        self.max_escenarios_estocastico = int(configuracion['MAX_ESCENARIOS_ESTOCASTICO'])
+        self.max_lotes_estocasticos = int(configuracion['MAX_LOTES_ESTOCASTICOS'])
+        self.lotes_estocasticos = BoundedSemaphore(self.max_lotes_estocasticos)
+
+        # Grafo de cada escenario con posiciones precalculadas, reconstruido solo cuando cambia una versión
+        self.servicio_grafo = ServicioGrafo(self.almacen)
+
+    def sesion_escenario(self, escenario):
+        with self.lock_sesiones:
+            if escenario not in self.sesiones_modelo:
+                self.sesiones_modelo[escenario] = SesionModelo()
+                while len(self.sesiones_modelo) > self.max_sesiones_modelo:
+                    self.sesiones_modelo.popitem(last=False)
+            self.sesiones_modelo.move_to_end(escenario)
+            return self.sesiones_modelo[escenario]
+
+    def olvidar_sesion(self, escenario):
+        with self.lock_sesiones:
+            self.sesiones_modelo.pop(escenario, None)
+
+def estado_servidor():
+    return current_app.extensions['herramienta']
+
+def almacen():
+    return estado_servidor().almacen
+
+def cache():
+    return estado_servidor().cache
+
+def cache_reportes():
+    return estado_servidor().cache_reportes
+
+def gestor_trabajos():
+    return estado_servidor().gestor_trabajos
+
+def servicio_grafo():
+    return estado_servidor().servicio_grafo
+
+def sesion_escenario(escenario):
+    return estado_servidor().sesion_escenario(escenario)
+
+rutas = Blueprint('herramienta', __name__)
+
+def crear_app(configuracion=None):
+    # Fábrica de la aplicación: no abre el navegador ni arranca ningún servidor
+    app = Flask(__name__)
+    app.config.update(CONFIGURACION_PREDETERMINADA)
+    app.config.from_prefixed_env('HERRAMIENTA')
+    app.config.update(configuracion or {})
+
+    os.makedirs(app.config['DIRECTORIO_DATOS'], exist_ok=True)
+
+    app.extensions['herramienta'] = EstadoServidor(app.config)
+    app.register_blueprint(rutas)
+    return app
+
+@rutas.before_app_request
+def iniciar_medicion():
+    g.inicio_peticion = time.perf_counter()
+
+# Todas las rutas aceptan ?escenario=<id>; sin él se usa el escenario predeterminado
+@rutas.before_app_request
+def leer_escenario():
+    try:
+        g.escenario = validar_escenario(request.args.get('escenario'))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+
+# Latencia por ruta (la plantilla de la ruta, no la URL, para no multiplicar las series);
+# se registra antes que la compresión para que Flask la ejecute después e incluya su coste
+@rutas.after_app_request
+def medir_peticion(respuesta):
+    if 'inicio_peticion' in g:
+        ruta = request.url_rule.rule if request.url_rule else "desconocida"
+        registrar_peticion(ruta, request.method, respuesta.status_code, time.perf_counter() - g.inicio_peticion)
+    return respuesta
+
+# Respuestas JSON a partir de este tamaño se comprimen si el navegador acepta gzip
+TAMAÑO_MINIMO_GZIP = 1024
+
+@rutas.after_app_request
+def comprimir_respuesta(respuesta):
+    if (respuesta.mimetype != 'application/json' or respuesta.direct_passthrough or respuesta.is_streamed
+            or 'Content-Encoding' in respuesta.headers or 'gzip' not in request.accept_encodings):
+        return respuesta
+    contenido = respuesta.get_data()
+    if len(contenido) < TAMAÑO_MINIMO_GZIP:
+        return respuesta
+    respuesta.set_data(gzip.compress(contenido, compresslevel=5))
+    respuesta.headers['Content-Encoding'] = 'gzip'
+    respuesta.headers['Vary'] = 'Accept-Encoding'
+    return respuesta
+
+def perfil_solicitado():
+    # ?perfil=1 captura un perfil de cProfile de la resolución; sin el parámetro decide OPTIMIZACION_PERFIL
+    valor = request.args.get('perfil')
+    return None if valor is None else valor not in ('', '0', 'false')
+
+def vista_resultados(resultados):
+    # Con ?formato=compacto se devuelven las columnas tal cual; por defecto, la vista anidada
+    if resultados is None or request.args.get('formato') == 'compacto':
+        return resultados
+    return expandir_resultados(resultados)
 
 # Ruta para guardar los datos
-@app.route('/guardar_datos', methods=['POST'])
+@rutas.route('/guardar_datos', methods=['POST'])
 def guardar_datos():
     try:
         data = request.get_json()
         
-        # Guardar los datos en un archivo JSON
-        with open('datos_optimizacion.json', 'w') as f:
-            json.dump(data, f, indent=4)
+        # Guardar los datos como nueva versión del escenario
+        version = almacen().guardar_datos(g.escenario, data)
             
         return jsonify({
             "status": "success",
-            "message": "Datos guardados correctamente"
+            "message": "Datos guardados correctamente",
+            "escenario": g.escenario,
+            "version": version
         })
     except Exception as e:
         return jsonify({
@@ -31,19 +198,12 @@ def guardar_datos():
         }), 500
 
 # Ruta para cargar los datos guardados
-@app.route('/cargar_datos', methods=['GET'])
+@rutas.route('/cargar_datos', methods=['GET'])
 def cargar_datos():
     try:
-        if os.path.exists('datos_optimizacion.json'):
-            with open('datos_optimizacion.json', 'r') as f:
-                data = json.load(f)
-            return jsonify({
-                "status": "success",
-                "data": data
-            })
         return jsonify({
             "status": "success",
-            "data": None
+            "data": almacen().obtener_datos(g.escenario, request.args.get('version'))
         })
     except Exception as e:
         return jsonify({
@@ -51,14 +211,29 @@ def cargar_datos():
             "message": str(e)
         }), 500
 # Nueva ruta para ejecutar la optimización
-@app.route('/ejecutar_optimizacion', methods=['GET'])
+@rutas.route('/ejecutar_optimizacion', methods=['GET'])
 def ejecutar_optimizacion_route():
     try:
-        resultados = ejecutar_optimizacion()
+        enfoque = request.args.get('enfoque', 'determinista')
+        if enfoque not in ENFOQUES:
+            return jsonify({
+                "status": "error",
+                "message": f"Enfoque no soportado: {enfoque}"
+            }), 400
+        # Solver, hilos, límite de tiempo, gap y presolve opcionales en la petición
+        try:
+            configuracion = configuracion_desde_peticion(request.args)
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        resultados = ejecutar_optimizacion(enfoque=enfoque, configuracion=configuracion, escenario=g.escenario,
+                                           perfilar=perfil_solicitado(), almacen=almacen(), cache=cache())
         if resultados:
             return jsonify({
                 "status": "success",
-                "resultados": resultados
+                "resultados": vista_resultados(resultados)
             })
         return jsonify({
             "status": "error",
@@ -70,70 +245,423 @@ def ejecutar_optimizacion_route():
             "message": str(e)
         }), 500
 
+# Re-resolver sobre el modelo de la sesión actualizando solo los parámetros modificados
+@rutas.route('/reoptimizar', methods=['POST'])
+def reoptimizar():
+    try:
+        datos = request.get_json(silent=True) or cargar_datos_escenario(g.escenario, almacen())
+        if not datos:
+            return jsonify({
+                "status": "error",
+                "message": "No se encontraron datos de entrada. Por favor, ingrese los datos primero."
+            }), 400
+        try:
+            configuracion = configuracion_desde_peticion(request.args)
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        resultados = sesion_escenario(g.escenario).resolver(datos, configuracion)
+        guardar_resultados(resultados, g.escenario, datos, almacen())
+        return jsonify({
+            "status": "success",
+            "resultados": vista_resultados(resultados)
+        })
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+# Resolver un lote de escenarios de demanda y capacidad (enfoque estocástico); la respuesta
+# se envía línea a línea (JSON por línea) a medida que termina cada escenario y acaba con el resumen
+@rutas.route('/ejecutar_estocastico', methods=['POST'])
+def ejecutar_estocastico():
+    try:
+        parametros = request.get_json(silent=True) or {}
+        datos = parametros.get('datos') or cargar_datos_escenario(g.escenario, almacen())
+        if not datos:
+            return jsonify({
+                "status": "error",
+                "message": "No se encontraron datos de entrada. Por favor, ingrese los datos primero."
+            }), 400
+        
+        estado = estado_servidor()
+        escenarios = parametros.get('escenarios')
+        if escenarios:
+            if not isinstance(escenarios, list):
+                raise ValueError("escenarios debe ser una lista")
+            if len(escenarios) > estado.max_escenarios_estocastico:
+                raise ValueError(f"Como máximo {estado.max_escenarios_estocastico} escenarios por lote")
+        else:
+            num_escenarios = int(parametros.get('num_escenarios', 100))
+            if not 1 <= num_escenarios <= estado.max_escenarios_estocastico:
+                raise ValueError(f"num_escenarios debe estar entre 1 y {estado.max_escenarios_estocastico}")
+            escenarios = generar_escenarios(
+                datos,
+                num_escenarios,
+                variacion_valor=float(parametros.get('variacion_valor', 0.2)),
+                variacion_pi=float(parametros.get('variacion_pi', 0.2)),
+                semilla=int(parametros.get('semilla', 0))
+            )
+        max_procesos = os.cpu_count() or 1
+        if parametros.get('max_procesos') is not None:
+            pedidos = int(parametros['max_procesos'])
+            if pedidos < 1:
+                raise ValueError("max_procesos debe ser al menos 1")
+            max_procesos = min(pedidos, max_procesos)
+        configuracion = configuracion_desde_peticion(parametros)
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+    lotes = estado.lotes_estocasticos
+    if not lotes.acquire(blocking=False):
+        return jsonify({
+            "status": "error",
+            "message": f"Ya hay {estado.max_lotes_estocasticos} lote(s) estocástico(s) en ejecución. Inténtelo más tarde."
+        }), 429
+    
+    def generar_respuesta():
+        estadisticas = EstadisticasEscenarios()
+        try:
+            for resultado in resolver_escenarios(datos, escenarios, max_procesos=max_procesos,
+                                                 configuracion=configuracion):
+                estadisticas.agregar(resultado)
+                yield json.dumps(dict(resultado, tipo="escenario")) + "\n"
+            yield json.dumps({"tipo": "resumen", "status": "success", "resumen": estadisticas.resumen()}) + "\n"
+        except Exception as e:
+            yield json.dumps({"tipo": "resumen", "status": "error", "message": str(e)}) + "\n"
+    
+    # El lote se libera al cerrarse la respuesta, aunque el cliente se desconecte antes de leerla
+    respuesta = Response(generar_respuesta(), mimetype='application/x-ndjson')
+    respuesta.call_on_close(lotes.release)
+    return respuesta
+
+# Encolar una optimización en segundo plano y devolver el identificador del trabajo
+@rutas.route('/trabajos_optimizacion', methods=['POST'])
+def crear_trabajo_optimizacion():
+    try:
+        datos = request.get_json(silent=True) or cargar_datos_escenario(g.escenario, almacen())
+        if not datos:
+            return jsonify({
+                "status": "error",
+                "message": "No se encontraron datos de entrada. Por favor, ingrese los datos primero."
+            }), 400
+        enfoque = request.args.get('enfoque', 'determinista')
+        if enfoque not in ENFOQUES:
+            return jsonify({
+                "status": "error",
+                "message": f"Enfoque no soportado: {enfoque}"
+            }), 400
+        try:
+            configuracion = configuracion_desde_peticion(request.args)
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        id_trabajo = gestor_trabajos().enviar(datos, enfoque=enfoque, configuracion=configuracion, escenario=g.escenario,
+                                              perfilar=perfil_solicitado())
+        return jsonify({
+            "status": "success",
+            "id_trabajo": id_trabajo
+        }), 202
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+# Consultar la fase, el tiempo transcurrido y el progreso del solver de un trabajo
+@rutas.route('/trabajos_optimizacion/<id_trabajo>', methods=['GET'])
+def estado_trabajo_optimizacion(id_trabajo):
+    estado = gestor_trabajos().estado(id_trabajo)
+    if estado is None:
+        return jsonify({
+            "status": "error",
+            "message": "Trabajo no encontrado"
+        }), 404
+    return jsonify({
+        "status": "success",
+        "trabajo": estado
+    })
+
+# Obtener los resultados de un trabajo terminado
+@rutas.route('/trabajos_optimizacion/<id_trabajo>/resultados', methods=['GET'])
+def resultados_trabajo_optimizacion(id_trabajo):
+    estado = gestor_trabajos().estado(id_trabajo)
+    if estado is None:
+        return jsonify({
+            "status": "error",
+            "message": "Trabajo no encontrado"
+        }), 404
+    if estado["fase"] != "completado":
+        return jsonify({
+            "status": "error",
+            "message": f"El trabajo está en la fase '{estado['fase']}'",
+            "trabajo": estado
+        }), 409
+    return jsonify({
+        "status": "success",
+        "resultados": vista_resultados(gestor_trabajos().resultados(id_trabajo))
+    })
+
+# Cancelar un trabajo en cola o en ejecución
+@rutas.route('/trabajos_optimizacion/<id_trabajo>', methods=['DELETE'])
+def cancelar_trabajo_optimizacion(id_trabajo):
+    if not gestor_trabajos().cancelar(id_trabajo):
+        return jsonify({
+            "status": "error",
+            "message": "El trabajo no existe o ya terminó"
+        }), 404
+    return jsonify({
+        "status": "success",
+        "message": "Trabajo cancelado"
+    })
+
 # Ruta para cargar los resultados de optimización
-@app.route('/cargar_resultados', methods=['GET'])
+@rutas.route('/cargar_resultados', methods=['GET'])
 def cargar_resultados():
     try:
-        if os.path.exists('resultados_optimizacion.json'):
-            with open('resultados_optimizacion.json', 'r') as f:
-                data = json.load(f)
-            return jsonify({
-                "status": "success",
-                "data": data
-            })
         return jsonify({
             "status": "success",
-            "data": None
+            "data": vista_resultados(almacen().obtener_resultados(g.escenario, request.args.get('version')))
         })
     except Exception as e:
         return jsonify({
             "status": "error",
             "message": str(e)
         }), 500 
+
+def _paginacion():
+    desde = max(0, int(request.args.get('desde', 0)))
+    limite = min(max(1, int(request.args.get('limite', 100))), 1000)
+    return desde, limite
+
+# Rutas de los últimos resultados por páginas (?desde=0&limite=100) para cargarlas de forma incremental
+@rutas.route('/resultados/rutas', methods=['GET'])
+def rutas_resultados():
+    try:
+        desde, limite = _paginacion()
+        # Lectura parcial: solo las columnas de familias y rutas
+        resultados = almacen().obtener_resultados(g.escenario, request.args.get('version'),
+                                                          partes=("familias", "rutas"))
+        if resultados is None:
+            return jsonify({
+                "status": "error",
+                "message": "No hay resultados guardados"
+            }), 404
+        return jsonify({
+            "status": "success",
+            "registro": resultados['registro'],
+            "total": total_rutas(resultados),
+            "desde": desde,
+            "limite": limite,
+            "rutas": list(iterar_rutas(resultados, desde, limite))
+        })
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+# Informe de los últimos resultados (o de ?version=) como archivo descargable: csv, xlsx o pdf.
+# Se genera en el servidor recorriendo las rutas fila a fila y se guarda por huella de los resultados
+@rutas.route('/exportar/<formato>', methods=['GET'])
+def exportar_resultados(formato):
+    try:
+        if formato not in FORMATOS_REPORTE:
+            raise ValueError(f"Formato de informe no soportado: {formato} (use {', '.join(FORMATOS_REPORTE)})")
+        resultados = almacen().obtener_resultados(g.escenario, request.args.get('version'),
+                                                partes=("familias", "rutas"))
+        if resultados is None:
+            return jsonify({
+                "status": "error",
+                "message": "No hay resultados guardados"
+            }), 404
+        registro_resultados = resultados['registro']
+
+        # El PDF incluye además los parámetros de entrada que produjeron los resultados
+        datos = None
+        if formato == "pdf" and registro_resultados.get('version_datos') is not None:
+            datos = almacen().obtener_datos(g.escenario, registro_resultados['version_datos'])
+
+        # El informe llega abierto: se envía completo aunque otro worker lo desaloje mientras tanto
+        archivo, huella = cache_reportes().obtener(resultados, formato, datos)
+        respuesta = send_file(
+            archivo,
+            mimetype=FORMATOS_REPORTE[formato],
+            as_attachment=True,
+            download_name=f"Reporte_Rutas_{g.escenario}_v{registro_resultados['version']}.{formato}",
+            etag=f"{huella}-{formato}",
+            max_age=0
+        )
+        if respuesta.status_code == 200:
+            respuesta.content_length = os.fstat(archivo.fileno()).st_size
+        return respuesta
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+# Flujos por familia de los últimos resultados por páginas de familias (?desde=0&limite=100&familia=id)
+@rutas.route('/resultados/flujos', methods=['GET'])
+def flujos_resultados():
+    try:
+        desde, limite = _paginacion()
+        resultados = almacen().obtener_resultados(g.escenario, request.args.get('version'),
+                                                          partes=("familias", "flujos"))
+        if resultados is None:
+            return jsonify({
+                "status": "error",
+                "message": "No hay resultados guardados"
+            }), 404
+        ids = resultados['familias']['id']
+        familias = request.args.getlist('familia') or ids[desde:desde + limite]
+        return jsonify({
+            "status": "success",
+            "registro": resultados['registro'],
+            "total": len(ids),
+            "desde": desde,
+            "limite": limite,
+            "flujos_por_familia": vista_flujos_por_familia(resultados, set(familias))
+        })
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
     
-@app.route('/obtener_datos_grafo', methods=['GET'])
-def obtener_datos_grafo():
+# Contadores de aciertos y fallos de la caché de resultados
+@rutas.route('/cache_resultados', methods=['GET'])
+def estadisticas_cache_resultados():
+    return jsonify({
+        "status": "success",
+        "cache": cache().estadisticas(),
+        "reportes": cache_reportes().estadisticas()
+    })
+
+# Vaciar la caché de resultados
+@rutas.route('/cache_resultados', methods=['DELETE'])
+def limpiar_cache_resultados():
+    cache().limpiar()
+    cache_reportes().limpiar()
+    return jsonify({
+        "status": "success",
+        "message": "Caché de resultados vaciada"
+    })
+
+# Métricas en formato de texto de Prometheus del worker que atiende la petición (etiqueta worker);
+# con varios workers hay que consultar cada uno y sumar las series en Prometheus
+@rutas.route('/metrics', methods=['GET'])
+def metricas_prometheus():
+    for medida, valor in cache().estadisticas().items():
+        registro.fijar("cache_resultados", valor, medida=medida)
+    for medida, valor in cache_reportes().estadisticas().items():
+        registro.fijar("cache_reportes", valor, medida=medida)
+    return Response(registro.exportar(), mimetype="text/plain; version=0.0.4")
+
+# Grafo con posiciones calculadas en el servidor y solo las aristas y rutas pedidas:
+# ?tipos=salida,transito&usados=1&destino=F1&caja=x0,y0,x1,y1&desde=0&limite=500&disposicion=capas
+@rutas.route('/grafo', methods=['GET'])
+def grafo():
     try:
-        if os.path.exists('datos_optimizacion.json'):
-            with open('datos_optimizacion.json', 'r') as f:
-                datos = json.load(f)
-            
-            # Estructura para el grafo estático
-            grafo_estatico = {
-                "nodos": {
-                    "salida": datos['etiquetasA'],
-                    "transito": datos['etiquetasR'],
-                    "llegada": datos['etiquetasF']
-                },
-                "conexiones": datos['distancias']
-            }
-            
-            # Estructura para el grafo dinámico (se completará con los resultados)
-            grafo_dinamico = {
-                "nodos": {
-                    "salida": datos['etiquetasA'],
-                    "transito": datos['etiquetasR'],
-                    "llegada": datos['etiquetasF']
-                },
-                "conexiones": datos['distancias'],
-                "rutas": []
-            }
-            
-            # Si hay resultados, añadimos las rutas al grafo dinámico
-            if os.path.exists('resultados_optimizacion.json'):
-                with open('resultados_optimizacion.json', 'r') as f:
-                    resultados = json.load(f)
-                    if 'reporte_rutas' in resultados:
-                        grafo_dinamico['rutas'] = resultados['reporte_rutas']
-            
+        desde, limite = _paginacion()
+        tipos = [tipo for tipo in request.args.get('tipos', '').split(',') if tipo]
+        caja = request.args.get('caja')
+        if caja:
+            caja = [float(valor) for valor in caja.split(',')]
+            if len(caja) != 4:
+                raise ValueError("caja debe tener la forma x0,y0,x1,y1")
+        consulta = servicio_grafo().consultar(
+            g.escenario,
+            tipos=tipos,
+            solo_usados=request.args.get('usados', '0') not in ('', '0', 'false'),
+            destino=request.args.get('destino') or None,
+            caja=caja,
+            desde=desde,
+            limite=limite,
+            disposicion=request.args.get('disposicion', 'capas')
+        )
+        if consulta is None:
             return jsonify({
-                "status": "success",
-                "grafo_estatico": grafo_estatico,
-                "grafo_dinamico": grafo_dinamico
-            })
+                "status": "error",
+                "message": "No se encontraron datos de entrada. Por favor, ingrese los datos primero."
+            }), 404
+        return jsonify(dict(consulta, status="success"))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+# Rutas de los últimos resultados para los grafos, por páginas; con ?agrupar=1 se reúnen
+# las familias que siguen el mismo recorrido: ?agrupar=1&destino=F1&desde=0&limite=100
+@rutas.route('/grafo/rutas', methods=['GET'])
+def rutas_grafo():
+    try:
+        desde, limite = _paginacion()
+        consulta = servicio_grafo().consultar_rutas(
+            g.escenario,
+            destino=request.args.get('destino') or None,
+            agrupar=request.args.get('agrupar', '0') not in ('', '0', 'false'),
+            desde=desde,
+            limite=limite
+        )
+        if consulta is None:
+            return jsonify({
+                "status": "error",
+                "message": "No se encontraron datos de entrada. Por favor, ingrese los datos primero."
+            }), 404
+        return jsonify(dict(consulta, status="success"))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+# Escenarios guardados con su última versión de datos y de resultados
+@rutas.route('/escenarios', methods=['GET'])
+def listar_escenarios():
+    try:
         return jsonify({
             "status": "success",
-            "data": None
+            "escenarios": almacen().listar_escenarios()
         })
     except Exception as e:
         return jsonify({
@@ -141,13 +669,65 @@ def obtener_datos_grafo():
             "message": str(e)
         }), 500
 
-@app.route('/')
+# Versiones de datos y de resultados de un escenario
+@rutas.route('/escenarios/<escenario>', methods=['GET'])
+def historial_escenario(escenario):
+    try:
+        escenario = validar_escenario(escenario)
+        return jsonify({
+            "status": "success",
+            "escenario": escenario,
+            "historial": almacen().historial(escenario)
+        })
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+# Eliminar un escenario con todas sus versiones
+@rutas.route('/escenarios/<escenario>', methods=['DELETE'])
+def eliminar_escenario(escenario):
+    try:
+        escenario = validar_escenario(escenario)
+        if not almacen().eliminar(escenario):
+            return jsonify({
+                "status": "error",
+                "message": "Escenario no encontrado"
+            }), 404
+        estado_servidor().olvidar_sesion(escenario)
+        return jsonify({
+            "status": "success",
+            "message": "Escenario eliminado"
+        })
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@rutas.route('/')
 def index():
     return render_template('index.html')
 
-def open_browser():
-    webbrowser.open_new('http://127.0.0.1:5000/')
+def open_browser(url):
+    webbrowser.open_new(url)
 
 if __name__ == '__main__':
-    Timer(1, open_browser).start()  # Abre el navegador después de 1 segundo
-    app.run(debug=False)
+    # Servidor de desarrollo; para servir en producción, ver wsgi.py
+    app = crear_app()
+    host, port = app.config['HOST'], int(app.config['PORT'])
+    if app.config['ABRIR_NAVEGADOR']:
+        url = f"http://{'127.0.0.1' if host == '0.0.0.0' else host}:{port}/"
+        Timer(1, open_browser, args=(url,)).start()  # Abre el navegador después de 1 segundo
+    app.run(host=host, port=port, debug=False)
@@ -0,0 +1,31 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+# Uso: python -m benchmarks.benchmark_agregacion
+import time
+from pulp import PULP_CBC_CMD
+from optimizacion import ModeloOptimizacion
+from benchmarks.generador import generar_datos
+
+def medir(datos, agrupar):
+    inicio = time.perf_counter()
+    modelo = ModeloOptimizacion(datos, agrupar=agrupar)
+    resultados = modelo.resolver(PULP_CBC_CMD(msg=False))
+    return {
+        "variables": len(modelo.problema.variables()),
+        "restricciones": len(modelo.problema.constraints),
+        "tiempo": time.perf_counter() - inicio,
+        "objetivo": resultados['valor_objetivo']
+    }
+
+def main():
+    print(f"{'grupos':>7} {'modo':>10} {'variables':>10} {'restricciones':>14} {'tiempo (s)':>11} {'objetivo':>12}")
+    for grupos_por_origen in (10, 40, 160):
+        datos = generar_datos(num_A=6, num_R=6, num_F=4, grupos_por_origen=grupos_por_origen, semilla=1)
+        for agrupar in (False, True):
+            m = medir(datos, agrupar)
+            modo = "agrupado" if agrupar else "original"
+            print(f"{len(datos['idFamilias']):>7} {modo:>10} {m['variables']:>10} {m['restricciones']:>14} "
+                  f"{m['tiempo']:>11.2f} {m['objetivo']:>12.1f}")
+
+if __name__ == '__main__':
+    main()
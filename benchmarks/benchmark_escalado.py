@@ -0,0 +1,136 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+# Uso: python -m benchmarks.benchmark_escalado [--niveles pequeño mediano] [--repeticiones 3] [--salida archivo.json]
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+import pulp
+from optimizacion import ModeloOptimizacion, crear_modelo
+from configuracion_solver import ConfiguracionSolver, BACKENDS, EMISORES
+from benchmarks.generador import generar_datos
+
+# Niveles de tamaño: parámetros de generar_datos
+NIVELES = {
+    "pequeño": {"num_A": 5, "num_R": 5, "num_F": 3, "grupos_por_origen": 10},
+    "mediano": {"num_A": 10, "num_R": 10, "num_F": 5, "grupos_por_origen": 40},
+    "grande": {"num_A": 20, "num_R": 20, "num_F": 8, "grupos_por_origen": 100},
+    "muy_grande": {"num_A": 40, "num_R": 40, "num_F": 12, "grupos_por_origen": 200},
+}
+
+# Opciones de poda que reproducen el modelo sobre la red completa
+SIN_PODA = {"arcos_hacia_origen": False, "arcos_desde_llegada": False, "alcanzabilidad": False}
+
+def medir(datos, configuracion, agrupar=True, podar=True):
+    # Tiempos por fase de una resolución completa y tamaño del modelo
+    tiempos = {}
+
+    inicio = time.perf_counter()
+    modelo = crear_modelo(datos, configuracion=configuracion, agrupar=agrupar, poda=None if podar else SIN_PODA)
+    modelo.construir()
+    tiempos["construccion"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    informe_solver = modelo.resolver_problema(configuracion, inicio_mip=False)
+    tiempos["resolucion"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultados = modelo.extraer_resultados()
+    tiempos["extraccion"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    rutas = ModeloOptimizacion.generar_reporte_rutas(datos, resultados) if resultados["status"] == "Optimal" else {"familia": []}
+    tiempos["reporte"] = time.perf_counter() - inicio
+    tiempos["total"] = sum(tiempos.values())
+
+    return {
+        "tiempos": tiempos,
+        "modelo": dict(modelo.tamaño_modelo(),
+                       variables_X_sin_poda=modelo.estadisticas_poda["variables_X"]["sin_poda"]),
+        "status": resultados["status"],
+        "valor_objetivo": resultados["valor_objetivo"],
+        "rutas": len(rutas["familia"]),
+        "solver": informe_solver["estadisticas"]
+    }
+
+def _version_codigo():
+    # Commit del repositorio, si está disponible, para comparar ejecuciones
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def ejecutar(niveles, repeticiones=3, configuracion=None, agrupar=True, semilla=0, podar=True):
+    configuracion = configuracion or ConfiguracionSolver()
+    informe = {
+        "fecha": datetime.now().isoformat(timespec='seconds'),
+        "entorno": {
+            "python": platform.python_version(),
+            "pulp": pulp.__version__,
+            "plataforma": platform.platform(),
+            "procesadores": os.cpu_count(),
+            "commit": _version_codigo()
+        },
+        "solver": configuracion.a_dict(),
+        "agrupar": agrupar,
+        "podar": podar,
+        "niveles": []
+    }
+    for nombre in niveles:
+        parametros = NIVELES[nombre]
+        mediciones = []
+        for repeticion in range(repeticiones):
+            datos = generar_datos(semilla=semilla + repeticion, **parametros)
+            medicion = medir(datos, configuracion, agrupar, podar)
+            medicion["semilla"] = semilla + repeticion
+            mediciones.append(medicion)
+            print(f"{nombre:>11} #{repeticion + 1} {medicion['status']:>10} "
+                  + " ".join(f"{fase}={t:.3f}s" for fase, t in medicion["tiempos"].items()), file=sys.stderr)
+
+        # Mediana por fase: menos sensible que la media a una repetición lenta
+        medianas = {}
+        for fase in mediciones[0]["tiempos"]:
+            valores = sorted(m["tiempos"][fase] for m in mediciones)
+            medianas[fase] = valores[len(valores) // 2]
+        informe["niveles"].append({
+            "nivel": nombre,
+            "parametros": parametros,
+            "mediana_tiempos": medianas,
+            "mediciones": mediciones
+        })
+    return informe
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempos por fase de ModeloOptimizacion en varios tamaños de red")
+    parser.add_argument("--niveles", nargs="+", choices=list(NIVELES), default=["pequeño", "mediano", "grande"])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--solver", choices=BACKENDS, default="cbc")
+    parser.add_argument("--hilos", type=int)
+    parser.add_argument("--limite-tiempo", type=float)
+    parser.add_argument("--emisor", choices=EMISORES, default="pulp")
+    parser.add_argument("--sin-agrupar", action="store_true")
+    parser.add_argument("--sin-poda", action="store_true")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto benchmarks/resultados/escalado_<fecha>.json)")
+    args = parser.parse_args()
+
+    configuracion = ConfiguracionSolver(args.solver, hilos=args.hilos, limite_tiempo=args.limite_tiempo,
+                                        emisor=args.emisor)
+    informe = ejecutar(args.niveles, args.repeticiones, configuracion, not args.sin_agrupar, args.semilla,
+                       not args.sin_poda)
+
+    salida = args.salida or os.path.join(
+        "benchmarks", "resultados", f"escalado_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+    with open(salida, 'w') as f:
+        json.dump(informe, f, indent=4, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
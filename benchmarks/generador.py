@@ -0,0 +1,65 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import math
+import random
+
+def generar_datos(num_A=5, num_R=5, num_F=3, grupos_por_origen=20, tamaño_maximo=6, semilla=0,
+                  arcos_por_transito=3, holgura=1.5, valor_maximo=10):
+    # Generar un conjunto de datos sintético con el mismo formato que datos_optimizacion.json
+    aleatorio = random.Random(semilla)
+    etiquetasA = [f"A{i}" for i in range(1, num_A + 1)]
+    etiquetasR = [f"R{i}" for i in range(1, num_R + 1)]
+    etiquetasF = [f"F{i}" for i in range(1, num_F + 1)]
+    etiquetas = etiquetasA + etiquetasR + etiquetasF
+
+    # Red dispersa: los orígenes salen hacia tránsito y llegada, el tránsito conecta entre sí
+    # y con la llegada; ningún arco entra a un nodo de salida
+    distancias = {i: {j: 0 for j in etiquetas} for i in etiquetas}
+    for a in etiquetasA:
+        for r in aleatorio.sample(etiquetasR, min(2, num_R)):
+            distancias[a][r] = aleatorio.randint(5, 30)
+        distancias[a][aleatorio.choice(etiquetasF)] = aleatorio.randint(30, 90)
+    for indice, r in enumerate(etiquetasR):
+        # Anillo entre los puntos de tránsito y un centro seguro por punto (repartidos en turno)
+        # para que desde cualquier origen se alcancen todos los centros seguros
+        if num_R > 1:
+            distancias[r][etiquetasR[(indice + 1) % num_R]] = aleatorio.randint(5, 40)
+        distancias[r][etiquetasF[indice % num_F]] = aleatorio.randint(5, 40)
+        for destino in aleatorio.sample(etiquetasR + etiquetasF, min(arcos_por_transito, num_R + num_F)):
+            if destino != r:
+                distancias[r][destino] = aleatorio.randint(5, 40)
+
+    # Grupos de familias: varios grupos comparten origen y tamaño con distinto número de familias
+    idf = {}
+    idFamilias = []
+    for a in etiquetasA:
+        for _ in range(grupos_por_origen):
+            id_fam = str(len(idFamilias) + 1)
+            idf[id_fam] = {
+                "h": str(aleatorio.randint(1, tamaño_maximo)),
+                "ns": a,
+                "valor": aleatorio.randint(1, valor_maximo)
+            }
+            idFamilias.append(id_fam)
+
+    # Capacidades con la holgura indicada sobre la demanda: como todos los centros seguros son
+    # alcanzables desde cualquier origen, basta con que su capacidad conjunta cubra a todas las personas
+    personas_por_origen = {a: 0 for a in etiquetasA}
+    for familia in idf.values():
+        personas_por_origen[familia['ns']] += int(familia['h']) * familia['valor']
+    total_personas = sum(personas_por_origen.values())
+    capacidad_centro = math.ceil(holgura * total_personas / num_F)
+    return {
+        "etiquetasA": etiquetasA,
+        "etiquetasR": etiquetasR,
+        "etiquetasF": etiquetasF,
+        "distancias": distancias,
+        "idf": idf,
+        "idFamilias": idFamilias,
+        "costoPorKm": 1.0,
+        "ac": {rf: aleatorio.randint(50, 500) for rf in etiquetasR + etiquetasF},
+        "pi": {f: capacidad_centro for f in etiquetasF},
+        "alpha": max(personas_por_origen.values()),
+        "beta": total_personas,
+        "gamma": capacidad_centro
+    }
@@ -0,0 +1,249 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+# Uso: python -m benchmarks.prueba_carga [--url http://127.0.0.1:8000 ...] [--clientes 16] [--duracion 30]
+#
+# Varios clientes concurrentes mezclan lecturas, escrituras de datos, optimizaciones (servidas por la
+# caché tras la primera) y trabajos en segundo plano sobre unos pocos escenarios compartidos. Con
+# varias --url las peticiones se reparten entre ellas, como haría un balanceador entre workers; sin
+# --url se levanta un servidor en este mismo proceso sobre un directorio de datos temporal.
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+import requests
+from benchmarks.generador import generar_datos
+from benchmarks.benchmark_escalado import NIVELES
+
+# Peso relativo de cada operación en la mezcla de cada cliente
+OPERACIONES = {
+    "cargar_datos": 4,
+    "guardar_datos": 1,
+    "ejecutar_optimizacion": 3,
+    "cargar_resultados": 3,
+    "resultados_rutas": 3,
+    "grafo": 3,
+    "escenarios": 1,
+    "metrics": 1,
+    "trabajo": 1
+}
+
+FASES_FINALES = ("completado", "cancelado", "error")
+
+class Cliente:
+    def __init__(self, urls, escenarios, datos, semilla, limite_trabajo=120):
+        self.urls = urls
+        self.escenarios = escenarios
+        self.datos = datos
+        self.aleatorio = random.Random(semilla)
+        self.sesion = requests.Session()
+        self.limite_trabajo = limite_trabajo
+        self.mediciones = []  # (operación, segundos, correcta, detalle)
+
+    def _url(self, ruta, escenario):
+        return f"{self.aleatorio.choice(self.urls)}{ruta}?escenario={escenario}"
+
+    def _peticion(self, metodo, ruta, escenario, **opciones):
+        respuesta = self.sesion.request(metodo, self._url(ruta, escenario), timeout=300, **opciones)
+        try:
+            cuerpo = respuesta.json()
+        except ValueError:
+            cuerpo = None
+        return respuesta, cuerpo
+
+    def _comprobar(self, respuesta, cuerpo):
+        if respuesta.status_code >= 400:
+            return f"HTTP {respuesta.status_code}: {(cuerpo or {}).get('message', respuesta.text[:200])}"
+        if cuerpo is not None and cuerpo.get("status") not in (None, "success"):
+            return f"status={cuerpo.get('status')}: {cuerpo.get('message')}"
+        return None
+
+    def operacion(self, nombre, escenario):
+        datos = self.datos[escenario]
+        if nombre == "cargar_datos":
+            respuesta, cuerpo = self._peticion("GET", "/cargar_datos", escenario)
+            error = self._comprobar(respuesta, cuerpo)
+            # Una lectura concurrente con escrituras debe ver siempre un documento completo
+            if not error and cuerpo["data"].get("etiquetasA") != datos["etiquetasA"]:
+                error = "datos incompletos o de otro escenario"
+            return error
+        if nombre == "guardar_datos":
+            respuesta, cuerpo = self._peticion("POST", "/guardar_datos", escenario, json=datos)
+            return self._comprobar(respuesta, cuerpo)
+        if nombre == "ejecutar_optimizacion":
+            respuesta, cuerpo = self._peticion("GET", "/ejecutar_optimizacion", escenario,
+                                               params={"formato": "compacto"})
+            error = self._comprobar(respuesta, cuerpo)
+            if not error and cuerpo["resultados"]["status"] != "Optimal":
+                error = f"estado de la solución: {cuerpo['resultados']['status']}"
+            return error
+        if nombre == "cargar_resultados":
+            respuesta, cuerpo = self._peticion("GET", "/cargar_resultados", escenario, params={"formato": "compacto"})
+            return self._comprobar(respuesta, cuerpo)
+        if nombre == "resultados_rutas":
+            respuesta, cuerpo = self._peticion("GET", "/resultados/rutas", escenario, params={"limite": 50})
+            return self._comprobar(respuesta, cuerpo)
+        if nombre == "grafo":
+            respuesta, cuerpo = self._peticion("GET", "/grafo", escenario, params={"limite": 200})
+            return self._comprobar(respuesta, cuerpo)
+        if nombre == "escenarios":
+            respuesta, cuerpo = self._peticion("GET", "/escenarios", escenario)
+            return self._comprobar(respuesta, cuerpo)
+        if nombre == "metrics":
+            respuesta, _ = self._peticion("GET", "/metrics", escenario)
+            return None if respuesta.status_code == 200 else f"HTTP {respuesta.status_code}"
+        if nombre == "trabajo":
+            return self._trabajo(escenario)
+        raise ValueError(f"Operación desconocida: {nombre}")
+
+    def _trabajo(self, escenario):
+        # Encolar, consultar hasta que termine (posiblemente en otro worker) y leer los resultados
+        respuesta, cuerpo = self._peticion("POST", "/trabajos_optimizacion", escenario)
+        error = self._comprobar(respuesta, cuerpo)
+        if error:
+            return error
+        ruta = f"/trabajos_optimizacion/{cuerpo['id_trabajo']}"
+        limite = time.monotonic() + self.limite_trabajo
+        while True:
+            respuesta, cuerpo = self._peticion("GET", ruta, escenario)
+            error = self._comprobar(respuesta, cuerpo)
+            if error:
+                return error
+            fase = cuerpo["trabajo"]["fase"]
+            if fase in FASES_FINALES:
+                break
+            if time.monotonic() > limite:
+                return f"el trabajo sigue en la fase '{fase}'"
+            time.sleep(0.2)
+        if fase != "completado":
+            return f"el trabajo terminó en la fase '{fase}': {cuerpo['trabajo']['mensaje']}"
+        respuesta, cuerpo = self._peticion("GET", f"{ruta}/resultados", escenario, params={"formato": "compacto"})
+        return self._comprobar(respuesta, cuerpo)
+
+    def ejecutar(self, fin):
+        nombres = list(OPERACIONES)
+        pesos = [OPERACIONES[nombre] for nombre in nombres]
+        while time.monotonic() < fin:
+            nombre = self.aleatorio.choices(nombres, pesos)[0]
+            escenario = self.aleatorio.choice(self.escenarios)
+            inicio = time.perf_counter()
+            try:
+                error = self.operacion(nombre, escenario)
+            except (requests.RequestException, KeyError, TypeError) as e:
+                error = f"{type(e).__name__}: {e}"
+            self.mediciones.append((nombre, time.perf_counter() - inicio, error is None, error))
+
+def _percentil(valores, p):
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+def resumir(mediciones, duracion):
+    resumen = {}
+    for nombre in sorted({m[0] for m in mediciones}):
+        tiempos = sorted(m[1] for m in mediciones if m[0] == nombre)
+        errores = [m[3] for m in mediciones if m[0] == nombre and not m[2]]
+        resumen[nombre] = {
+            "peticiones": len(tiempos),
+            "errores": len(errores),
+            "por_segundo": len(tiempos) / duracion,
+            "p50_ms": _percentil(tiempos, 50) * 1000,
+            "p95_ms": _percentil(tiempos, 95) * 1000,
+            "p99_ms": _percentil(tiempos, 99) * 1000,
+            "max_ms": tiempos[-1] * 1000,
+            "ejemplos_error": sorted(set(errores))[:5]
+        }
+    return resumen
+
+def servidor_local():
+    # Servidor con hilos en este proceso sobre un directorio de datos temporal
+    import logging
+    from werkzeug.serving import make_server
+    from app import crear_app
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    directorio = tempfile.mkdtemp(prefix="prueba_carga_")
+    app = crear_app({"DIRECTORIO_DATOS": directorio})
+    servidor = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    print(f"Servidor local en http://127.0.0.1:{servidor.server_port} (datos en {directorio})", file=sys.stderr)
+    return f"http://127.0.0.1:{servidor.server_port}", servidor
+
+def preparar(urls, escenarios, datos):
+    # Guardar los datos de cada escenario y resolverlo una vez: el resto de optimizaciones
+    # de la prueba mide el camino habitual (caché de resultados, almacén y serialización)
+    sesion = requests.Session()
+    for escenario in escenarios:
+        inicio = time.perf_counter()
+        respuesta = sesion.post(f"{urls[0]}/guardar_datos?escenario={escenario}", json=datos[escenario], timeout=60)
+        respuesta.raise_for_status()
+        respuesta = sesion.get(f"{urls[0]}/ejecutar_optimizacion?escenario={escenario}&formato=compacto", timeout=600)
+        respuesta.raise_for_status()
+        print(f"{escenario}: {respuesta.json()['resultados']['status']} en {time.perf_counter() - inicio:.2f}s",
+              file=sys.stderr)
+
+def ejecutar(urls, clientes=16, duracion=30, num_escenarios=4, nivel="pequeño", semilla=0):
+    escenarios = [f"carga_{i}" for i in range(num_escenarios)]
+    datos = {escenario: generar_datos(semilla=semilla + i, **NIVELES[nivel]) for i, escenario in enumerate(escenarios)}
+    preparar(urls, escenarios, datos)
+
+    grupo = [Cliente(urls, escenarios, datos, semilla + i) for i in range(clientes)]
+    inicio = time.monotonic()
+    hilos = [threading.Thread(target=cliente.ejecutar, args=(inicio + duracion,)) for cliente in grupo]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.monotonic() - inicio
+
+    mediciones = [m for cliente in grupo for m in cliente.mediciones]
+    return {
+        "fecha": datetime.now().isoformat(timespec='seconds'),
+        "urls": urls,
+        "clientes": clientes,
+        "duracion": transcurrido,
+        "escenarios": num_escenarios,
+        "nivel": nivel,
+        "peticiones": len(mediciones),
+        "errores": sum(1 for m in mediciones if not m[2]),
+        "por_segundo": len(mediciones) / transcurrido,
+        "operaciones": resumir(mediciones, transcurrido)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de los endpoints con clientes concurrentes")
+    parser.add_argument("--url", nargs="+", help="URL base de uno o varios workers (por defecto, servidor local)")
+    parser.add_argument("--clientes", type=int, default=16)
+    parser.add_argument("--duracion", type=float, default=30, help="segundos")
+    parser.add_argument("--escenarios", type=int, default=4)
+    parser.add_argument("--nivel", choices=list(NIVELES), default="pequeño")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto benchmarks/resultados/carga_<fecha>.json)")
+    args = parser.parse_args()
+
+    urls = [url.rstrip('/') for url in args.url] if args.url else [servidor_local()[0]]
+    informe = ejecutar(urls, args.clientes, args.duracion, args.escenarios, args.nivel, args.semilla)
+
+    print(f"{'operación':>22} {'peticiones':>10} {'errores':>8} {'/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}",
+          file=sys.stderr)
+    for nombre, medida in informe["operaciones"].items():
+        print(f"{nombre:>22} {medida['peticiones']:>10} {medida['errores']:>8} {medida['por_segundo']:>7.1f} "
+              f"{medida['p50_ms']:>8.1f} {medida['p95_ms']:>8.1f} {medida['p99_ms']:>8.1f} {medida['max_ms']:>8.1f}",
+              file=sys.stderr)
+        for ejemplo in medida["ejemplos_error"]:
+            print(f"{'':>24}{ejemplo}", file=sys.stderr)
+    print(f"Total: {informe['peticiones']} peticiones, {informe['errores']} errores, "
+          f"{informe['por_segundo']:.1f} peticiones/s", file=sys.stderr)
+
+    salida = args.salida or os.path.join(
+        "benchmarks", "resultados", f"carga_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+    with open(salida, 'w') as f:
+        json.dump(informe, f, indent=4, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}", file=sys.stderr)
+    return 1 if informe["errores"] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# flock no excluye a dos hilos del mismo proceso que abren el archivo por separado:
+# un lock de hilos por ruta completa la exclusión dentro del proceso
+_locks_proceso = {}
+_lock_registro = threading.Lock()
+
+def _lock_hilos(ruta):
+    with _lock_registro:
+        return _locks_proceso.setdefault(os.path.abspath(ruta), threading.Lock())
+
+@contextmanager
+def bloqueo_archivo(ruta):
+    # Bloqueo exclusivo entre procesos (varios workers del servidor) sobre un archivo de
+    # bloqueo auxiliar; se libera solo aunque el proceso muera
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with _lock_hilos(ruta):
+        with open(ruta, 'a+b') as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def intentar_bloqueo(ruta):
+    # Como bloqueo_archivo pero sin esperar: entrega False si otro hilo o proceso tiene el bloqueo
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    lock = _lock_hilos(ruta)
+    if not lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        with open(ruta, 'a+b') as f:
+            try:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                obtenido = True
+            except OSError:
+                obtenido = False
+            try:
+                yield obtenido
+            finally:
+                if obtenido:
+                    if fcntl:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        lock.release()
+
+def escribir_atomico(ruta, texto):
+    # Escribir en un temporal del mismo directorio y renombrarlo: los lectores ven el
+    # archivo anterior o el nuevo completo, nunca uno a medias
+    directorio = os.path.dirname(ruta) or '.'
+    os.makedirs(directorio, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, prefix=f".{os.path.basename(ruta)}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            f.write(texto)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+    return len(texto.encode('utf-8'))
+
+@contextmanager
+def reemplazo_atomico(ruta):
+    # Igual que escribir_atomico para archivos que otra biblioteca escribe por su cuenta
+    # (informes PDF/XLSX): se entrega una ruta temporal que reemplaza a ruta si el bloque
+    # termina sin errores
+    directorio = os.path.dirname(ruta) or '.'
+    os.makedirs(directorio, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, prefix=f".{os.path.basename(ruta)}.", suffix=".tmp")
+    os.close(descriptor)
+    try:
+        yield temporal
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+
+def escribir_json_atomico(ruta, contenido):
+    return escribir_atomico(ruta, json.dumps(contenido, separators=(',', ':')))
+
+def leer_json(ruta):
+    # None si el archivo no existe o no se puede leer
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,201 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from bloqueo_archivos import bloqueo_archivo, escribir_atomico
+
+# Campos de los datos de entrada que determinan la solución del modelo
+CAMPOS_CLAVE = (
+    'etiquetasA', 'etiquetasR', 'etiquetasF', 'distancias', 'idf', 'idFamilias',
+    'ac', 'pi', 'alpha', 'beta', 'gamma', 'costoPorKm', 'robusto', 'poda', 'dos_fases', 'heuristica'
+)
+
+def _normalizar(valor):
+    # Representación canónica: los números se comparan como float ("3", 3 y 3.0 no deben
+    # producir claves distintas cuando el formulario envía textos)
+    if isinstance(valor, dict):
+        return {str(k): _normalizar(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    if isinstance(valor, bool) or valor is None:
+        return valor
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    if isinstance(valor, str):
+        try:
+            return float(valor)
+        except ValueError:
+            return valor
+    return valor
+
+def huella_datos(datos, extra=None):
+    # Hash SHA-256 de la forma canónica de los datos de entrada (y de opciones adicionales
+    # que cambien la solución, como el enfoque o la configuración del solver)
+    canonico = {campo: _normalizar(datos.get(campo)) for campo in CAMPOS_CLAVE}
+
+    # En la matriz de distancias un 0 significa que no hay conexión
+    canonico['distancias'] = {
+        i: {j: d for j, d in fila.items() if d and d > 0}
+        for i, fila in (canonico['distancias'] or {}).items()
+    }
+    for familia in (canonico['idf'] or {}).values():
+        familia['ns'] = str(familia.get('ns'))
+        familia['h'] = float(familia.get('h', 0))
+        familia['valor'] = float(familia.get('valor', 0))
+
+    if extra:
+        canonico['extra'] = _normalizar(extra)
+    texto = json.dumps(canonico, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+class CacheResultados:
+    def __init__(self, directorio='cache_resultados', max_entradas=64, max_bytes=256 * 1024 * 1024, max_memoria=8):
+        # Almacén en disco con desalojo LRU por número de entradas y tamaño total; los
+        # resultados usados más recientemente se mantienen además ya deserializados en memoria.
+        # Varios procesos pueden compartir el directorio: las escrituras son atómicas y las
+        # escrituras y desalojos se serializan con un bloqueo de archivo
+        self.directorio = directorio
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.max_memoria = max_memoria
+        self._lock = threading.Lock()
+        self._indice = OrderedDict()  # clave -> tamaño en bytes, del menos al más reciente
+        self._memoria = OrderedDict()  # clave -> resultados
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+        self.desalojos = 0
+        self._cargar_indice()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def _ruta_bloqueo(self):
+        return os.path.join(self.directorio, '.bloqueo')
+
+    def _cargar_indice(self):
+        # Reconstruir el orden LRU a partir de la fecha de modificación de los archivos
+        if not os.path.isdir(self.directorio):
+            return
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.json'):
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    estado = os.stat(ruta)
+                except OSError:
+                    continue
+                entradas.append((estado.st_mtime, nombre[:-len('.json')], estado.st_size))
+        for _, clave, tamaño in sorted(entradas):
+            self._indice[clave] = tamaño
+
+    def obtener(self, clave):
+        with self._lock:
+            resultados = self._memoria.get(clave) if clave in self._indice else None
+            if resultados is not None:
+                self._memoria.move_to_end(clave)
+            else:
+                # También las entradas que haya escrito otro proceso desde que se cargó el índice
+                try:
+                    with open(self._ruta(clave), 'r') as f:
+                        texto = f.read()
+                    resultados = json.loads(texto)
+                except (OSError, ValueError):
+                    # Entrada inexistente, borrada o corrupta: se trata como un fallo
+                    self._indice.pop(clave, None)
+                    self.fallos += 1
+                    return None
+                self._indice[clave] = len(texto.encode('utf-8'))
+                self._recordar(clave, resultados)
+            self._indice.move_to_end(clave)
+
+            try:
+                os.utime(self._ruta(clave))
+            except OSError:
+                pass
+            self.aciertos += 1
+            return resultados
+
+    def guardar(self, clave, resultados):
+        texto = json.dumps(resultados, separators=(',', ':'))
+        with self._lock, bloqueo_archivo(self._ruta_bloqueo()):
+            escribir_atomico(self._ruta(clave), texto)
+
+            # El orden LRU común a todos los procesos es el de las fechas de modificación
+            self._indice.clear()
+            self._cargar_indice()
+            self._indice.move_to_end(clave)
+            self._recordar(clave, resultados)
+            self.escrituras += 1
+            self._desalojar()
+
+    def _recordar(self, clave, resultados):
+        self._memoria[clave] = resultados
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def _desalojar(self):
+        # Eliminar las entradas menos usadas hasta respetar ambos límites
+        while self._indice and (len(self._indice) > self.max_entradas or sum(self._indice.values()) > self.max_bytes):
+            clave, _ = self._indice.popitem(last=False)
+            self._memoria.pop(clave, None)
+            try:
+                os.remove(self._ruta(clave))
+            except OSError:
+                pass
+            self.desalojos += 1
+
+    def limpiar(self):
+        with self._lock, bloqueo_archivo(self._ruta_bloqueo()):
+            self._cargar_indice()
+            for clave in list(self._indice):
+                try:
+                    os.remove(self._ruta(clave))
+                except OSError:
+                    pass
+            self._indice.clear()
+            self._memoria.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "escrituras": self.escrituras,
+                "desalojos": self.desalojos,
+                "entradas": len(self._indice),
+                "entradas_en_memoria": len(self._memoria),
+                "bytes": sum(self._indice.values()),
+                "max_entradas": self.max_entradas,
+                "max_bytes": self.max_bytes
+            }
+
+# Estados del solver que no dependen del tiempo disponible y pueden reutilizarse; la solución de un
+# solver detenido por su límite se informa como Factible y no se guarda
+ESTADOS_REUTILIZABLES = ("Optimal", "Infeasible", "Unbounded")
+
+_cache = None
+_lock_cache = threading.Lock()
+
+def crear_cache(directorio=None):
+    # Límites configurables con variables de entorno
+    return CacheResultados(
+        directorio=directorio or os.environ.get('CACHE_RESULTADOS_DIR', 'cache_resultados'),
+        max_entradas=int(os.environ.get('CACHE_RESULTADOS_MAX_ENTRADAS', 64)),
+        max_bytes=int(os.environ.get('CACHE_RESULTADOS_MAX_BYTES', 256 * 1024 * 1024))
+    )
+
+def obtener_cache():
+    # Caché compartida por el proceso para el uso fuera del servidor; cada aplicación de
+    # app.py crea la suya
+    global _cache
+    with _lock_cache:
+        if _cache is None:
+            _cache = crear_cache()
+        return _cache
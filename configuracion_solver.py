@@ -0,0 +1,226 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import json
+import os
+import re
+from pulp import PULP_CBC_CMD, HiGHS, HiGHS_CMD, GLPK_CMD
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
+
+BACKENDS = ("cbc", "highs", "glpk")
+
+# Construcción del modelo: objetos de PuLP o matriz dispersa emitida directamente (modelo_matricial)
+EMISORES = ("pulp", "matricial")
+
+# Archivo opcional con la configuración por defecto del solver
+ARCHIVO_CONFIGURACION = 'configuracion_solver.json'
+
+# Líneas del registro de CBC con la mejor solución entera, la cota inferior y los nodos explorados
+PATRONES_CBC = [
+    (re.compile(r"After (\d+) nodes, \d+ on tree, ([-\d.eE+]+) best solution, best possible ([-\d.eE+]+)"),
+     ("nodos", "incumbente", "cota")),
+    (re.compile(r"Integer solution of ([-\d.eE+]+) found"), ("incumbente",)),
+    (re.compile(r"Search completed - best objective ([-\d.eE+]+)"), ("incumbente",)),
+    (re.compile(r"^Objective value:\s+([-\d.eE+]+)"), ("incumbente",)),
+    (re.compile(r"^Lower bound:\s+([-\d.eE+]+)"), ("cota",)),
+    (re.compile(r"^Enumerated nodes:\s+(\d+)"), ("nodos",)),
+]
+
+# Resumen final que HiGHS escribe en su registro
+PATRONES_HIGHS = [
+    (re.compile(r"^\s*Primal bound\s+([-\d.eE+]+|inf)"), ("incumbente",)),
+    (re.compile(r"^\s*Dual bound\s+([-\d.eE+]+|-?inf)"), ("cota",)),
+    (re.compile(r"^\s*Nodes\s+(\d+)"), ("nodos",)),
+]
+
+class HiGHSInicio(HiGHS):
+    # La API de highspy en PuLP ignora los valores iniciales: se entregan como solución antes de resolver
+    def callSolver(self, lp):
+        solucion = highspy.HighsSolution()
+        solucion.col_value = [var.varValue if var.varValue is not None else 0.0 for var in lp.variables()]
+        solucion.value_valid = True
+        lp.solverModel.setSolution(solucion)
+        super().callSolver(lp)
+
+def _leer_registro(ruta_log, patrones):
+    progreso = {"incumbente": None, "cota": None, "gap": None, "nodos": None}
+    try:
+        with open(ruta_log, 'r', errors='replace') as f:
+            for linea in f:
+                for patron, campos in patrones:
+                    coincidencia = patron.search(linea)
+                    if coincidencia:
+                        for campo, valor in zip(campos, coincidencia.groups()):
+                            progreso[campo] = int(valor) if campo == "nodos" else float(valor)
+                        if linea.startswith("Cbc0001I"):
+                            progreso["cota"] = progreso["incumbente"]
+    except OSError:
+        return progreso
+
+    # CBC informa 1e+50 (y HiGHS inf) mientras no hay solución entera
+    for campo in ("incumbente", "cota"):
+        if progreso[campo] is not None and abs(progreso[campo]) >= 1e49:
+            progreso[campo] = None
+    if progreso["incumbente"] is not None and progreso["cota"] is not None:
+        progreso["gap"] = abs(progreso["incumbente"] - progreso["cota"]) / max(abs(progreso["incumbente"]), 1e-9)
+    return progreso
+
+def leer_progreso_cbc(ruta_log):
+    # Extraer del registro de CBC la mejor solución entera, la cota y el gap actuales
+    return _leer_registro(ruta_log, PATRONES_CBC)
+
+def _booleano(valor):
+    if isinstance(valor, str):
+        return valor.strip().lower() not in ("0", "false", "no", "off")
+    return bool(valor)
+
+class ConfiguracionSolver:
+    def __init__(self, backend="cbc", hilos=None, limite_tiempo=None, gap_relativo=None, presolve=True,
+                 emisor="pulp", inicio_heuristico=False):
+        backend = (backend or "cbc").lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"Solver no soportado: {backend}. Opciones: {', '.join(BACKENDS)}")
+        emisor = (emisor or "pulp").lower()
+        if emisor not in EMISORES:
+            raise ValueError(f"Emisor no soportado: {emisor}. Opciones: {', '.join(EMISORES)}")
+        if emisor == "matricial" and backend == "glpk":
+            raise ValueError("El emisor matricial admite los solvers cbc y highs")
+        self.backend = backend
+        self.emisor = emisor
+        self.hilos = int(hilos) if hilos not in (None, "") else None
+        self.limite_tiempo = float(limite_tiempo) if limite_tiempo not in (None, "") else None
+        self.gap_relativo = float(gap_relativo) if gap_relativo not in (None, "") else None
+        self.presolve = _booleano(presolve)
+        # Partir de un plan heurístico como inicio MIP (modelo determinista con objetos de PuLP)
+        self.inicio_heuristico = _booleano(inicio_heuristico)
+        # Registro fijo del solver (por ejemplo, para seguir el progreso de un trabajo)
+        self.ruta_log = None
+
+    @classmethod
+    def desde_dict(cls, valores):
+        valores = valores or {}
+        return cls(
+            backend=valores.get('backend', "cbc"),
+            hilos=valores.get('hilos'),
+            limite_tiempo=valores.get('limite_tiempo'),
+            gap_relativo=valores.get('gap_relativo'),
+            presolve=valores.get('presolve', True),
+            emisor=valores.get('emisor', "pulp"),
+            inicio_heuristico=valores.get('inicio_heuristico', False)
+        )
+
+    def a_dict(self):
+        return {
+            "backend": self.backend,
+            "hilos": self.hilos,
+            "limite_tiempo": self.limite_tiempo,
+            "gap_relativo": self.gap_relativo,
+            "presolve": self.presolve,
+            "emisor": self.emisor,
+            "inicio_heuristico": self.inicio_heuristico
+        }
+
+    def con_cambios(self, **cambios):
+        # Copia de la configuración con algunos valores sustituidos
+        return ConfiguracionSolver.desde_dict(dict(self.a_dict(), **cambios))
+
+    def crear_solver(self, ruta_log=None, inicio_mip=False):
+        # Instancia PuLP del solver elegido con los límites configurados
+        if self.backend == "cbc":
+            solver = PULP_CBC_CMD(
+                msg=False,
+                threads=self.hilos,
+                timeLimit=self.limite_tiempo,
+                gapRel=self.gap_relativo,
+                warmStart=inicio_mip,
+                logPath=ruta_log,
+                options=[] if self.presolve else ["presolve off"]
+            )
+        elif self.backend == "highs":
+            opciones = {} if self.presolve else {"presolve": "off"}
+            # Preferir la API de highspy y recurrir al ejecutable si no está instalada
+            solver = (HiGHSInicio if inicio_mip else HiGHS)(
+                msg=False,
+                threads=self.hilos,
+                timeLimit=self.limite_tiempo,
+                gapRel=self.gap_relativo,
+                **opciones
+            )
+            if not solver.available():
+                solver = HiGHS_CMD(
+                    msg=False,
+                    threads=self.hilos,
+                    timeLimit=self.limite_tiempo,
+                    gapRel=self.gap_relativo,
+                    warmStart=inicio_mip,
+                    logPath=ruta_log,
+                    options=[f"{clave}={valor}" for clave, valor in opciones.items()]
+                )
+        else:
+            # GLPK no admite hilos; el gap se pasa como opción de glpsol
+            opciones = []
+            if self.gap_relativo is not None:
+                opciones += ["--mipgap", str(self.gap_relativo)]
+            if not self.presolve:
+                opciones += ["--nopresol"]
+            else:
+                opciones += ["--presol"]
+            if ruta_log:
+                opciones += ["--log", ruta_log]
+            solver = GLPK_CMD(msg=False, timeLimit=self.limite_tiempo, options=opciones)
+
+        if not solver.available():
+            raise ValueError(f"El solver '{self.backend}' no está disponible en este equipo")
+        return solver
+
+    def estadisticas(self, problema, solver, ruta_log, tiempo):
+        # Tiempo de pared, nodos explorados, gap y cota informados por el solver
+        estadisticas = {"tiempo_pared": tiempo, "nodos": None, "gap": None, "cota": None, "incumbente": None}
+        if isinstance(solver, PULP_CBC_CMD) and ruta_log:
+            estadisticas.update(leer_progreso_cbc(ruta_log))
+        elif isinstance(solver, HiGHS_CMD) and ruta_log:
+            estadisticas.update(_leer_registro(ruta_log, PATRONES_HIGHS))
+        elif isinstance(solver, HiGHS) and getattr(problema, 'solverModel', None) is not None:
+            info = problema.solverModel.getInfo()
+            estadisticas["nodos"] = info.mip_node_count
+            estadisticas["cota"] = info.mip_dual_bound
+            estadisticas["incumbente"] = info.objective_function_value
+            estadisticas["gap"] = info.mip_gap
+        return depurar_estadisticas(estadisticas)
+
+def depurar_estadisticas(estadisticas):
+    # Los solvers informan NaN, inf o 1e+50 cuando aún no hay cota o solución
+    for campo in ("cota", "incumbente", "gap"):
+        valor = estadisticas[campo]
+        if valor is not None and (valor != valor or abs(valor) >= 1e49):
+            estadisticas[campo] = None
+    return estadisticas
+
+def cargar_configuracion(ruta=ARCHIVO_CONFIGURACION):
+    # Configuración base: archivo JSON opcional y variables de entorno SOLVER_* por encima
+    valores = {}
+    if os.path.exists(ruta):
+        with open(ruta, 'r') as f:
+            valores.update(json.load(f))
+    for campo, variable in (("backend", "SOLVER_BACKEND"), ("hilos", "SOLVER_HILOS"),
+                            ("limite_tiempo", "SOLVER_LIMITE_TIEMPO"), ("gap_relativo", "SOLVER_GAP"),
+                            ("presolve", "SOLVER_PRESOLVE"), ("emisor", "SOLVER_EMISOR"),
+                            ("inicio_heuristico", "SOLVER_INICIO_HEURISTICO")):
+        if os.environ.get(variable):
+            valores[campo] = os.environ[variable]
+    return ConfiguracionSolver.desde_dict(valores)
+
+def configuracion_desde_peticion(parametros, base=None):
+    # Sobrescribir la configuración base con los parámetros de una petición
+    # (solver, hilos, limite_tiempo, gap, presolve, emisor, inicio_heuristico)
+    base = base or cargar_configuracion()
+    cambios = {}
+    for campo, parametro in (("backend", "solver"), ("hilos", "hilos"), ("limite_tiempo", "limite_tiempo"),
+                             ("gap_relativo", "gap"), ("presolve", "presolve"), ("emisor", "emisor"),
+                             ("inicio_heuristico", "inicio_heuristico")):
+        if parametros.get(parametro) not in (None, ""):
+            cambios[campo] = parametros.get(parametro)
+    return base.con_cambios(**cambios)
@@ -0,0 +1,326 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pulp import LpConstraint, LpConstraintGE, LpContinuous, LpStatus, LpStatusOptimal, LpStatusInfeasible, LpStatusNotSolved
+from optimizacion import ModeloOptimizacion, TOLERANCIA
+from formato_resultados import ESTADO_FACTIBLE
+from configuracion_solver import ConfiguracionSolver, cargar_configuracion, depurar_estadisticas
+
+# Opciones por defecto de la descomposición (datos['dos_fases'] las sobrescribe)
+PARAMETROS_DOS_FASES = {
+    "gap": 0.01,              # gap relativo entre cotas con el que se detiene (el gap del solver, si se indica, manda)
+    "max_iteraciones": 10,    # soluciones del maestro evaluadas como mucho
+    "procesos": None,         # subproblemas por origen resueltos a la vez (por defecto, uno por procesador)
+    "y_fijos": {}             # nodo R/F -> 0/1 que el maestro no puede cambiar
+}
+
+class ModeloDosFases(ModeloOptimizacion):
+    # Enfoque determinista en dos fases. Fase 1: un maestro con las Y binarias y el flujo de
+    # personas agregado por origen como variable continua; es una relajación del modelo completo,
+    # así que su óptimo es una cota inferior. Fase 2: con las Y del maestro fijas, el ruteo entero
+    # de los grupos de familias se resuelve por origen en paralelo, repartiendo cada capacidad según
+    # la carga que el maestro asignó a cada origen. Si el reparto no admite solución entera o el gap
+    # no se cierra, se resuelve el ruteo conjunto con las Y fijas (partiendo de la solución por
+    # origen), se excluye esa combinación de Y del maestro y se itera
+    def __init__(self, datos, agrupar=True, enfoque="dos_fases", poda=None):
+        super().__init__(datos, agrupar=agrupar, enfoque="determinista", poda=poda)
+        self.enfoque = enfoque
+        self.parametros = dict(PARAMETROS_DOS_FASES, **datos.get('dos_fases', {}))
+        self.nodos_Y = self.datos['etiquetasR'] + self.datos['etiquetasF']
+        self.maestro = None
+        self.status = LpStatus[LpStatusNotSolved]
+        self.valor_objetivo = None
+        self.solucion_X = {}
+        self.solucion_Y = {}
+        self.informe = None
+
+    def admite_actualizacion(self, datos):
+        # Cada resolución reconstruye el maestro y los subproblemas
+        return False
+
+    def construir(self):
+        # Los modelos de cada fase se construyen al resolver
+        self.construido = True
+
+    def tamaño_modelo(self):
+        tamaño = super().tamaño_modelo()
+        if self.maestro is not None:
+            tamaño.update(self.maestro.tamaño_modelo(), familias=tamaño["familias"], clases=tamaño["clases"])
+        return tamaño
+
+    def resolver(self, solver=None, progreso=None, inicio_mip=False, perfilar=None):
+        # Solo con ConfiguracionSolver: cada fase crea sus propios solvers con los límites restantes
+        if solver is None:
+            solver = cargar_configuracion()
+        if not isinstance(solver, ConfiguracionSolver):
+            raise ValueError("El enfoque en dos fases necesita una ConfiguracionSolver")
+        return super().resolver(solver, progreso, inicio_mip, perfilar)
+
+    def _construir_maestro(self):
+        # Una "familia" de tamaño 1 por origen con todas sus personas; el flujo es continuo
+        personas = {}
+        for id_fam, (h, ns) in self.familias.items():
+            personas[ns] = personas.get(ns, 0) + h * int(self.datos['idf'][id_fam]['valor'])
+        self.origenes = {f"O_{ns}": ns for ns in personas}
+        datos_maestro = dict(
+            self.datos,
+            idf={id_origen: {"h": 1, "ns": ns, "valor": personas[ns]} for id_origen, ns in self.origenes.items()},
+            idFamilias=list(self.origenes)
+        )
+        maestro = ModeloOptimizacion(datos_maestro, agrupar=False, poda=self.parametros_poda)
+        maestro.construir()
+        for var in maestro.X.values():
+            var.cat = LpContinuous
+        self._fijar_Y(maestro, {rf: int(valor) for rf, valor in self.parametros['y_fijos'].items()})
+        return maestro
+
+    @staticmethod
+    def _fijar_Y(modelo, valores):
+        for rf, valor in valores.items():
+            modelo.Y[rf].lowBound = valor
+            modelo.Y[rf].upBound = valor
+
+    def _capacidades(self, Y):
+        # (nombre de la restricción, arcos entrantes, arcos salientes, capacidad, tipo) de cada
+        # restricción de capacidad compartida por los orígenes; el tipo indica si la capacidad
+        # está en el lado derecho o como coeficiente de Y
+        alpha = self.datos.get('alpha', 0)
+        beta = self.datos.get('beta', 0)
+        gamma = self.datos.get('gamma', 0)
+        maestro = self.maestro
+        capacidades = []
+        for ns in self.datos['etiquetasA']:
+            capacidades.append((f"capac_llegada_origen_{ns}", maestro.arcos_salida[ns], (), alpha, None))
+        for nt in self.datos['etiquetasR']:
+            capacidades.append((f"cap_llegada_punto_transito_{nt}", maestro.arcos_salida[nt], (), beta * Y[nt], nt))
+        for nll in self.datos['etiquetasF']:
+            capacidades.append((f"Robust_Llegada_C2_{nll}", maestro.arcos_entrada[nll], maestro.arcos_salida[nll],
+                                self.datos['pi'].get(nll, 0) * Y[nll], nll))
+            capacidades.append((f"cap_llegada_centro_seguro_{nll}", maestro.arcos_entrada[nll], (), gamma, None))
+        return capacidades
+
+    def _repartir_capacidades(self, Y):
+        # Cada origen recibe la carga que le asignó el maestro más una parte de la holgura,
+        # proporcional a su carga (a partes iguales si nadie usa el nodo)
+        flujos = {id_origen: {} for id_origen in self.origenes}
+        for (id_origen, h, i, j), var in self.maestro.X.items():
+            flujos[id_origen][(i, j)] = var.value() or 0
+        cuotas = {ns: {} for ns in self.origenes.values()}
+        for nombre, entrantes, salientes, capacidad, nodo_Y in self._capacidades(Y):
+            cargas = {
+                ns: max(0.0, sum(flujos[id_origen].get(arco, 0) for arco in entrantes)
+                        - sum(flujos[id_origen].get(arco, 0) for arco in salientes))
+                for id_origen, ns in self.origenes.items()
+            }
+            total = sum(cargas.values())
+            holgura = max(0.0, capacidad - total)
+            for ns, carga in cargas.items():
+                peso = carga / total if total > TOLERANCIA else 1 / len(cargas)
+                cuotas[ns][nombre] = (min(capacidad, carga + holgura * peso), nodo_Y)
+        return cuotas
+
+    def _subproblema(self, ns, Y, cuotas, configuracion):
+        # Ruteo entero de las clases de un origen con las Y fijas y su parte de cada capacidad
+        clases = [id_fam for id_fam, (h, origen) in self.familias.items() if origen == ns]
+        datos_origen = dict(self.datos, idf={id_fam: self.datos['idf'][id_fam] for id_fam in clases}, idFamilias=clases)
+        modelo = ModeloOptimizacion(datos_origen, agrupar=False, poda=self.parametros_poda)
+        modelo.construir()
+        self._fijar_Y(modelo, Y)
+        restricciones = modelo.problema.constraints
+        for nombre, (cuota, nodo_Y) in cuotas.items():
+            if nodo_Y is None:
+                restricciones[nombre].constant = -cuota
+            else:
+                restricciones[nombre][modelo.Y[nodo_Y]] = -cuota
+        modelo.resolver_problema(configuracion, inicio_mip=False)
+        if modelo.problema.status != LpStatusOptimal:
+            return None
+        return {clave: var.value() for clave, var in modelo.X.items() if var.value()}
+
+    def _fase_2_por_origen(self, Y, configuracion):
+        # Subproblemas independientes: cada uno lanza su propio proceso del solver
+        cuotas = self._repartir_capacidades(Y)
+        procesos = self.parametros['procesos'] or min(len(cuotas), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=procesos, thread_name_prefix="dos_fases") as ejecutor:
+            soluciones = list(ejecutor.map(lambda ns: self._subproblema(ns, Y, cuotas[ns], configuracion), cuotas))
+        if any(solucion is None for solucion in soluciones):
+            return None
+        return {clave: valor for solucion in soluciones for clave, valor in solucion.items()}
+
+    def _fase_2_conjunta(self, Y, inicio, configuracion):
+        # Modelo completo con las Y fijas; la solución por origen, si la hay, es el inicio MIP.
+        # Devuelve la solución (o None), la cota inferior del costo para esas Y y el estado del
+        # solver: solo LpStatusInfeasible prueba que esas Y no admiten ruteo
+        modelo = ModeloOptimizacion(self.datos, agrupar=False, poda=self.parametros_poda)
+        modelo.construir()
+        self._fijar_Y(modelo, Y)
+        if inicio:
+            modelo.sembrar_inicio(inicio, Y)
+        informe = modelo.resolver_problema(configuracion, inicio_mip=bool(inicio))
+        status = modelo.problema.status
+        if status != LpStatusOptimal:
+            return None, float('inf'), status
+        solucion = {clave: var.value() for clave, var in modelo.X.items() if var.value()}
+        cota = informe["estadisticas"].get("cota")
+        costo = self._costo(solucion, Y)
+        return solucion, costo if cota is None else min(costo, cota), status
+
+    def _costo(self, solucion_X, Y):
+        distancias = self.datos['distancias']
+        costo_por_km = self.datos['costoPorKm']
+        return (sum(costo_por_km * distancias[i][j] * h * valor for (id_fam, h, i, j), valor in solucion_X.items())
+                + sum(self.datos['ac'].get(rf, 0) * Y[rf] for rf in self.nodos_Y))
+
+    def _excluir(self, Y, infactible):
+        # Corte "no-good" sobre las Y evaluadas. Si no admiten ruteo, tampoco lo admite ningún
+        # subconjunto de los nodos abiertos (abrir nodos solo relaja capacidades): basta con
+        # exigir que se abra alguno de los cerrados. Devuelve False si el corte no deja ninguna
+        # combinación posible
+        variables = self.maestro.Y
+        corte = LpConstraint(sense=LpConstraintGE, name=f"Corte_{len(self.cortes) + 1}", rhs=1)
+        for rf in self.nodos_Y:
+            if Y[rf] == 0:
+                corte.addterm(variables[rf], 1)
+            elif not infactible:
+                corte.addterm(variables[rf], -1)
+                corte.constant += 1
+        if not len(corte):
+            return False
+        self.maestro.problema += corte
+        self.cortes.append(corte)
+        return True
+
+    def ejecutar_solver(self, configuracion, ruta_log, inicio_mip):
+        # inicio_mip no se usa: la fase 2 parte siempre de la solución por origen (ni de un plan heurístico)
+        inicio = time.perf_counter()
+        configuracion = configuracion.con_cambios(inicio_heuristico=False)
+        tolerancia = configuracion.gap_relativo if configuracion.gap_relativo is not None else self.parametros['gap']
+        self.maestro = self._construir_maestro()
+        self.cortes = []
+        iteraciones = []
+        cota_inferior = -float('inf')
+        cota_superior = float('inf')
+        # Menor cota del costo entre las combinaciones de Y ya excluidas del maestro
+        cota_excluidas = float('inf')
+        agotado = False
+        # Un maestro o un ruteo conjunto detenido sin probar nada (límite de tiempo sin solución):
+        # no se puede excluir ni dar por agotada ninguna combinación y la búsqueda se detiene
+        interrumpido = False
+
+        def restante():
+            # Configuración con el tiempo que queda del límite global
+            if configuracion.limite_tiempo is None:
+                return configuracion.con_cambios()
+            return configuracion.con_cambios(limite_tiempo=max(1.0, configuracion.limite_tiempo - (time.perf_counter() - inicio)))
+
+        for iteracion in range(1, int(self.parametros['max_iteraciones']) + 1):
+            # Fase 1: combinación de Y con menor cota; su óptimo acota todas las no excluidas
+            maestro_configuracion = restante()
+            maestro_configuracion.ruta_log = ruta_log
+            informe = self.maestro.resolver_problema(maestro_configuracion, inicio_mip=False)
+            if self.maestro.problema.status != LpStatusOptimal:
+                if self.maestro.problema.status == LpStatusInfeasible:
+                    # Sin más combinaciones de Y factibles: la mejor encontrada es óptima
+                    cota_inferior = cota_excluidas
+                    agotado = True
+                else:
+                    interrumpido = True
+                iteraciones.append({"iteracion": iteracion, "nodos_abiertos": None, "cota_maestro": None,
+                                    "cota_inferior": _finito(cota_inferior), "cota_superior": _finito(cota_superior),
+                                    "gap": _finito(_gap(cota_inferior, cota_superior)), "tiempo": time.perf_counter() - inicio})
+                break
+            # Con límite de tiempo o gap el maestro puede no ser óptimo: vale su cota, no su objetivo
+            cota_maestro = informe["estadisticas"].get("cota")
+            if cota_maestro is None:
+                cota_maestro = self.maestro.problema.objective.value()
+            cota_inferior = min(cota_maestro, cota_excluidas)
+            Y = {rf: int(round(var.value() or 0)) for rf, var in self.maestro.Y.items()}
+
+            # Fase 2: ruteo por origen en paralelo
+            registro = {"iteracion": iteracion, "nodos_abiertos": [rf for rf in self.nodos_Y if Y[rf]],
+                        "cota_maestro": cota_maestro, "por_origen": None}
+            solucion = self._fase_2_por_origen(Y, restante())
+            if solucion is not None:
+                registro["por_origen"] = self._costo(solucion, Y)
+                if registro["por_origen"] < cota_superior:
+                    cota_superior = registro["por_origen"]
+                    self.solucion_X, self.solucion_Y = solucion, Y
+
+            # Sin gap suficiente, el ruteo conjunto con las mismas Y da el costo exacto de esa combinación
+            if _gap(cota_inferior, cota_superior) > tolerancia:
+                conjunta, cota_Y, status = self._fase_2_conjunta(Y, solucion, restante())
+                registro["conjunta"] = None
+                registro["estado_conjunta"] = LpStatus[status]
+                if conjunta is not None:
+                    registro["conjunta"] = self._costo(conjunta, Y)
+                    if registro["conjunta"] < cota_superior:
+                        cota_superior = registro["conjunta"]
+                        self.solucion_X, self.solucion_Y = conjunta, Y
+                if conjunta is None and status != LpStatusInfeasible:
+                    # Sin solución ni prueba de infactibilidad el corte podría eliminar el óptimo
+                    interrumpido = True
+                else:
+                    cota_excluidas = min(cota_excluidas, cota_Y)
+                    if not self._excluir(Y, infactible=conjunta is None):
+                        cota_inferior = cota_excluidas
+                        agotado = True
+
+            gap = _gap(cota_inferior, cota_superior)
+            registro.update(cota_inferior=_finito(cota_inferior), cota_superior=_finito(cota_superior),
+                            gap=_finito(gap), tiempo=time.perf_counter() - inicio)
+            iteraciones.append(registro)
+            if agotado or interrumpido or gap <= tolerancia:
+                break
+            if configuracion.limite_tiempo is not None and time.perf_counter() - inicio >= configuracion.limite_tiempo:
+                break
+
+        # Óptimo solo con el gap entre cotas cerrado; con una solución sin esa prueba (límite de
+        # iteraciones o de tiempo, o búsqueda interrumpida) el resultado es factible
+        cota_inferior = min(cota_inferior, cota_superior)
+        if self.solucion_Y:
+            self.valor_objetivo = cota_superior
+            self.status = LpStatus[LpStatusOptimal] if _gap(cota_inferior, cota_superior) <= tolerancia else ESTADO_FACTIBLE
+        else:
+            self.status = LpStatus[LpStatusInfeasible] if agotado and not interrumpido else LpStatus[LpStatusNotSolved]
+        self.informe = {
+            "cota_inferior": _finito(cota_inferior),
+            "cota_superior": _finito(cota_superior),
+            "gap": _finito(_gap(cota_inferior, cota_superior)),
+            "tolerancia": tolerancia,
+            "cortes": len(self.cortes),
+            "interrumpido": interrumpido,
+            "iteraciones": iteraciones
+        }
+        return depurar_estadisticas({
+            "tiempo_pared": time.perf_counter() - inicio,
+            "nodos": None,
+            "gap": self.informe["gap"],
+            "cota": self.informe["cota_inferior"],
+            "incumbente": self.valor_objetivo
+        })
+
+    def extraer_resultados(self):
+        resultados = super().extraer_resultados()
+        resultados['dos_fases'] = self.informe
+        return resultados
+
+    def estado_solucion(self):
+        return self.status, self.valor_objetivo
+
+    def valores_X(self):
+        return iter(self.solucion_X.items())
+
+    def valores_Y(self):
+        for rf in self.nodos_Y:
+            yield rf, self.solucion_Y.get(rf)
+
+def _gap(cota_inferior, cota_superior):
+    if cota_superior == float('inf'):
+        return float('inf')
+    return max(0.0, cota_superior - cota_inferior) / max(abs(cota_superior), TOLERANCIA)
+
+def _finito(valor):
+    # Las cotas aún no disponibles (±inf) se informan como None para que el JSON sea válido
+    return None if valor in (float('inf'), -float('inf')) else valor
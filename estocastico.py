@@ -0,0 +1,187 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import copy
+import math
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from optimizacion import crear_modelo
+from formato_resultados import iterar_rutas, ESTADOS_CON_SOLUCION
+from configuracion_solver import ConfiguracionSolver, cargar_configuracion
+
+def generar_escenarios(datos, num_escenarios, variacion_valor=0.2, variacion_pi=0.2, semilla=0):
+    # Muestrear escenarios de demanda (valor de cada grupo de familias) y de capacidad (pi)
+    # con variaciones uniformes alrededor de los valores nominales
+    aleatorio = random.Random(semilla)
+    for _ in range(num_escenarios):
+        escenario = {"valor": {}, "pi": {}}
+        for id_fam in datos['idFamilias']:
+            valor = int(datos['idf'][id_fam]['valor'])
+            minimo = max(0, math.floor(valor * (1 - variacion_valor)))
+            escenario["valor"][id_fam] = aleatorio.randint(minimo, math.ceil(valor * (1 + variacion_valor)))
+        for nll, capacidad in datos['pi'].items():
+            escenario["pi"][nll] = capacidad * aleatorio.uniform(1 - variacion_pi, 1 + variacion_pi)
+        yield escenario
+
+def aplicar_escenario(datos, escenario):
+    # Datos del escenario: los datos base con las demandas, capacidades y parámetros sustituidos.
+    # Claves admitidas: valor (por id de familia), pi (por nodo), alpha, beta, gamma
+    datos_escenario = dict(datos)
+    if escenario.get('valor'):
+        datos_escenario['idf'] = copy.deepcopy(datos['idf'])
+        for id_fam, valor in escenario['valor'].items():
+            datos_escenario['idf'][id_fam]['valor'] = valor
+    if escenario.get('pi'):
+        datos_escenario['pi'] = dict(datos['pi'], **escenario['pi'])
+    for parametro in ('alpha', 'beta', 'gamma'):
+        if parametro in escenario:
+            datos_escenario[parametro] = escenario[parametro]
+    return datos_escenario
+
+# Datos base y configuración del solver de cada proceso trabajador, enviados una sola vez al crear el proceso
+_datos_base = None
+_configuracion = None
+
+def _inicializar_trabajador(datos, configuracion):
+    global _datos_base, _configuracion
+    _datos_base = datos
+    _configuracion = ConfiguracionSolver.desde_dict(configuracion)
+
+def _resolver_escenario(indice, escenario):
+    datos = aplicar_escenario(_datos_base, escenario)
+    resultados = crear_modelo(datos, configuracion=_configuracion).resolver(_configuracion)
+    return {
+        "escenario": indice,
+        "probabilidad": escenario.get('probabilidad'),
+        "status": resultados['status'],
+        "valor_objetivo": resultados['valor_objetivo'],
+        "nodos_activados": resultados['resumen']['nodos_activados'],
+        "rutas": [
+            {
+                "ruta_str": ruta['ruta_str'],
+                "familias_en_ruta": ruta['familias_en_ruta'],
+                "personas_en_ruta": ruta['personas_en_ruta']
+            }
+            for ruta in iterar_rutas(resultados)
+        ]
+    }
+
+# Estado del registro de un escenario cuya resolución lanzó una excepción
+ESTADO_ERROR = "Error"
+
+def _resultado_futuro(futuro, indice, escenario):
+    # Un escenario que falla se informa como tal sin detener el resto del lote
+    try:
+        return futuro.result()
+    except Exception as e:
+        return {
+            "escenario": indice,
+            "probabilidad": escenario.get('probabilidad'),
+            "status": ESTADO_ERROR,
+            "mensaje": str(e) or type(e).__name__
+        }
+
+def resolver_escenarios(datos, escenarios, max_procesos=None, configuracion=None):
+    # Resolver los escenarios en un grupo de procesos (por defecto uno por núcleo) y
+    # devolver cada resultado en cuanto termina; como mucho se mantienen 2 x procesos
+    # escenarios pendientes para no materializar un generador completo en memoria
+    max_procesos = max_procesos or os.cpu_count() or 1
+    # Un hilo por solver: el paralelismo lo dan los procesos
+    configuracion = (configuracion or cargar_configuracion()).con_cambios(hilos=1)
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_procesos, mp_context=contexto, initializer=_inicializar_trabajador,
+                             initargs=(datos, configuracion.a_dict())) as ejecutor:
+        pendientes = {}
+        for indice, escenario in enumerate(escenarios):
+            pendientes[ejecutor.submit(_resolver_escenario, indice, escenario)] = (indice, escenario)
+            if len(pendientes) >= 2 * max_procesos:
+                terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    yield _resultado_futuro(futuro, *pendientes.pop(futuro))
+        while pendientes:
+            terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                yield _resultado_futuro(futuro, *pendientes.pop(futuro))
+
+class EstadisticasEscenarios:
+    def __init__(self):
+        # Acumula los resultados por escenario a medida que llegan
+        self.escenarios = 0
+        self.factibles = 0
+        self.peso_total = 0.0
+        self.suma_costos = 0.0
+        self.suma_cuadrados = 0.0
+        self.costo_minimo = None
+        self.costo_maximo = None
+        self.estados = {}
+        self.activaciones = {}
+        self.rutas = {}
+
+    def agregar(self, resultado):
+        self.escenarios += 1
+        self.estados[resultado['status']] = self.estados.get(resultado['status'], 0) + 1
+        # Las soluciones de un solver detenido por su límite de tiempo también cuentan
+        if resultado['status'] not in ESTADOS_CON_SOLUCION:
+            return
+
+        # Sin probabilidades explícitas todos los escenarios pesan lo mismo; una probabilidad 0
+        # es explícita y no pesa
+        probabilidad = resultado.get('probabilidad')
+        peso = 1.0 if probabilidad is None else probabilidad
+        costo = resultado['valor_objetivo']
+        self.factibles += 1
+        self.peso_total += peso
+        self.suma_costos += peso * costo
+        self.suma_cuadrados += peso * costo * costo
+        self.costo_minimo = costo if self.costo_minimo is None else min(self.costo_minimo, costo)
+        self.costo_maximo = costo if self.costo_maximo is None else max(self.costo_maximo, costo)
+
+        for nodo in resultado['nodos_activados']:
+            self.activaciones[nodo] = self.activaciones.get(nodo, 0.0) + peso
+
+        personas_por_ruta = {}
+        for ruta in resultado['rutas']:
+            personas_por_ruta[ruta['ruta_str']] = personas_por_ruta.get(ruta['ruta_str'], 0) + ruta['personas_en_ruta']
+        for ruta_str, personas in personas_por_ruta.items():
+            uso = self.rutas.setdefault(ruta_str, {"peso": 0.0, "personas": 0.0, "personas_maximo": 0})
+            uso["peso"] += peso
+            uso["personas"] += peso * personas
+            uso["personas_maximo"] = max(uso["personas_maximo"], personas)
+
+    def resumen(self):
+        if not self.peso_total:
+            return {
+                "escenarios": self.escenarios,
+                "factibles": 0,
+                "estados": self.estados,
+                "costo_esperado": None
+            }
+
+        costo_esperado = self.suma_costos / self.peso_total
+        varianza = max(0.0, self.suma_cuadrados / self.peso_total - costo_esperado ** 2)
+        return {
+            "escenarios": self.escenarios,
+            "factibles": self.factibles,
+            "estados": self.estados,
+            "costo_esperado": costo_esperado,
+            "desviacion_costo": math.sqrt(varianza),
+            "costo_minimo": self.costo_minimo,
+            "costo_maximo": self.costo_maximo,
+            # Fracción (ponderada) de escenarios factibles en los que se activa cada nodo Y
+            "frecuencia_activacion": {
+                nodo: peso / self.peso_total for nodo, peso in sorted(self.activaciones.items())
+            },
+            "uso_rutas": sorted(
+                (
+                    {
+                        "ruta_str": ruta_str,
+                        "frecuencia": uso["peso"] / self.peso_total,
+                        "personas_promedio": uso["personas"] / self.peso_total,
+                        "personas_maximo": uso["personas_maximo"]
+                    }
+                    for ruta_str, uso in self.rutas.items()
+                ),
+                key=lambda ruta: -ruta["frecuencia"]
+            )
+        }
@@ -0,0 +1,119 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import gzip
+import json
+import os
+
+# Versión del formato compacto: los flujos y las rutas se guardan una sola vez en columnas
+# (listas paralelas) y las vistas anidadas anteriores se derivan cuando se piden
+VERSION_FORMATO = 1
+
+ARCHIVO_RESULTADOS = 'resultados_optimizacion.json'
+
+# Estado de una solución que cumple todas las restricciones sin optimalidad probada (plan
+# heurístico, o solver detenido por tiempo con una solución entera); no se guarda en la caché
+ESTADO_FACTIBLE = "Factible"
+
+# Estados con solución: se extraen sus rutas y se muestran en los reportes
+ESTADOS_CON_SOLUCION = ("Optimal", ESTADO_FACTIBLE)
+
+def es_compacto(resultados):
+    return resultados.get('formato') == VERSION_FORMATO
+
+def _tamaños(resultados):
+    familias = resultados['familias']
+    return dict(zip(familias['id'], familias['tamaño']))
+
+def vista_flujos_por_familia(resultados, familias=None):
+    # Vista anidada {id_familia: {tamaño_familia, origen, flujos}}; familias limita los grupos incluidos
+    columnas = resultados['familias']
+    vista = {
+        id_fam: {"tamaño_familia": h, "origen": origen, "flujos": []}
+        for id_fam, h, origen in zip(columnas['id'], columnas['tamaño'], columnas['origen'])
+        if familias is None or id_fam in familias
+    }
+    flujos = resultados['flujos']
+    for id_fam, i, j, cantidad in zip(flujos['familia'], flujos['desde'], flujos['hacia'], flujos['cantidad']):
+        if id_fam in vista:
+            vista[id_fam]["flujos"].append({
+                "desde": i,
+                "hacia": j,
+                "cantidad": cantidad,
+                "personas": vista[id_fam]["tamaño_familia"] * cantidad
+            })
+    return vista
+
+def iterar_rutas(resultados, desde=0, limite=None):
+    # Rutas con los campos de reporte_rutas, generadas bajo demanda desde las columnas
+    rutas = resultados['rutas']
+    tamaños = _tamaños(resultados)
+    hasta = len(rutas['familia']) if limite is None else min(len(rutas['familia']), desde + limite)
+    for indice in range(desde, hasta):
+        id_fam = rutas['familia'][indice]
+        ruta = rutas['ruta'][indice].split("->")
+        h = tamaños[id_fam]
+        cantidad = rutas['cantidad'][indice]
+        yield {
+            "id_familia": int(id_fam),
+            "tamaño_familia": h,
+            "familias_en_ruta": cantidad,
+            "personas_en_ruta": h * cantidad,
+            "ruta_str": rutas['ruta'][indice],
+            "num_nodos_ruta": len(ruta),
+            "distancia": rutas['distancia'][indice],
+            "origen": ruta[0],
+            "destino": ruta[-1]
+        }
+
+def total_rutas(resultados):
+    return len(resultados['rutas']['familia'])
+
+def expandir_resultados(resultados):
+    # Vista anidada completa (variables_X, resumen.flujos_por_familia y reporte_rutas) que usa la interfaz
+    if not es_compacto(resultados):
+        return resultados
+    expandidos = {clave: valor for clave, valor in resultados.items()
+                  if clave not in ('formato', 'familias', 'flujos', 'rutas')}
+    flujos_por_familia = vista_flujos_por_familia(resultados)
+    expandidos['variables_X'] = {id_fam: familia['flujos'] for id_fam, familia in flujos_por_familia.items()}
+    expandidos['resumen'] = dict(resultados['resumen'], flujos_por_familia=flujos_por_familia)
+    expandidos['reporte_rutas'] = list(iterar_rutas(resultados))
+    return expandidos
+
+def compactar_resultados(resultados):
+    # Convertir resultados guardados con el formato anidado anterior
+    if es_compacto(resultados):
+        return resultados
+    compactos = {clave: valor for clave, valor in resultados.items()
+                 if clave not in ('variables_X', 'resumen', 'reporte_rutas')}
+    compactos['formato'] = VERSION_FORMATO
+    compactos['resumen'] = {"nodos_activados": resultados.get('resumen', {}).get('nodos_activados', [])}
+    compactos['familias'] = {"id": [], "tamaño": [], "origen": []}
+    compactos['flujos'] = {"familia": [], "desde": [], "hacia": [], "cantidad": []}
+    for id_fam, familia in resultados.get('resumen', {}).get('flujos_por_familia', {}).items():
+        compactos['familias']['id'].append(id_fam)
+        compactos['familias']['tamaño'].append(familia['tamaño_familia'])
+        compactos['familias']['origen'].append(familia['origen'])
+        for flujo in familia['flujos']:
+            compactos['flujos']['familia'].append(id_fam)
+            compactos['flujos']['desde'].append(flujo['desde'])
+            compactos['flujos']['hacia'].append(flujo['hacia'])
+            compactos['flujos']['cantidad'].append(flujo['cantidad'])
+    compactos['rutas'] = {"familia": [], "ruta": [], "cantidad": [], "distancia": []}
+    for ruta in resultados.get('reporte_rutas', []):
+        compactos['rutas']['familia'].append(str(ruta['id_familia']))
+        compactos['rutas']['ruta'].append(ruta['ruta_str'])
+        compactos['rutas']['cantidad'].append(ruta['familias_en_ruta'])
+        compactos['rutas']['distancia'].append(ruta['distancia'])
+    return compactos
+
+def cargar_resultados_archivo(ruta=ARCHIVO_RESULTADOS):
+    # Resultados de un archivo JSON (o JSON.gz) en formato compacto; los archivos con el
+    # formato anidado anterior se convierten al leerlos
+    if os.path.exists(f"{ruta}.gz"):
+        with gzip.open(f"{ruta}.gz", 'rt', encoding='utf-8') as f:
+            return compactar_resultados(json.load(f))
+    if os.path.exists(ruta):
+        with open(ruta, 'r') as f:
+            return compactar_resultados(json.load(f))
+    return None
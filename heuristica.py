@@ -0,0 +1,436 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import heapq
+import time
+from pulp import LpContinuous, LpStatus, LpStatusOptimal, LpStatusNotSolved
+from optimizacion import ModeloOptimizacion, TOLERANCIA, descomponer_flujo
+from formato_resultados import ESTADO_FACTIBLE
+from configuracion_solver import ConfiguracionSolver, cargar_configuracion, depurar_estadisticas
+
+# Opciones por defecto del plan heurístico (datos['heuristica'] las sobrescribe)
+PARAMETROS_HEURISTICA = {
+    "tiempo_busqueda": 5.0,   # segundos como mucho de búsqueda local (el límite de tiempo del solver, si es menor, manda)
+    "max_pasadas": 50,        # movimientos de apertura o cierre de nodos aceptados como mucho
+    "cota_lp": True           # resolver la relajación lineal para estimar el gap del plan
+}
+
+# Extremos del flujo de personas de la reasignación (tuplas para no chocar con las etiquetas)
+FUENTE = ("fuente",)
+SUMIDERO = ("sumidero",)
+
+def flujo_costo_minimo(arcos, fuente, sumidero, cantidad):
+    # Caminos más cortos sucesivos con potenciales sobre arcos (desde, hacia, capacidad, costo) de
+    # costo no negativo; devuelve el flujo de cada arco y la cantidad enviada (puede ser menor)
+    destinos, capacidades, costos, salidas = [], [], [], {}
+    for desde, hacia, capacidad, costo in arcos:
+        for a, b, c, w in ((desde, hacia, capacidad, costo), (hacia, desde, 0, -costo)):
+            salidas.setdefault(a, []).append(len(destinos))
+            destinos.append(b)
+            capacidades.append(c)
+            costos.append(w)
+    potencial = {}
+    enviado = 0
+    while enviado < cantidad:
+        # Dijkstra con costos reducidos; solo los nodos cerrados antes que el sumidero actualizan su potencial
+        distancia = {fuente: 0.0}
+        previo = {}
+        cerrados = []
+        cola = [(0.0, -1, fuente)]
+        while cola:
+            # El índice del arco desempata sin comparar nodos de distinto tipo
+            d, _, nodo = heapq.heappop(cola)
+            if d > distancia[nodo]:
+                continue
+            cerrados.append(nodo)
+            if nodo == sumidero:
+                break
+            for arco in salidas.get(nodo, ()):
+                if capacidades[arco] <= TOLERANCIA:
+                    continue
+                vecino = destinos[arco]
+                nueva = d + costos[arco] + potencial.get(nodo, 0.0) - potencial.get(vecino, 0.0)
+                if nueva < distancia.get(vecino, float('inf')) - 1e-12:
+                    distancia[vecino] = nueva
+                    previo[vecino] = arco
+                    heapq.heappush(cola, (nueva, arco, vecino))
+        if sumidero not in previo:
+            break
+        for nodo in cerrados:
+            potencial[nodo] = potencial.get(nodo, 0.0) + distancia[nodo] - distancia[sumidero]
+        camino = []
+        nodo = sumidero
+        while nodo != fuente:
+            camino.append(previo[nodo])
+            nodo = destinos[previo[nodo] ^ 1]
+        delta = min(cantidad - enviado, min(capacidades[arco] for arco in camino))
+        for arco in camino:
+            capacidades[arco] -= delta
+            capacidades[arco ^ 1] += delta
+        enviado += delta
+    # El flujo de cada arco es la capacidad acumulada en su arco inverso
+    flujos = [(desde, hacia, capacidades[2 * indice + 1]) for indice, (desde, hacia, c, w) in enumerate(arcos)]
+    return flujos, enviado
+
+class _Plan:
+    # Familias de cada clase asignadas a cada camino (id_clase, nodos), personas que despacha
+    # (orígenes y tránsito) o recibe (centros seguros) cada nodo y nodos R/F abiertos
+    def __init__(self, abiertos=()):
+        self.familias = {}
+        self.carga = {}
+        self.abiertos = set(abiertos)
+
+    def copia(self):
+        plan = _Plan(self.abiertos)
+        plan.familias = dict(self.familias)
+        plan.carga = dict(self.carga)
+        return plan
+
+class ModeloHeuristico(ModeloOptimizacion):
+    # Plan preliminar sin solver MIP. Las clases de familias se asignan de mayor a menor tamaño
+    # de hogar a su camino más corto origen -> (tránsito) -> centro seguro con capacidad libre
+    # (alpha en el origen, beta en el tránsito, pi y gamma en la llegada); abrir un nodo cerrado
+    # suma su costo ac repartido entre las familias que podría recibir. Después, búsqueda local:
+    # reasignar familias a caminos más baratos entre los nodos abiertos y abrir o cerrar nodos
+    # mientras baje el costo total. La relajación lineal del modelo completo da la cota del gap
+    def __init__(self, datos, agrupar=True, enfoque="heuristico", poda=None):
+        super().__init__(datos, agrupar=agrupar, enfoque="determinista", poda=poda)
+        self.enfoque = enfoque
+        self.parametros = dict(PARAMETROS_HEURISTICA, **datos.get('heuristica', {}))
+        self.nodos_Y = self.datos['etiquetasR'] + self.datos['etiquetasF']
+        self.status = LpStatus[LpStatusNotSolved]
+        self.valor_objetivo = None
+        self.solucion_X = {}
+        self.solucion_Y = {}
+        self.informe = None
+        self._preparar_red()
+
+    def _preparar_red(self):
+        # Caminos origen -> R* -> F: sin arcos hacia orígenes ni desde centros seguros, así cada
+        # nodo del camino consume capacidad una sola vez con las personas que lleva
+        distancias = self.datos['distancias']
+        conjunto_A = set(self.datos['etiquetasA'])
+        self.conjunto_F = set(self.datos['etiquetasF'])
+        self.sucesores = {}
+        for id_fam, (h, ns) in self.familias.items():
+            if ns in self.sucesores:
+                continue
+            sucesores = {}
+            for i, j in self.arcos_familia[id_fam]:
+                if j not in conjunto_A and i not in self.conjunto_F:
+                    sucesores.setdefault(i, []).append((j, distancias[i][j]))
+            self.sucesores[ns] = sucesores
+        self.arcos_origen = {ns: {(i, j) for i, vecinos in sucesores.items() for j, distancia in vecinos}
+                             for ns, sucesores in self.sucesores.items()}
+        # Arcos utilizables por algún origen, para la reasignación conjunta por flujo de costo mínimo
+        self.arcos_utiles = {(i, j): distancia for sucesores in self.sucesores.values()
+                             for i, vecinos in sucesores.items() for j, distancia in vecinos}
+        self.personas = {}
+        for id_fam, (h, ns) in self.familias.items():
+            self.personas[ns] = self.personas.get(ns, 0) + h * int(self.datos['idf'][id_fam]['valor'])
+
+        gamma = self.datos.get('gamma', 0)
+        self.capacidad = {ns: self.datos.get('alpha', 0) for ns in self.datos['etiquetasA']}
+        self.capacidad.update({nt: self.datos.get('beta', 0) for nt in self.datos['etiquetasR']})
+        self.capacidad.update({nll: min(self.datos['pi'].get(nll, 0), gamma) for nll in self.datos['etiquetasF']})
+        self.costo_apertura = {rf: self.datos['ac'].get(rf, 0) for rf in self.nodos_Y}
+
+    def admite_actualizacion(self, datos):
+        # Cada resolución rehace el plan
+        return False
+
+    def construir(self):
+        # El modelo de PuLP solo se construye para la cota lineal (_cota_lp)
+        return
+
+    def resolver(self, solver=None, progreso=None, inicio_mip=False, perfilar=None):
+        # Solo con ConfiguracionSolver: la cota lineal usa el backend y el límite de tiempo configurados
+        if solver is None:
+            solver = cargar_configuracion()
+        if not isinstance(solver, ConfiguracionSolver):
+            raise ValueError("El plan heurístico necesita una ConfiguracionSolver")
+        return super().resolver(solver, progreso, inicio_mip, perfilar)
+
+    def _libre(self, plan, nodo):
+        return self.capacidad[nodo] - plan.carga.get(nodo, 0)
+
+    def _costo_camino(self, id_fam, camino):
+        # Costo de ruta de una familia de la clase por el camino
+        distancias = self.datos['distancias']
+        h = self.familias[id_fam][0]
+        return self.datos['costoPorKm'] * h * sum(distancias[i][j] for i, j in zip(camino, camino[1:]))
+
+    def _costo(self, plan):
+        return (sum(familias * self._costo_camino(id_fam, camino) for (id_fam, camino), familias in plan.familias.items())
+                + sum(self.costo_apertura[rf] for rf in plan.abiertos))
+
+    def _mover(self, plan, id_fam, camino, familias):
+        # Sumar (o restar, con familias < 0) familias de la clase al camino
+        if not familias:
+            return
+        h = self.familias[id_fam][0]
+        clave = (id_fam, camino)
+        total = plan.familias.get(clave, 0) + familias
+        if total:
+            plan.familias[clave] = total
+        else:
+            del plan.familias[clave]
+        for nodo in camino:
+            plan.carga[nodo] = plan.carga.get(nodo, 0) + h * familias
+        if familias > 0:
+            plan.abiertos.update(camino[1:])
+
+    def _cerrar_sin_uso(self, plan):
+        plan.abiertos = {rf for rf in plan.abiertos if plan.carga.get(rf, 0) > 0}
+
+    def _camino(self, plan, id_fam, pendientes, prohibidos=(), abrir=True):
+        # Dijkstra desde el origen de la clase hasta el centro seguro más barato, pasando solo por
+        # nodos con capacidad para una familia más; sin abrir, solo por nodos ya abiertos
+        h, ns = self.familias[id_fam]
+        if self._libre(plan, ns) < h:
+            return None
+        factor = self.datos['costoPorKm'] * h
+        sucesores = self.sucesores[ns]
+        mejores = {ns: 0.0}
+        previos = {}
+        cola = [(0.0, ns)]
+        while cola:
+            costo, nodo = heapq.heappop(cola)
+            if costo > mejores[nodo]:
+                continue
+            if nodo in self.conjunto_F:
+                camino = [nodo]
+                while camino[-1] != ns:
+                    camino.append(previos[camino[-1]])
+                return tuple(reversed(camino))
+            for vecino, distancia in sucesores.get(nodo, ()):
+                if vecino in prohibidos:
+                    continue
+                libre = self._libre(plan, vecino)
+                if libre < h:
+                    continue
+                nuevo = costo + factor * distancia
+                if vecino not in plan.abiertos:
+                    if not abrir:
+                        continue
+                    nuevo += self.costo_apertura[vecino] / max(1, min(pendientes, libre // h))
+                if nuevo < mejores.get(vecino, float('inf')):
+                    mejores[vecino] = nuevo
+                    previos[vecino] = nodo
+                    heapq.heappush(cola, (nuevo, vecino))
+        return None
+
+    def _asignar(self, plan, pendientes, prohibidos=()):
+        # Asignar (id_clase, familias) de mayor a menor tamaño de hogar; False si alguna no cabe
+        for id_fam, familias in sorted(pendientes, key=lambda pendiente: -self.familias[pendiente[0]][0]):
+            h = self.familias[id_fam][0]
+            while familias > 0:
+                camino = self._camino(plan, id_fam, familias, prohibidos)
+                if camino is None:
+                    return False
+                cantidad = min(familias, int(min(self._libre(plan, nodo) for nodo in camino) // h))
+                self._mover(plan, id_fam, camino, cantidad)
+                familias -= cantidad
+        return True
+
+    def _voraz(self):
+        plan = _Plan()
+        pendientes = [(id_fam, int(self.datos['idf'][id_fam]['valor'])) for id_fam in self.familias]
+        if not self._asignar(plan, pendientes):
+            return None
+        self._cerrar_sin_uso(plan)
+        return plan
+
+    def _mejorar_rutas(self, plan, limite):
+        # Pasar familias a caminos más baratos entre los nodos abiertos hasta que no haya mejora
+        mejora = True
+        while mejora and time.perf_counter() < limite:
+            mejora = False
+            for id_fam, camino in sorted(plan.familias, key=lambda clave: -self._costo_camino(*clave)):
+                familias = plan.familias.get((id_fam, camino), 0)
+                if not familias:
+                    continue
+                self._mover(plan, id_fam, camino, -familias)
+                nuevo = self._camino(plan, id_fam, familias, abrir=False)
+                if nuevo is not None and self._costo_camino(id_fam, nuevo) < self._costo_camino(id_fam, camino) - TOLERANCIA:
+                    cantidad = min(familias, int(min(self._libre(plan, nodo) for nodo in nuevo) // self.familias[id_fam][0]))
+                    self._mover(plan, id_fam, nuevo, cantidad)
+                    self._mover(plan, id_fam, camino, familias - cantidad)
+                    mejora = True
+                else:
+                    self._mover(plan, id_fam, camino, familias)
+        self._cerrar_sin_uso(plan)
+
+    def _rutear(self, abiertos, limite):
+        # Reasignación con los nodos abiertos fijos: flujo de personas de costo mínimo (R con
+        # capacidad beta, F con min(pi, gamma)), repartido en familias enteras por camino; las
+        # familias que no caben en ningún camino del flujo se asignan con el voraz
+        conjunto_R = set(self.datos['etiquetasR'])
+        arcos = [(FUENTE, ns, min(personas, self.capacidad[ns]), 0.0) for ns, personas in self.personas.items()]
+        for nodo in abiertos:
+            if nodo in conjunto_R:
+                arcos.append((nodo, (nodo, "salida"), self.capacidad[nodo], 0.0))
+            else:
+                arcos.append((nodo, SUMIDERO, self.capacidad[nodo], 0.0))
+        costo_por_km = self.datos['costoPorKm']
+        for (i, j), distancia in self.arcos_utiles.items():
+            if i in abiertos or i in self.personas:
+                if j in abiertos:
+                    arcos.append(((i, "salida") if i in conjunto_R else i, j, None, costo_por_km * distancia))
+        total = sum(self.personas.values())
+        arcos = [(i, j, total if capacidad is None else capacidad, costo) for i, j, capacidad, costo in arcos]
+        flujos, enviado = flujo_costo_minimo(arcos, FUENTE, SUMIDERO, total)
+        if enviado < total - TOLERANCIA:
+            return None
+
+        # Caminos del flujo por origen, de menor a mayor costo por persona
+        caminos = {}
+        for ruta, personas in descomponer_flujo(FUENTE, flujos):
+            if ruta[-1] != SUMIDERO:
+                continue
+            camino = tuple(nodo for nodo in ruta[1:] if not isinstance(nodo, tuple))
+            caminos.setdefault(camino[0], []).append([camino, personas])
+
+        plan = _Plan(abiertos)
+        pendientes = []
+        for id_fam in sorted(self.familias, key=lambda id_fam: -self.familias[id_fam][0]):
+            h, ns = self.familias[id_fam]
+            familias = int(self.datos['idf'][id_fam]['valor'])
+            for entrada in sorted(caminos.get(ns, []), key=lambda entrada: self._costo_camino(id_fam, entrada[0])):
+                camino, personas = entrada
+                if familias <= 0:
+                    break
+                # El flujo conjunto puede llevar personas de un origen por arcos que su poda descartó
+                if not all(arco in self.arcos_origen[ns] for arco in zip(camino, camino[1:])):
+                    continue
+                cantidad = min(familias, int(personas + TOLERANCIA) // h)
+                if cantidad > 0:
+                    self._mover(plan, id_fam, camino, cantidad)
+                    entrada[1] -= cantidad * h
+                    familias -= cantidad
+            if familias > 0:
+                pendientes.append((id_fam, familias))
+        if not self._asignar(plan, pendientes):
+            return None
+        self._mejorar_rutas(plan, limite)
+        return plan
+
+    def _busqueda_local(self, plan, limite):
+        # Primer movimiento de cierre (los nodos más caros por persona atendida primero) o de
+        # apertura (los más baratos primero) cuya reasignación baja el costo; se repite hasta que
+        # ninguno mejora o se acaba el tiempo
+        movimientos = {"cierres": 0, "aperturas": 0}
+        sin_uso = set(self.estadisticas_poda['nodos_sin_uso'])
+        costo = self._costo(plan)
+        for _ in range(int(self.parametros['max_pasadas'])):
+            cerrados = [rf for rf in self.nodos_Y if rf not in plan.abiertos and rf not in sin_uso and self.capacidad[rf] > 0]
+            candidatos = ([("cierres", plan.abiertos - {rf}) for rf in
+                           sorted(plan.abiertos, key=lambda rf: -self.costo_apertura[rf] / plan.carga[rf])]
+                          + [("aperturas", plan.abiertos | {rf}) for rf in sorted(cerrados, key=self.costo_apertura.get)])
+            mejora = False
+            for tipo, abiertos in candidatos:
+                if time.perf_counter() >= limite:
+                    return plan, movimientos
+                candidato = self._rutear(abiertos, limite)
+                if candidato is None:
+                    continue
+                costo_candidato = self._costo(candidato)
+                if costo_candidato < costo - TOLERANCIA:
+                    plan, costo = candidato, costo_candidato
+                    movimientos[tipo] += 1
+                    mejora = True
+                    break
+            if not mejora:
+                break
+        return plan, movimientos
+
+    def planificar(self, limite_tiempo=None):
+        # Plan voraz y búsqueda local; guarda la solución y devuelve el informe del plan
+        inicio = time.perf_counter()
+        tiempo_busqueda = float(self.parametros['tiempo_busqueda'])
+        if limite_tiempo is not None:
+            tiempo_busqueda = min(tiempo_busqueda, limite_tiempo)
+        limite = inicio + tiempo_busqueda
+        informe = {"costo_voraz": None, "costo": None, "movimientos": None}
+
+        plan = self._voraz()
+        if plan is not None:
+            informe["costo_voraz"] = self._costo(plan)
+            self._mejorar_rutas(plan, limite)
+            reasignado = self._rutear(plan.abiertos, limite)
+            if reasignado is not None and self._costo(reasignado) < self._costo(plan):
+                plan = reasignado
+        else:
+            # El voraz puede atascarse con capacidades muy justas: el flujo conjunto con todos
+            # los nodos utilizables abiertos reparte la capacidad sin ese problema
+            sin_uso = set(self.estadisticas_poda['nodos_sin_uso'])
+            plan = self._rutear({rf for rf in self.nodos_Y if rf not in sin_uso and self.capacidad[rf] > 0}, limite)
+        if plan is not None:
+            plan, informe["movimientos"] = self._busqueda_local(plan, limite)
+            self._guardar_plan(plan)
+            informe["costo"] = self.valor_objetivo
+        informe["tiempo"] = time.perf_counter() - inicio
+        informe["tiempo_agotado"] = time.perf_counter() >= limite
+        return informe
+
+    def _guardar_plan(self, plan):
+        self.solucion_X = {}
+        for (id_fam, camino), familias in plan.familias.items():
+            h = self.familias[id_fam][0]
+            for i, j in zip(camino, camino[1:]):
+                clave = (id_fam, h, i, j)
+                self.solucion_X[clave] = self.solucion_X.get(clave, 0) + familias
+        self.solucion_Y = {rf: int(rf in plan.abiertos) for rf in self.nodos_Y}
+        self.valor_objetivo = self._costo(plan)
+        # Factible pero sin optimalidad probada: solo la cota lineal puede cerrar el gap
+        self.status = ESTADO_FACTIBLE
+
+    def _cota_lp(self, configuracion, ruta_log):
+        # Relajación lineal del modelo completo (X e Y continuas): su óptimo acota el de cualquier plan
+        ModeloOptimizacion.construir(self)
+        for var in list(self.X.values()) + list(self.Y.values()):
+            var.cat = LpContinuous
+        super().ejecutar_solver(configuracion.con_cambios(inicio_heuristico=False), ruta_log, inicio_mip=False)
+        if self.problema.status != LpStatusOptimal:
+            return None
+        return self.problema.objective.value()
+
+    def ejecutar_solver(self, configuracion, ruta_log, inicio_mip):
+        # inicio_mip no se usa: el plan se construye siempre desde cero
+        inicio = time.perf_counter()
+        informe = self.planificar(configuracion.limite_tiempo)
+        cota = None
+        if self.status == ESTADO_FACTIBLE and self.parametros['cota_lp']:
+            restante = configuracion
+            if configuracion.limite_tiempo is not None:
+                restante = configuracion.con_cambios(
+                    limite_tiempo=max(1.0, configuracion.limite_tiempo - (time.perf_counter() - inicio)))
+            cota = self._cota_lp(restante, ruta_log)
+        gap = None
+        if cota is not None:
+            cota = min(cota, self.valor_objetivo)
+            gap = (self.valor_objetivo - cota) / max(abs(self.valor_objetivo), TOLERANCIA)
+            if gap <= TOLERANCIA:
+                self.status = LpStatus[LpStatusOptimal]
+        self.informe = dict(informe, cota_lp=cota, gap=gap)
+        return depurar_estadisticas({
+            "tiempo_pared": time.perf_counter() - inicio,
+            "nodos": None,
+            "gap": gap,
+            "cota": cota,
+            "incumbente": self.valor_objetivo
+        })
+
+    def extraer_resultados(self):
+        resultados = super().extraer_resultados()
+        resultados['heuristica'] = self.informe
+        return resultados
+
+    def estado_solucion(self):
+        return self.status, self.valor_objetivo
+
+    def valores_X(self):
+        return iter(self.solucion_X.items())
+
+    def valores_Y(self):
+        for rf in self.nodos_Y:
+            yield rf, self.solucion_Y.get(rf)
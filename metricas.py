@@ -0,0 +1,158 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import cProfile
+import io
+import os
+import pstats
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # En Windows no existe el módulo resource y no se informa la memoria pico
+    resource = None
+
+# Límites (en segundos) de las cubetas de los histogramas de duración
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+@contextmanager
+def medir_fase(tiempos, fase):
+    # Acumular en tiempos[fase] la duración del bloque
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[fase] = tiempos.get(fase, 0.0) + time.perf_counter() - inicio
+
+def memoria_pico():
+    # Memoria residente máxima (MB) de este proceso y de los procesos hijos ya terminados
+    # (por ejemplo el ejecutable del solver)
+    if resource is None:
+        return {"proceso_mb": None, "hijos_mb": None}
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        "proceso_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor, 1),
+        "hijos_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor, 1)
+    }
+
+def perfil_activado():
+    return os.environ.get('OPTIMIZACION_PERFIL', '0') not in ('', '0')
+
+def ejecutar_con_perfil(funcion, *args, lineas=30, **kwargs):
+    # Ejecutar funcion bajo cProfile; devuelve su resultado y las funciones más costosas por
+    # tiempo acumulado. Con OPTIMIZACION_PERFIL_DIR se guarda además el perfil completo (.prof)
+    perfil = cProfile.Profile()
+    resultado = perfil.runcall(funcion, *args, **kwargs)
+    salida = io.StringIO()
+    pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(lineas)
+    informe = {"resumen": salida.getvalue()}
+    directorio = os.environ.get('OPTIMIZACION_PERFIL_DIR')
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+        informe["archivo"] = os.path.join(directorio, f"perfil_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.prof")
+        perfil.dump_stats(informe["archivo"])
+    return resultado, informe
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _etiquetas_texto(etiquetas, extra=()):
+    pares = list(etiquetas) + list(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{clave}="{_escapar(valor)}"' for clave, valor in pares) + "}"
+
+def _numero(valor):
+    if valor == float('inf'):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+def etiqueta_worker():
+    # Proceso que atiende /metrics: con varios workers (gunicorn -w 4) cada uno tiene su propio
+    # registro y cada respuesta solo incluye sus series
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class RegistroMetricas:
+    def __init__(self):
+        # Contadores, medidores e histogramas en memoria del proceso, exportables en formato de
+        # texto de Prometheus; todas las series llevan la etiqueta worker para sumarlas entre workers
+        self._lock = threading.Lock()
+        self._descripciones = {}
+        self._series = {}
+
+    def describir(self, nombre, tipo, ayuda, limites=LIMITES_SEGUNDOS):
+        self._descripciones[nombre] = (tipo, ayuda, tuple(limites) if tipo == "histogram" else None)
+        self._series.setdefault(nombre, {})
+
+    def incrementar(self, nombre, valor=1, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            series = self._series[nombre]
+            series[clave] = series.get(clave, 0) + valor
+
+    def fijar(self, nombre, valor, **etiquetas):
+        with self._lock:
+            self._series[nombre][tuple(sorted(etiquetas.items()))] = valor
+
+    def observar(self, nombre, valor, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        limites = self._descripciones[nombre][2]
+        with self._lock:
+            serie = self._series[nombre].get(clave)
+            if serie is None:
+                serie = self._series[nombre][clave] = {"cubetas": [0] * len(limites), "suma": 0.0, "cuenta": 0}
+            for indice, limite in enumerate(limites):
+                if valor <= limite:
+                    serie["cubetas"][indice] += 1
+            serie["suma"] += valor
+            serie["cuenta"] += 1
+
+    def exportar(self):
+        lineas = []
+        worker = [("worker", etiqueta_worker())]
+        with self._lock:
+            for nombre, (tipo, ayuda, limites) in self._descripciones.items():
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+                for clave, valor in sorted(self._series[nombre].items()):
+                    if tipo != "histogram":
+                        if valor is not None:
+                            lineas.append(f"{nombre}{_etiquetas_texto(clave, worker)} {_numero(valor)}")
+                        continue
+                    # Las cubetas de Prometheus son acumulativas
+                    for limite, cuenta in zip(limites, valor["cubetas"]):
+                        lineas.append(f"{nombre}_bucket{_etiquetas_texto(clave, worker + [('le', _numero(float(limite)))])} {cuenta}")
+                    lineas.append(f"{nombre}_bucket{_etiquetas_texto(clave, worker + [('le', '+Inf')])} {valor['cuenta']}")
+                    lineas.append(f"{nombre}_sum{_etiquetas_texto(clave, worker)} {_numero(valor['suma'])}")
+                    lineas.append(f"{nombre}_count{_etiquetas_texto(clave, worker)} {valor['cuenta']}")
+        return "\n".join(lineas) + "\n"
+
+registro = RegistroMetricas()
+registro.describir("http_peticiones_total", "counter", "Peticiones HTTP atendidas por ruta, método y código")
+registro.describir("http_peticion_duracion_segundos", "histogram", "Latencia de las peticiones HTTP por ruta y método")
+registro.describir("optimizacion_resoluciones_total", "counter", "Resoluciones del modelo por estado del solver")
+registro.describir("optimizacion_fase_duracion_segundos", "histogram", "Duración de cada fase de la resolución")
+registro.describir("optimizacion_modelo_tamano", "gauge", "Tamaño del último modelo resuelto (variables, restricciones, no_ceros)")
+registro.describir("optimizacion_memoria_pico_mb", "gauge", "Memoria residente máxima del proceso que resolvió el último modelo y de sus hijos (solver)")
+registro.describir("cache_resultados", "gauge", "Estado de la caché de resultados")
+registro.describir("cache_reportes", "gauge", "Estado de la caché de informes exportados")
+registro.describir("reportes_generacion_segundos", "histogram", "Duración de la generación de cada informe por formato")
+
+def registrar_resolucion(metricas, status=None):
+    # Incorporar al registro las métricas de una resolución (también las que llegan de otro proceso)
+    registro.incrementar("optimizacion_resoluciones_total", status=status or "desconocido")
+    for fase, duracion in metricas.get('fases', {}).items():
+        registro.observar("optimizacion_fase_duracion_segundos", duracion, fase=fase)
+    for medida, valor in metricas.get('modelo', {}).items():
+        registro.fijar("optimizacion_modelo_tamano", valor, medida=medida)
+    for proceso, valor in metricas.get('memoria_pico_mb', {}).items():
+        registro.fijar("optimizacion_memoria_pico_mb", valor, proceso=proceso.replace('_mb', ''))
+
+def registrar_peticion(ruta, metodo, codigo, duracion):
+    registro.incrementar("http_peticiones_total", ruta=ruta, metodo=metodo, codigo=str(codigo))
+    registro.observar("http_peticion_duracion_segundos", duracion, ruta=ruta, metodo=metodo)
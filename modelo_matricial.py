@@ -0,0 +1,474 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import os
+import subprocess
+import tempfile
+import time
+import numpy as np
+from scipy import sparse
+from scipy.optimize import milp, Bounds, LinearConstraint
+from pulp import LpStatus, LpStatusOptimal, LpStatusInfeasible, LpStatusUnbounded, LpStatusNotSolved, LpSolutionOptimal
+from optimizacion import ModeloOptimizacion
+from formato_resultados import ESTADO_FACTIBLE, ESTADOS_CON_SOLUCION
+from configuracion_solver import ConfiguracionSolver, cargar_configuracion, depurar_estadisticas
+
+try:
+    import highspy
+except ImportError:
+    # Sin highspy se resuelve con scipy.optimize.milp, que también usa HiGHS
+    highspy = None
+
+# Tipos de nodo en el orden de self.etiquetas (A, R, F)
+SALIDA, TRANSITO, LLEGADA = 0, 1, 2
+
+# Estados de HiGHS; al detenerse por un límite la mejor solución encontrada es factible, no
+# óptima (si no hay ninguna, el modelo queda sin resolver)
+ESTADOS_HIGHS = {
+    "kOptimal": LpStatus[LpStatusOptimal],
+    "kObjectiveBound": ESTADO_FACTIBLE,
+    "kObjectiveTarget": ESTADO_FACTIBLE,
+    "kTimeLimit": ESTADO_FACTIBLE,
+    "kIterationLimit": ESTADO_FACTIBLE,
+    "kInfeasible": LpStatus[LpStatusInfeasible],
+    "kUnboundedOrInfeasible": LpStatus[LpStatusInfeasible],
+    "kUnbounded": LpStatus[LpStatusUnbounded]
+}
+
+# Estados de scipy.optimize.milp: 0 óptimo, 1 límite alcanzado, 2 infactible, 3 no acotado
+ESTADOS_SCIPY = {0: LpStatus[LpStatusOptimal], 1: ESTADO_FACTIBLE, 2: LpStatus[LpStatusInfeasible],
+                 3: LpStatus[LpStatusUnbounded]}
+
+class ModeloMatricial(ModeloOptimizacion):
+    # Misma formulación que ModeloOptimizacion emitida directamente como matriz dispersa a partir
+    # de una tabla de índices de arco, sin LpVariable ni expresiones de PuLP: la memoria del
+    # modelo crece con el número de no ceros. Se resuelve con HiGHS (highspy o scipy) o con CBC
+    # sobre un archivo MPS, y la solución se decodifica en la misma estructura de resultados
+    def __init__(self, datos, agrupar=True, enfoque="determinista", poda=None):
+        super().__init__(datos, agrupar=agrupar, enfoque=enfoque, poda=poda)
+        self.status = LpStatus[LpStatusNotSolved]
+        self.valor_objetivo = None
+        self.solucion = None
+
+    def admite_actualizacion(self, datos):
+        # Las actualizaciones en el sitio modifican objetos de PuLP que este modelo no tiene
+        return False
+
+    def crear_variables(self):
+        # Columnas X: una por familia y arco que puede usar, descritas por arrays paralelos
+        # (familia, arco, nodos y tamaño); después, una columna Y por nodo R y F
+        num_A = len(self.datos['etiquetasA'])
+        num_R = len(self.datos['etiquetasR'])
+        indice_nodo = {nodo: n for n, nodo in enumerate(self.etiquetas)}
+        indice_arco = {arco: a for a, arco in enumerate(self.arcos)}
+        self.tipo_nodo = np.repeat([SALIDA, TRANSITO, LLEGADA], [num_A, num_R, len(self.datos['etiquetasF'])])
+        arco_desde = np.array([indice_nodo[i] for i, j in self.arcos], dtype=np.int64)
+        arco_hacia = np.array([indice_nodo[j] for i, j in self.arcos], dtype=np.int64)
+        self.distancia_arco = np.array([self.datos['distancias'][i][j] for i, j in self.arcos], dtype=float)
+
+        # Las familias de un mismo origen comparten la lista de arcos
+        arcos_origen = {}
+        arcos = [np.zeros(0, dtype=np.int64)]
+        familias = [np.zeros(0, dtype=np.int64)]
+        for k, (id_fam, (h, ns)) in enumerate(self.familias.items()):
+            if ns not in arcos_origen:
+                arcos_origen[ns] = np.array([indice_arco[arco] for arco in self.arcos_familia[id_fam]], dtype=np.int64)
+            arcos.append(arcos_origen[ns])
+            familias.append(np.full(len(arcos_origen[ns]), k, dtype=np.int64))
+        self.claves_familia = list(self.familias)
+        self.col_arco = np.concatenate(arcos)
+        self.col_familia = np.concatenate(familias)
+        self.col_desde = arco_desde[self.col_arco]
+        self.col_hacia = arco_hacia[self.col_arco]
+        tamaños = np.array([h for h, ns in self.familias.values()], dtype=float)
+        origenes = np.array([indice_nodo[ns] for h, ns in self.familias.values()], dtype=np.int64)
+        self.col_h = tamaños[self.col_familia]
+        self.col_origen = origenes[self.col_familia]
+        self.num_X = len(self.col_arco)
+
+        # Las Y siguen el orden de los nodos tras los de salida; los nodos sin uso no se activan
+        self.nodos_Y = self.datos['etiquetasR'] + self.datos['etiquetasF']
+        self.primera_Y = self.num_X - num_A
+        sin_uso = set(self.estadisticas_poda['nodos_sin_uso'])
+        self.num_enteras = self.num_X + len(self.nodos_Y)
+        self.num_columnas = self.num_enteras
+        self.columnas_superior = np.concatenate([
+            np.full(self.num_X, np.inf),
+            np.array([0.0 if rf in sin_uso else 1.0 for rf in self.nodos_Y])
+        ])
+
+    def definir_funcion_objetivo(self):
+        # c*d(i,j)*h por cada X y Ac(rf) por cada Y; las columnas auxiliares no tienen costo
+        self.costos = np.concatenate([
+            self.datos['costoPorKm'] * self.distancia_arco[self.col_arco] * self.col_h,
+            np.array([self.datos['ac'].get(rf, 0) for rf in self.nodos_Y], dtype=float)
+        ])
+
+    def _filas_nuevas(self, cantidad, inferior, superior):
+        # Reservar filas con sus límites y devolver sus índices
+        primera = self.num_filas
+        self.num_filas += cantidad
+        self._limites_filas.append((
+            np.broadcast_to(np.asarray(inferior, dtype=float), (cantidad,)),
+            np.broadcast_to(np.asarray(superior, dtype=float), (cantidad,))
+        ))
+        return np.arange(primera, primera + cantidad)
+
+    def _columnas_nuevas(self, cantidad):
+        # Columnas continuas no negativas (variables auxiliares de la contraparte robusta)
+        primera = self.num_columnas
+        self.num_columnas += cantidad
+        return np.arange(primera, primera + cantidad)
+
+    def _coeficientes(self, filas, columnas, valores):
+        filas = np.asarray(filas, dtype=np.int64)
+        self._entradas.append((filas, np.asarray(columnas, dtype=np.int64),
+                               np.broadcast_to(np.asarray(valores, dtype=float), filas.shape)))
+
+    def _filas_familia_nodo(self, tipo, inferior, superior, signo_entrada, signo_salida):
+        # Una fila por familia y nodo del tipo dado que la familia puede usar:
+        # signo_entrada * sum(X entrantes) + signo_salida * sum(X salientes)
+        num_nodos = len(self.etiquetas)
+        entra = np.flatnonzero(self.tipo_nodo[self.col_hacia] == tipo)
+        sale = np.flatnonzero(self.tipo_nodo[self.col_desde] == tipo)
+        clave_entra = self.col_familia[entra] * num_nodos + self.col_hacia[entra]
+        clave_sale = self.col_familia[sale] * num_nodos + self.col_desde[sale]
+        claves = np.unique(np.concatenate([clave_entra, clave_sale]))
+        filas = self._filas_nuevas(len(claves), inferior, superior)
+        self._coeficientes(filas[np.searchsorted(claves, clave_entra)], entra, signo_entrada)
+        self._coeficientes(filas[np.searchsorted(claves, clave_sale)], sale, signo_salida)
+
+    def _filas_capacidad(self, tipo, rhs, terminos, capacidad_nodo=None, desviacion_capacidad=0):
+        # Una fila de capacidad en personas por nodo del tipo dado:
+        # sum(signo*h*X de terminos) - capacidad_nodo*Y <= rhs; cada término es
+        # (columnas X, nodo al que se asocia cada columna, signo)
+        nodos = np.flatnonzero(self.tipo_nodo == tipo)
+        filas_nodo = self._filas_nuevas(len(nodos), -np.inf, rhs)
+        fila_de_nodo = np.full(len(self.etiquetas), -1, dtype=np.int64)
+        fila_de_nodo[nodos] = filas_nodo
+
+        filas, columnas, valores = [], [], []
+        for columnas_termino, nodo_columna, signo in terminos:
+            filas.append(fila_de_nodo[nodo_columna[columnas_termino]])
+            columnas.append(columnas_termino)
+            valores.append(signo * self.col_h[columnas_termino])
+        filas, columnas, valores = np.concatenate(filas), np.concatenate(columnas), np.concatenate(valores)
+        self._coeficientes(filas, columnas, valores)
+
+        columnas_Y = None
+        if capacidad_nodo is not None:
+            columnas_Y = self.primera_Y + nodos
+            self._coeficientes(filas_nodo, columnas_Y, -np.asarray(capacidad_nodo, dtype=float))
+        if self.robusto is not None:
+            self._proteger(filas, columnas, valores, filas_nodo, columnas_Y, capacidad_nodo, desviacion_capacidad)
+
+    def _proteger(self, filas, columnas, valores, filas_nodo, columnas_Y, capacidad_nodo, desviacion_capacidad):
+        # Contraparte robusta de las filas de capacidad, igual que ModeloOptimizacion._agregar_capacidad:
+        #   nominal + Γ*z + sum(p_k) <= rhs,   z + p_k >= desviación_k,   z, p_k >= 0
+        desviacion_valor = self.robusto['desviacion_valor']
+        principales, auxiliares, protecciones = [], [], []
+
+        # Una protección por fila y familia con términos en ella
+        if desviacion_valor and len(filas):
+            num_familias = len(self.claves_familia)
+            pares, par_de_entrada = np.unique(filas * num_familias + self.col_familia[columnas], return_inverse=True)
+            p = self._columnas_nuevas(len(pares))
+            filas_proteccion = self._filas_nuevas(len(pares), 0, np.inf)
+            self._coeficientes(filas_proteccion[par_de_entrada], columnas, -desviacion_valor * valores)
+            self._coeficientes(filas_proteccion, p, 1)
+            principales.append(pares // num_familias)
+            auxiliares.append(p)
+            protecciones.append(filas_proteccion)
+
+        # Caída de la capacidad de cada nodo
+        if columnas_Y is not None and desviacion_capacidad:
+            p = self._columnas_nuevas(len(filas_nodo))
+            filas_proteccion = self._filas_nuevas(len(filas_nodo), 0, np.inf)
+            self._coeficientes(filas_proteccion, columnas_Y, -desviacion_capacidad * np.asarray(capacidad_nodo, dtype=float))
+            self._coeficientes(filas_proteccion, p, 1)
+            principales.append(filas_nodo)
+            auxiliares.append(p)
+            protecciones.append(filas_proteccion)
+
+        if not principales:
+            return
+        principales, auxiliares, protecciones = (np.concatenate(principales), np.concatenate(auxiliares),
+                                                 np.concatenate(protecciones))
+        # Una z por fila con alguna protección
+        filas_z, z_de_proteccion = np.unique(principales, return_inverse=True)
+        z = self._columnas_nuevas(len(filas_z))
+        self._coeficientes(filas_z, z, self.robusto['presupuesto'])
+        self._coeficientes(principales, auxiliares, 1)
+        self._coeficientes(protecciones, z[z_de_proteccion], 1)
+
+    def agregar_restricciones(self):
+        # Las mismas familias de restricciones que ModeloOptimizacion, por bloques de filas
+        self.num_filas = 0
+        self._entradas = []
+        self._limites_filas = []
+        tipo_desde = self.tipo_nodo[self.col_desde]
+        tipo_hacia = self.tipo_nodo[self.col_hacia]
+        num_familias = len(self.claves_familia)
+
+        # Robust_Salidas_C1: salidas - entradas del origen de cada familia = valor
+        valores = np.array([self.datos['idf'][id_fam]['valor'] for id_fam in self.claves_familia], dtype=float)
+        filas = self._filas_nuevas(num_familias, valores, valores)
+        sale = np.flatnonzero(self.col_desde == self.col_origen)
+        entra = np.flatnonzero(self.col_hacia == self.col_origen)
+        self._coeficientes(filas[self.col_familia[sale]], sale, 1)
+        self._coeficientes(filas[self.col_familia[entra]], entra, -1)
+
+        # capac_llegada_origen
+        self._filas_capacidad(SALIDA, self.datos.get('alpha', 0),
+                              [(np.flatnonzero(tipo_desde == SALIDA), self.col_desde, 1)])
+
+        # Robust_Flujo_Transito
+        self._filas_familia_nodo(TRANSITO, 0, 0, 1, -1)
+
+        # cap_llegada_punto_transito
+        num_R = len(self.datos['etiquetasR'])
+        self._filas_capacidad(TRANSITO, 0, [(np.flatnonzero(tipo_desde == TRANSITO), self.col_desde, 1)],
+                              capacidad_nodo=np.full(num_R, self.datos.get('beta', 0), dtype=float))
+
+        # Robust_Llegada_C2
+        pi = np.array([self.datos['pi'].get(nll, 0) for nll in self.datos['etiquetasF']], dtype=float)
+        self._filas_capacidad(
+            LLEGADA, 0,
+            [(np.flatnonzero(tipo_hacia == LLEGADA), self.col_hacia, 1),
+             (np.flatnonzero(tipo_desde == LLEGADA), self.col_desde, -1)],
+            capacidad_nodo=pi,
+            desviacion_capacidad=self.robusto['desviacion_pi'] if self.robusto else 0
+        )
+
+        # cap_llegada_centro_seguro
+        self._filas_capacidad(LLEGADA, self.datos.get('gamma', 0),
+                              [(np.flatnonzero(tipo_hacia == LLEGADA), self.col_hacia, 1)])
+
+        # Equilibrio1: +(A->RF) -(RF->A) -(AR->F) +(F->AR) por familia
+        coeficiente = (
+            ((tipo_desde == SALIDA) & (tipo_hacia != SALIDA)).astype(int)
+            - ((tipo_desde != SALIDA) & (tipo_hacia == SALIDA))
+            - ((tipo_desde != LLEGADA) & (tipo_hacia == LLEGADA))
+            + ((tipo_desde == LLEGADA) & (tipo_hacia != LLEGADA))
+        )
+        filas = self._filas_nuevas(num_familias, 0, 0)
+        columnas = np.flatnonzero(coeficiente)
+        self._coeficientes(filas[self.col_familia[columnas]], columnas, coeficiente[columnas])
+
+        # Equilibrio2: salidas - entradas <= 0 por familia y centro seguro
+        self._filas_familia_nodo(LLEGADA, -np.inf, 0, -1, 1)
+
+        # Ensamblar la matriz por columnas (los coeficientes repetidos se suman, como en PuLP)
+        filas, columnas, valores = (np.concatenate(parte) for parte in zip(*self._entradas))
+        self.matriz = sparse.csc_array((valores, (filas, columnas)), shape=(self.num_filas, self.num_columnas))
+        self.matriz.eliminate_zeros()
+        self.filas_inferior = np.concatenate([inferior for inferior, superior in self._limites_filas])
+        self.filas_superior = np.concatenate([superior for inferior, superior in self._limites_filas])
+        auxiliares = self.num_columnas - self.num_enteras
+        self.costos = np.concatenate([self.costos, np.zeros(auxiliares)])
+        self.columnas_superior = np.concatenate([self.columnas_superior, np.full(auxiliares, np.inf)])
+        del self._entradas, self._limites_filas
+
+    def tamaño_modelo(self):
+        tamaño = super().tamaño_modelo()
+        tamaño.update(variables=self.num_columnas, restricciones=self.num_filas, no_ceros=int(self.matriz.nnz))
+        return tamaño
+
+    def resolver(self, solver=None, progreso=None, inicio_mip=False, perfilar=None):
+        # Solo con ConfiguracionSolver: el modelo no es un LpProblem que PuLP pueda resolver
+        if solver is None:
+            solver = cargar_configuracion()
+        if not isinstance(solver, ConfiguracionSolver):
+            raise ValueError("El emisor matricial necesita una ConfiguracionSolver")
+        return super().resolver(solver, progreso, inicio_mip, perfilar)
+
+    def ejecutar_solver(self, configuracion, ruta_log, inicio_mip):
+        # inicio_mip no se usa: las reoptimizaciones con solución previa van por SesionModelo (PuLP)
+        inicio = time.perf_counter()
+        if configuracion.backend == "highs":
+            estadisticas = self._resolver_highs(configuracion, ruta_log) if highspy else self._resolver_scipy(configuracion)
+        elif configuracion.backend == "cbc":
+            estadisticas = self._resolver_cbc(configuracion, ruta_log)
+        else:
+            raise ValueError(f"El emisor matricial admite los solvers cbc y highs, no {configuracion.backend}")
+        estadisticas["tiempo_pared"] = time.perf_counter() - inicio
+        return depurar_estadisticas(estadisticas)
+
+    def _guardar_solucion(self, status, solucion):
+        self.status = status
+        self.solucion = None
+        if solucion is not None:
+            # Redondear las columnas enteras que el solver devuelve con error de punto flotante
+            self.solucion = np.array(solucion, dtype=float)
+            enteras = self.solucion[:self.num_enteras]
+            redondeadas = np.round(enteras)
+            cercanas = np.abs(enteras - redondeadas) <= 1e-6
+            enteras[cercanas] = redondeadas[cercanas]
+        self.valor_objetivo = float(self.costos @ self.solucion) if self.solucion is not None else None
+
+    def _modelo_highs(self):
+        modelo = highspy.HighsLp()
+        modelo.num_col_ = self.num_columnas
+        modelo.num_row_ = self.num_filas
+        modelo.col_cost_ = self.costos
+        modelo.col_lower_ = np.zeros(self.num_columnas)
+        modelo.col_upper_ = self.columnas_superior
+        modelo.row_lower_ = self.filas_inferior
+        modelo.row_upper_ = self.filas_superior
+        modelo.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        modelo.a_matrix_.num_col_ = self.num_columnas
+        modelo.a_matrix_.num_row_ = self.num_filas
+        modelo.a_matrix_.start_ = self.matriz.indptr
+        modelo.a_matrix_.index_ = self.matriz.indices
+        modelo.a_matrix_.value_ = self.matriz.data
+        modelo.integrality_ = ([highspy.HighsVarType.kInteger] * self.num_enteras
+                               + [highspy.HighsVarType.kContinuous] * (self.num_columnas - self.num_enteras))
+        return modelo
+
+    def _resolver_highs(self, configuracion, ruta_log):
+        highs = highspy.Highs()
+        highs.setOptionValue("log_to_console", False)
+        highs.setOptionValue("log_file", ruta_log)
+        if configuracion.hilos:
+            highs.setOptionValue("threads", configuracion.hilos)
+        if configuracion.limite_tiempo is not None:
+            highs.setOptionValue("time_limit", configuracion.limite_tiempo)
+        if configuracion.gap_relativo is not None:
+            highs.setOptionValue("mip_rel_gap", configuracion.gap_relativo)
+        if not configuracion.presolve:
+            highs.setOptionValue("presolve", "off")
+        highs.passModel(self._modelo_highs())
+        highs.run()
+
+        info = highs.getInfo()
+        status = ESTADOS_HIGHS.get(highs.getModelStatus().name, LpStatus[LpStatusNotSolved])
+        # primal_solution_status 2: solución factible
+        hay_solucion = info.primal_solution_status == 2
+        if status in ESTADOS_CON_SOLUCION and not hay_solucion:
+            status = LpStatus[LpStatusNotSolved]
+        self._guardar_solucion(status, highs.getSolution().col_value if hay_solucion else None)
+        return {"nodos": info.mip_node_count, "cota": info.mip_dual_bound,
+                "incumbente": info.objective_function_value, "gap": info.mip_gap}
+
+    def _resolver_scipy(self, configuracion):
+        # scipy.optimize.milp no admite fijar el número de hilos
+        opciones = {"disp": False, "presolve": configuracion.presolve}
+        if configuracion.limite_tiempo is not None:
+            opciones["time_limit"] = configuracion.limite_tiempo
+        if configuracion.gap_relativo is not None:
+            opciones["mip_rel_gap"] = configuracion.gap_relativo
+        integralidad = np.zeros(self.num_columnas)
+        integralidad[:self.num_enteras] = 1
+        resultado = milp(
+            self.costos,
+            integrality=integralidad,
+            bounds=Bounds(0, self.columnas_superior),
+            constraints=LinearConstraint(self.matriz, self.filas_inferior, self.filas_superior),
+            options=opciones
+        )
+        status = ESTADOS_SCIPY.get(resultado.status, LpStatus[LpStatusNotSolved])
+        if status in ESTADOS_CON_SOLUCION and resultado.x is None:
+            status = LpStatus[LpStatusNotSolved]
+        self._guardar_solucion(status, resultado.x)
+        return {"nodos": getattr(resultado, 'mip_node_count', None), "cota": getattr(resultado, 'mip_dual_bound', None),
+                "incumbente": resultado.fun, "gap": getattr(resultado, 'mip_gap', None)}
+
+    def _resolver_cbc(self, configuracion, ruta_log):
+        # Escribir el MPS y ejecutar el CBC de PuLP con las mismas opciones que PULP_CBC_CMD
+        solver = configuracion.crear_solver(ruta_log=ruta_log)
+        with tempfile.TemporaryDirectory(prefix="modelo_matricial_") as directorio:
+            ruta_mps = os.path.join(directorio, "modelo.mps")
+            ruta_solucion = os.path.join(directorio, "modelo.sol")
+            self.escribir_mps(ruta_mps)
+            argumentos = [solver.path, ruta_mps]
+            if solver.timeLimit is not None:
+                argumentos += ["-sec", str(solver.timeLimit)]
+            for opcion in solver.options + solver.getOptions():
+                argumentos += f"-{opcion}".split()
+            argumentos += ["-branch", "-printingOptions", "all", "-solution", ruta_solucion]
+            with open(ruta_log, "w") as registro:
+                subprocess.run(argumentos, stdout=registro, stderr=subprocess.STDOUT,
+                               stdin=subprocess.DEVNULL, check=True)
+
+            # CBC detenido por tiempo con una solución entera: Optimal con una solución solo factible
+            status, estado_solucion = solver.get_status(ruta_solucion)
+            status = LpStatus[status]
+            if status == LpStatus[LpStatusOptimal] and estado_solucion != LpSolutionOptimal:
+                status = ESTADO_FACTIBLE
+            solucion = np.zeros(self.num_columnas)
+            with open(ruta_solucion) as f:
+                next(f)
+                for linea in f:
+                    campos = linea.split()
+                    if campos and campos[0] == "**":
+                        campos = campos[1:]
+                    if len(campos) >= 3 and campos[1].startswith("X"):
+                        solucion[int(campos[1][1:])] = float(campos[2])
+        self._guardar_solucion(status, solucion if status in ESTADOS_CON_SOLUCION else None)
+        return configuracion.estadisticas(None, solver, ruta_log, 0)
+
+    def escribir_mps(self, ruta):
+        # MPS con el mismo formato (campos fijos) y los mismos nombres que PuLP con rename=1:
+        # columnas X0000000... y filas C0000000...
+        iguales = self.filas_inferior == self.filas_superior
+        menores = np.isneginf(self.filas_inferior)
+        rhs = np.where(menores & ~iguales, self.filas_superior, self.filas_inferior)
+        indices, punteros, valores = self.matriz.indices, self.matriz.indptr, self.matriz.data
+        with open(ruta, "w") as f:
+            f.write("*SENSE:Minimize\nNAME          MODEL\nROWS\n N  OBJ\n")
+            f.writelines(" %s  C%07d\n" % ('E' if igual else 'L' if menor else 'G', n)
+                         for n, (igual, menor) in enumerate(zip(iguales, menores)))
+            f.write("COLUMNS\n")
+            f.write("    MARK      'MARKER'                 'INTORG'\n")
+            for c in range(self.num_columnas):
+                if c == self.num_enteras:
+                    f.write("    MARK      'MARKER'                 'INTEND'\n")
+                nombre = "X%07d" % c
+                lineas = ["    %-8s  C%07d  % .12e\n" % (nombre, indices[k], valores[k])
+                          for k in range(punteros[c], punteros[c + 1])]
+                # Toda columna aparece al menos una vez para que sus cotas sean válidas
+                if self.costos[c] or not lineas:
+                    lineas.append("    %-8s  %-8s  % .12e\n" % (nombre, "OBJ", self.costos[c]))
+                f.writelines(lineas)
+            if self.num_enteras == self.num_columnas:
+                f.write("    MARK      'MARKER'                 'INTEND'\n")
+            f.write("RHS\n")
+            f.writelines("    RHS       C%07d  % .12e\n" % (n, valor) for n, valor in enumerate(rhs) if valor)
+            # Las enteras sin cota superior llevan cota inferior explícita (si no, CBC las toma como binarias)
+            f.write("BOUNDS\n")
+            for c in range(self.num_enteras):
+                superior = self.columnas_superior[c]
+                if superior == 0:
+                    f.write(" FX BND       X%07d  % .12e\n" % (c, 0.0))
+                elif superior == 1:
+                    f.write(" BV BND       X%07d\n" % c)
+                else:
+                    f.write(" LO BND       X%07d  % .12e\n" % (c, 0.0))
+            f.write("ENDATA\n")
+
+    def escribir_modelo(self, ruta):
+        # .mps con el escritor propio; .lp (u otros formatos de HiGHS) a través de highspy
+        if ruta.endswith(".mps"):
+            self.escribir_mps(ruta)
+            return
+        if highspy is None:
+            raise ValueError("Escribir el modelo en formato LP requiere highspy")
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", False)
+        highs.passModel(self._modelo_highs())
+        highs.writeModel(ruta)
+
+    def estado_solucion(self):
+        return self.status, self.valor_objetivo
+
+    def valores_X(self):
+        # Solo las columnas con valor positivo
+        if self.solucion is None:
+            return
+        for c in np.flatnonzero(self.solucion[:self.num_X] > 0):
+            id_fam = self.claves_familia[self.col_familia[c]]
+            i, j = self.arcos[self.col_arco[c]]
+            yield (id_fam, self.familias[id_fam][0], i, j), float(self.solucion[c])
+
+    def valores_Y(self):
+        for n, rf in enumerate(self.nodos_Y):
+            yield rf, float(self.solucion[self.num_X + n]) if self.solucion is not None else None
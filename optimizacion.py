@@ -1,358 +1,787 @@
 # Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
 # Licencia MIT - Ver archivo LICENSE para detalles
-import json
-from pulp import LpProblem, LpMinimize, LpVariable, lpSum, LpBinary, LpInteger, LpStatus
+import os
+import tempfile
+import time
+from pulp import (
+    LpProblem, LpMinimize, LpVariable, LpAffineExpression, LpConstraint,
+    LpConstraintEQ, LpConstraintLE, LpConstraintGE, LpBinary, LpInteger, LpStatus, LpStatusOptimal,
+    LpSolutionOptimal
+)
 import numpy as np
+from cache_resultados import obtener_cache, huella_datos, ESTADOS_REUTILIZABLES
+from configuracion_solver import ConfiguracionSolver, cargar_configuracion
+from formato_resultados import VERSION_FORMATO, ESTADO_FACTIBLE, ESTADOS_CON_SOLUCION
+from almacen_escenarios import ESCENARIO_PREDETERMINADO, obtener_almacen
+from poda_red import PARAMETROS_PODA, podar_red
+from metricas import medir_fase, memoria_pico, perfil_activado, ejecutar_con_perfil, registrar_resolucion, registro
+
+TOLERANCIA = 1e-6
+
+# Parámetros por defecto del enfoque robusto (incertidumbre acotada por presupuesto Γ)
+PARAMETROS_ROBUSTOS = {
+    "presupuesto": 1.0,        # Γ: número de términos inciertos que pueden desviarse a la vez en cada restricción
+    "desviacion_valor": 0.1,   # aumento relativo máximo del número de familias de cada grupo
+    "desviacion_pi": 0.1       # disminución relativa máxima de la capacidad pi de cada centro
+}
+
+def agrupar_familias(datos):
+    # Agrupar los grupos de familias con el mismo origen (ns) y tamaño (h) en clases,
+    # ya que la función objetivo y las restricciones solo dependen de ambos valores
+    claves = {}
+    miembros = {}
+    idf = {}
+    for id_fam in datos['idFamilias']:
+        familia = datos['idf'][id_fam]
+        clave = (familia['ns'], int(familia['h']))
+        if clave not in claves:
+            id_clase = f"C{len(claves) + 1}"
+            claves[clave] = id_clase
+            miembros[id_clase] = []
+            idf[id_clase] = {"h": int(familia['h']), "ns": familia['ns'], "valor": 0}
+        id_clase = claves[clave]
+        miembros[id_clase].append(id_fam)
+        idf[id_clase]['valor'] += int(familia['valor'])
+    
+    datos_agrupados = dict(datos, idf=idf, idFamilias=list(miembros))
+    return datos_agrupados, miembros
+
+def descomponer_flujo(origen, flujos):
+    # Descomponer los flujos (desde, hacia, cantidad) que salen de un origen en rutas
+    # con su cantidad; los ciclos se cancelan y no forman parte de ninguna ruta
+    salidas = {}
+    exceso = {}
+    for desde, hacia, cantidad in flujos:
+        if cantidad <= TOLERANCIA:
+            continue
+        salidas.setdefault(desde, []).append([hacia, cantidad])
+        exceso[hacia] = exceso.get(hacia, 0) + cantidad
+        exceso[desde] = exceso.get(desde, 0) - cantidad
+    exceso[origen] = 0
+    
+    # Posición del primer arco con flujo pendiente en cada nodo
+    siguiente = {nodo: 0 for nodo in salidas}
+    
+    def arco_pendiente(nodo):
+        arcos = salidas.get(nodo, [])
+        while siguiente.get(nodo, 0) < len(arcos) and arcos[siguiente[nodo]][1] <= TOLERANCIA:
+            siguiente[nodo] += 1
+        if siguiente.get(nodo, 0) < len(arcos):
+            return arcos[siguiente[nodo]]
+        return None
+    
+    rutas = []
+    while arco_pendiente(origen) is not None:
+        ruta = [origen]
+        arcos_ruta = []
+        posicion = {origen: 0}
+        nodo = origen
+        while True:
+            if nodo != origen and exceso.get(nodo, 0) > TOLERANCIA:
+                break
+            arco = arco_pendiente(nodo)
+            if arco is None:
+                break
+            nodo = arco[0]
+            if nodo in posicion:
+                # Cancelar el ciclo y continuar desde el nodo repetido
+                inicio = posicion[nodo]
+                ciclo = arcos_ruta[inicio:] + [arco]
+                minimo = min(a[1] for a in ciclo)
+                for a in ciclo:
+                    a[1] -= minimo
+                for repetido in ruta[inicio + 1:]:
+                    del posicion[repetido]
+                del ruta[inicio + 1:]
+                del arcos_ruta[inicio:]
+                continue
+            posicion[nodo] = len(ruta)
+            ruta.append(nodo)
+            arcos_ruta.append(arco)
+        
+        if not arcos_ruta:
+            continue
+        
+        cantidad = min(a[1] for a in arcos_ruta)
+        if exceso.get(nodo, 0) > TOLERANCIA:
+            cantidad = min(cantidad, exceso[nodo])
+            exceso[nodo] -= cantidad
+        for a in arcos_ruta:
+            a[1] -= cantidad
+        rutas.append((ruta, cantidad))
+    
+    return rutas
+
+def repartir_flujo_clase(origen, flujos, miembros):
+    # Repartir las rutas de una clase entre los grupos de familias originales
+    # (id_fam, valor) y devolver los flujos por arco de cada grupo
+    flujos_miembro = {id_fam: {} for id_fam, valor in miembros}
+    pendientes = list(miembros)
+    indice = 0
+    restante = pendientes[0][1] if pendientes else 0
+    
+    for ruta, cantidad in descomponer_flujo(origen, flujos):
+        while cantidad > TOLERANCIA:
+            id_fam = pendientes[indice][0]
+            # El último grupo recibe cualquier exceso para no perder flujo
+            asignado = cantidad if indice == len(pendientes) - 1 else min(cantidad, restante)
+            arcos = flujos_miembro[id_fam]
+            for i, j in zip(ruta, ruta[1:]):
+                arcos[(i, j)] = arcos.get((i, j), 0) + asignado
+            cantidad -= asignado
+            restante -= asignado
+            if restante <= TOLERANCIA and indice < len(pendientes) - 1:
+                indice += 1
+                restante = pendientes[indice][1]
+    
+    return flujos_miembro
 
 class ModeloOptimizacion:
-    def __init__(self, datos):
+    def __init__(self, datos, agrupar=True, enfoque="determinista", poda=None):
+        self.datos_originales = datos
         self.datos = datos
+        self.miembros_clase = None
+        
+        # Enfoque robusto: parámetros de datos['robusto'] sobre los valores por defecto
+        self.enfoque = enfoque
+        self.robusto = dict(PARAMETROS_ROBUSTOS, **datos.get('robusto', {})) if enfoque == "robusto" else None
+        
+        # Poda de la red: opciones de datos['poda'] y del argumento poda sobre los valores por defecto
+        self.parametros_poda = dict(PARAMETROS_PODA, **datos.get('poda', {}), **(poda or {}))
+        
+        # Resolver sobre clases (ns, h) cuando hay grupos de familias que se puedan fusionar; el
+        # enfoque robusto no agrupa porque su conjunto de incertidumbre (presupuesto Γ y una
+        # protección por término) se define sobre los grupos de familias originales
+        if agrupar and self.robusto is None:
+            datos_agrupados, miembros = agrupar_familias(datos)
+            if len(miembros) < len(datos['idFamilias']):
+                self.datos = datos_agrupados
+                self.miembros_clase = miembros
+        
         self.problema = LpProblem("Modelo_Emergencias", LpMinimize)
         
         # Inicializar estructuras de datos
         self.X = {}  # Variables de flujo
         self.Y = {}  # Variables de activación
+        self.construido = False
+        self.tiempos = {}  # Duración acumulada (s) de cada fase
+        with medir_fase(self.tiempos, "indices"):
+            self.construir_indices()
+    
+    def construir_indices(self):
+        # Precalcular una sola vez el conjunto de arcos y los índices de adyacencia
+        # para que la construcción escale con familias x arcos y no con familias x nodos²
+        self.etiquetas = self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
+        distancias = self.datos['distancias']
+        
+        arcos_red = [
+            (i, j)
+            for i in self.etiquetas
+            for j in self.etiquetas
+            if distancias.get(i, {}).get(j, 0) > 0  # Solo si hay conexión
+        ]
+        
+        # Arcos que puede usar cada origen antes de crear ningún objeto de PuLP; el modelo
+        # solo contiene los arcos que usa algún origen (la fase "indices" incluye la poda)
+        origenes = list(dict.fromkeys(self.datos['idf'][id_fam]['ns'] for id_fam in self.datos['idFamilias']))
+        with medir_fase(self.tiempos, "poda"):
+            arcos_origen, self.estadisticas_poda = podar_red(self.datos, arcos_red, origenes, self.parametros_poda)
+        usados = {arco for arcos_ns in arcos_origen.values() for arco in arcos_ns}
+        self.arcos = [arco for arco in arcos_red if arco in usados]
+        
+        # Arcos de salida y de entrada por nodo
+        self.arcos_salida = {nodo: [] for nodo in self.etiquetas}
+        self.arcos_entrada = {nodo: [] for nodo in self.etiquetas}
+        for i, j in self.arcos:
+            self.arcos_salida[i].append((i, j))
+            self.arcos_entrada[j].append((i, j))
+        
+        # Arcos que intervienen en la restricción Equilibrio1, clasificados por tipo de nodo
+        conjunto_A = set(self.datos['etiquetasA'])
+        conjunto_AR = conjunto_A | set(self.datos['etiquetasR'])
+        conjunto_RF = set(self.datos['etiquetasR']) | set(self.datos['etiquetasF'])
+        conjunto_F = set(self.datos['etiquetasF'])
+        self.arcos_A_RF = [(i, j) for i, j in self.arcos if i in conjunto_A and j in conjunto_RF]
+        self.arcos_RF_A = [(i, j) for i, j in self.arcos if i in conjunto_RF and j in conjunto_A]
+        self.arcos_AR_F = [(i, j) for i, j in self.arcos if i in conjunto_AR and j in conjunto_F]
+        self.arcos_F_AR = [(i, j) for i, j in self.arcos if i in conjunto_F and j in conjunto_AR]
+        
+        # Tamaño y origen de cada familia, y arcos y nodos que puede usar
+        self.familias = {}
+        self.arcos_familia = {}
+        self.nodos_familia = {}
+        for id_fam in self.datos['idFamilias']:
+            familia = self.datos['idf'][id_fam]
+            self.familias[id_fam] = (int(familia['h']), familia['ns'])
+            self.arcos_familia[id_fam] = arcos_origen[familia['ns']]
+            self.nodos_familia[id_fam] = {nodo for arco in arcos_origen[familia['ns']] for nodo in arco}
+        self.estadisticas_poda["variables_X"] = {
+            "sin_poda": len(self.familias) * len(arcos_red),
+            "con_poda": sum(len(arcos) for arcos in self.arcos_familia.values())
+        }
+    
+    def _flujo(self, id_fam, arcos, signo=1):
+        # Términos (variable, coeficiente) de los flujos de una familia sobre una lista de arcos
+        h = self.familias[id_fam][0]
+        for i, j in arcos:
+            var = self.X.get((id_fam, h, i, j))
+            if var is not None:
+                yield var, signo
+    
+    def _personas(self, arcos, signo=1):
+        # Términos (variable, coeficiente) de las personas (h * X) de todas las familias sobre una lista de arcos
+        for id_fam, (h, ns) in self.familias.items():
+            for i, j in arcos:
+                var = self.X.get((id_fam, h, i, j))
+                if var is not None:
+                    yield var, signo * h
+    
+    def _agregar_restriccion(self, nombre, sentido, rhs, *terminos):
+        # Acumula los términos directamente en la restricción para no copiar expresiones intermedias
+        restriccion = LpConstraint(sense=sentido, name=nombre, rhs=rhs)
+        for grupo in terminos:
+            for var, coeficiente in grupo:
+                restriccion.addterm(var, coeficiente)
+        self.problema += restriccion
+        
+    def _agregar_capacidad(self, nombre, rhs, arcos_entrantes, arcos_salientes=(),
+                           nodo_activado=None, capacidad_nodo=0, desviacion_capacidad=0):
+        # Restricción de capacidad en personas: sum(h*X entrantes) - sum(h*X salientes) - capacidad_nodo*Y <= rhs
+        terminos_nodo = [(self.Y[nodo_activado], -capacidad_nodo)] if nodo_activado is not None else []
+        if self.robusto is None:
+            self._agregar_restriccion(
+                nombre, LpConstraintLE, rhs,
+                self._personas(arcos_entrantes),
+                self._personas(arcos_salientes, -1),
+                terminos_nodo
+            )
+            return
+        
+        # Contraparte robusta (Bertsimas-Sim): las rutas escalan con la demanda real, de modo que
+        # las personas de cada familia k sobre la restricción pueden crecer hasta desviacion_valor * a_k(x);
+        # la capacidad del nodo puede caer hasta desviacion_capacidad * capacidad_nodo. Como mucho
+        # Γ de esos términos se desvían a la vez:
+        #   nominal + Γ*z + sum(p_k) <= rhs,   z + p_k >= desviación_k,   z, p_k >= 0
+        presupuesto = self.robusto['presupuesto']
+        desviacion_valor = self.robusto['desviacion_valor']
+        z = LpVariable(f"Z_{nombre}", lowBound=0)
+        protecciones = []
+        
+        for id_fam, (h, ns) in self.familias.items():
+            terminos = list(self._flujo(id_fam, arcos_entrantes, h)) + list(self._flujo(id_fam, arcos_salientes, -h))
+            if not terminos or not desviacion_valor:
+                continue
+            p = LpVariable(f"P_{nombre}_{id_fam}", lowBound=0)
+            protecciones.append((p, 1))
+            self._agregar_restriccion(
+                f"Proteccion_{nombre}_{id_fam}", LpConstraintGE, 0,
+                [(z, 1), (p, 1)],
+                [(var, -desviacion_valor * coeficiente) for var, coeficiente in terminos]
+            )
+        
+        if terminos_nodo and desviacion_capacidad:
+            p = LpVariable(f"P_{nombre}_capacidad", lowBound=0)
+            protecciones.append((p, 1))
+            self._agregar_restriccion(
+                f"Proteccion_{nombre}_capacidad", LpConstraintGE, 0,
+                [(z, 1), (p, 1), (self.Y[nodo_activado], -desviacion_capacidad * capacidad_nodo)]
+            )
         
+        self._agregar_restriccion(
+            nombre, LpConstraintLE, rhs,
+            self._personas(arcos_entrantes),
+            self._personas(arcos_salientes, -1),
+            terminos_nodo,
+            [(z, presupuesto)] if protecciones else [],
+            protecciones
+        )
+    
     def crear_variables(self):
         # Crear variables Y (binarias) para nodos R y F
         for rf in self.datos['etiquetasR'] + self.datos['etiquetasF']:
             self.Y[rf] = LpVariable(f"Y_{rf}", cat=LpBinary)
         
+        # Los nodos que ninguna familia puede alcanzar no se activan; se conservan sus variables
+        # y restricciones de capacidad para que actualizar_parametros pueda modificarlas
+        for rf in self.estadisticas_poda['nodos_sin_uso']:
+            self.Y[rf].upBound = 0
+        
         # Crear variables X (enteras) para flujos
-        for id_fam in self.datos['idFamilias']:
-            h = int(self.datos['idf'][id_fam]['h'])
-            for i in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']:
-                for j in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']:
-                    if self.datos['distancias'].get(i, {}).get(j, 0) > 0:  # Solo si hay conexión
-                        self.X[(id_fam, h, i, j)] = LpVariable(
-                            f"X_{id_fam}_{h}_{i}_{j}", 
-                            lowBound=0, 
-                            cat=LpInteger
-                        )
+        for id_fam, (h, ns) in self.familias.items():
+            for i, j in self.arcos_familia[id_fam]:
+                self.X[(id_fam, h, i, j)] = LpVariable(
+                    f"X_{id_fam}_{h}_{i}_{j}", 
+                    lowBound=0, 
+                    cat=LpInteger
+                )
     
     def definir_funcion_objetivo(self):
+        distancias = self.datos['distancias']
+        costo_por_km = self.datos['costoPorKm']
+        
         # Primer término: sum[(id,h,i,j), c*d(i,j)*ord(h)*X(id,h,i,j)]
-        termino1 = lpSum(
-            self.datos['costoPorKm'] * 
-            self.datos['distancias'][i][j] * 
-            h * 
-            self.X[(id_fam, h, i, j)]
-            for id_fam in self.datos['idFamilias']
-            for h in [int(self.datos['idf'][id_fam]['h'])]
-            for i in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-            for j in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-            if (id_fam, h, i, j) in self.X
-        )
+        termino1 = LpAffineExpression([
+            (var, costo_por_km * distancias[i][j] * h)
+            for (id_fam, h, i, j), var in self.X.items()
+        ])
         
         # Segundo término: sum[rf, Ac(rf)*Y(rf)]
-        termino2 = lpSum(
-            self.datos['ac'].get(rf, 0) * self.Y[rf]
+        termino2 = LpAffineExpression([
+            (self.Y[rf], self.datos['ac'].get(rf, 0))
             for rf in self.datos['etiquetasR'] + self.datos['etiquetasF']
-        )
+        ])
         
-        self.problema += termino1 + termino2
+        self.problema.setObjective(termino1 + termino2)
     
     def agregar_restricciones(self):
         # Restricción Robust_Salidas_C1
-        for id_fam in self.datos['idFamilias']:
-            h = int(self.datos['idf'][id_fam]['h'])
-            ns = self.datos['idf'][id_fam]['ns']
-            
-            suma_salida = lpSum(
-                self.X.get((id_fam, h, ns, j), 0)
-                for j in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, ns, j) in self.X
-            )
-            
-            suma_entrada = lpSum(
-                self.X.get((id_fam, h, j, ns), 0)
-                for j in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, j, ns) in self.X
-            )
-            
+        for id_fam, (h, ns) in self.familias.items():
             valor_idf = self.datos['idf'][id_fam]['valor']
-            self.problema += (suma_salida - suma_entrada == valor_idf), f"Robust_Salidas_C1_{id_fam}_{h}_{ns}"
+            self._agregar_restriccion(
+                f"Robust_Salidas_C1_{id_fam}_{h}_{ns}", LpConstraintEQ, valor_idf,
+                self._flujo(id_fam, self.arcos_salida.get(ns, [])),
+                self._flujo(id_fam, self.arcos_entrada.get(ns, []), -1)
+            )
         
         # Restricción capac_llegada_origen
+        alpha = self.datos.get('alpha', 0)
         for ns in self.datos['etiquetasA']:
-            suma = lpSum(
-                h * self.X.get((id_fam, h, ns, j), 0)
-                for id_fam in self.datos['idFamilias']
-                for h in [int(self.datos['idf'][id_fam]['h'])]
-                for j in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, ns, j) in self.X
-            )
-            alpha = self.datos.get('alpha', 0)
-            self.problema += (suma <= alpha), f"capac_llegada_origen_{ns}"
+            self._agregar_capacidad(f"capac_llegada_origen_{ns}", alpha, self.arcos_salida[ns])
         
         # Restricción Robust_Flujo_Transito
-        for id_fam in self.datos['idFamilias']:
-            h = int(self.datos['idf'][id_fam]['h'])
+        for id_fam, (h, ns) in self.familias.items():
             for nt in self.datos['etiquetasR']:
-                suma_entrada = lpSum(
-                    self.X.get((id_fam, h, i, nt), 0)
-                    for i in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                    if (id_fam, h, i, nt) in self.X
-                )
-                
-                suma_salida = lpSum(
-                    self.X.get((id_fam, h, nt, i), 0) * 
-                    (1 if self.datos['distancias'][nt].get(i, 0) > 0 else 0)
-                    for i in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                    if (id_fam, h, nt, i) in self.X
+                if nt not in self.nodos_familia[id_fam]:
+                    continue
+                self._agregar_restriccion(
+                    f"Robust_Flujo_Transito_{id_fam}_{h}_{nt}", LpConstraintEQ, 0,
+                    self._flujo(id_fam, self.arcos_entrada[nt]),
+                    self._flujo(id_fam, self.arcos_salida[nt], -1)
                 )
-                
-                self.problema += (suma_entrada == suma_salida), f"Robust_Flujo_Transito_{id_fam}_{h}_{nt}"
         
         # Restricción cap_llegada_punto_transito
+        beta = self.datos.get('beta', 0)
         for nt in self.datos['etiquetasR']:
-            suma = lpSum(
-                h * self.X.get((id_fam, h, nt, j), 0)
-                for id_fam in self.datos['idFamilias']
-                for h in [int(self.datos['idf'][id_fam]['h'])]
-                for j in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, nt, j) in self.X
+            self._agregar_capacidad(
+                f"cap_llegada_punto_transito_{nt}", 0, self.arcos_salida[nt],
+                nodo_activado=nt, capacidad_nodo=beta
             )
-            beta = self.datos.get('beta', 0)
-            self.problema += (suma <= beta * self.Y[nt]), f"cap_llegada_punto_transito_{nt}"
         
         # Restricción Robust_Llegada_C2
         for nll in self.datos['etiquetasF']:
-            suma_entrada = lpSum(
-                h * self.X.get((id_fam, h, i, nll), 0)
-                for id_fam in self.datos['idFamilias']
-                for h in [int(self.datos['idf'][id_fam]['h'])]
-                for i in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, i, nll) in self.X
-            )
-            
-            suma_salida = lpSum(
-                h * self.X.get((id_fam, h, nll, i), 0)
-                for id_fam in self.datos['idFamilias']
-                for h in [int(self.datos['idf'][id_fam]['h'])]
-                for i in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, nll, i) in self.X
-            )
-            
             pi_nll = self.datos['pi'].get(nll, 0)
-            self.problema += (suma_entrada - suma_salida <= pi_nll * self.Y[nll]), f"Robust_Llegada_C2_{nll}"
+            self._agregar_capacidad(
+                f"Robust_Llegada_C2_{nll}", 0, self.arcos_entrada[nll], self.arcos_salida[nll],
+                nodo_activado=nll, capacidad_nodo=pi_nll,
+                desviacion_capacidad=self.robusto['desviacion_pi'] if self.robusto else 0
+            )
         
         # Restricción cap_llegada_centro_seguro
+        gamma = self.datos.get('gamma', 0)
         for nll in self.datos['etiquetasF']:
-            suma = lpSum(
-                h * self.X.get((id_fam, h, i, nll), 0)
-                for id_fam in self.datos['idFamilias']
-                for h in [int(self.datos['idf'][id_fam]['h'])]
-                for i in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, i, nll) in self.X
-            )
-            gamma = self.datos.get('gamma', 0)
-            self.problema += (suma <= gamma), f"cap_llegada_centro_seguro_{nll}"
+            self._agregar_capacidad(f"cap_llegada_centro_seguro_{nll}", gamma, self.arcos_entrada[nll])
         
         # Restricción Equilibrio1
-        for id_fam in self.datos['idFamilias']:
-            h = int(self.datos['idf'][id_fam]['h'])
-            
-            suma1 = lpSum(
-                self.X.get((id_fam, h, ns, rf), 0)
-                for ns in self.datos['etiquetasA']
-                for rf in self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, ns, rf) in self.X
-            ) - lpSum(
-                self.X.get((id_fam, h, rf, ns), 0)
-                for ns in self.datos['etiquetasA']
-                for rf in self.datos['etiquetasR'] + self.datos['etiquetasF']
-                if (id_fam, h, rf, ns) in self.X
-            )
-            
-            suma2 = lpSum(
-                self.X.get((id_fam, h, ar, nll), 0)
-                for ar in self.datos['etiquetasA'] + self.datos['etiquetasR']
-                for nll in self.datos['etiquetasF']
-                if (id_fam, h, ar, nll) in self.X
-            ) - lpSum(
-                self.X.get((id_fam, h, nll, ar), 0)
-                for ar in self.datos['etiquetasA'] + self.datos['etiquetasR']
-                for nll in self.datos['etiquetasF']
-                if (id_fam, h, nll, ar) in self.X
+        for id_fam, (h, ns) in self.familias.items():
+            self._agregar_restriccion(
+                f"Equilibrio1_{id_fam}_{h}", LpConstraintEQ, 0,
+                self._flujo(id_fam, self.arcos_A_RF),
+                self._flujo(id_fam, self.arcos_RF_A, -1),
+                self._flujo(id_fam, self.arcos_AR_F, -1),
+                self._flujo(id_fam, self.arcos_F_AR)
             )
-            
-            self.problema += (suma1 == suma2), f"Equilibrio1_{id_fam}_{h}"
         
         # Restricción Equilibrio2
-        for id_fam in self.datos['idFamilias']:
-            h = int(self.datos['idf'][id_fam]['h'])
+        for id_fam, (h, ns) in self.familias.items():
             for nll in self.datos['etiquetasF']:
-                suma_salida = lpSum(
-                    self.X.get((id_fam, h, nll, j), 0)
-                    for j in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                    if (id_fam, h, nll, j) in self.X
+                if nll not in self.nodos_familia[id_fam]:
+                    continue
+                self._agregar_restriccion(
+                    f"Equilibrio2_{id_fam}_{h}_{nll}", LpConstraintLE, 0,
+                    self._flujo(id_fam, self.arcos_salida[nll]),
+                    self._flujo(id_fam, self.arcos_entrada[nll], -1)
                 )
-                
-                suma_entrada = lpSum(
-                    self.X.get((id_fam, h, j, nll), 0)
-                    for j in self.datos['etiquetasA'] + self.datos['etiquetasR'] + self.datos['etiquetasF']
-                    if (id_fam, h, j, nll) in self.X
-                )
-                
-                self.problema += (suma_salida <= suma_entrada), f"Equilibrio2_{id_fam}_{h}_{nll}"
     
-
     @staticmethod
     def generar_reporte_rutas(datos, resultados):
-        reporte = []
+        # Rutas en columnas (familia, ruta, cantidad, distancia); el resto de campos del
+        # reporte se deriva con formato_resultados.iterar_rutas
+        reporte = {"familia": [], "ruta": [], "cantidad": [], "distancia": []}
+        etiquetasF = set(datos['etiquetasF'])
         
-        # Construir grafo de conexiones
-        grafo = {}
-        for i in datos['etiquetasA'] + datos['etiquetasR'] + datos['etiquetasF']:
-            grafo[i] = [j for j in datos['etiquetasA'] + datos['etiquetasR'] + datos['etiquetasF'] 
-                    if datos['distancias'].get(i, {}).get(j, 0) > 0]
+        # Agrupar los flujos de cada familia
+        flujos_familia = {}
+        columnas = resultados['flujos']
+        for id_fam, i, j, cantidad in zip(columnas['familia'], columnas['desde'], columnas['hacia'], columnas['cantidad']):
+            flujos_familia.setdefault(id_fam, []).append((i, j, cantidad))
         
         # Procesar cada familia
-        for id_fam, familia_data in resultados['resumen']['flujos_por_familia'].items():
-            h = int(familia_data['tamaño_familia'])
-            origen = familia_data['origen']
-            
-            # Reconstruir todas las rutas completas para esta familia
-            rutas_completas = []
-            flujos_finales = [f for f in familia_data['flujos'] if f['hacia'] in datos['etiquetasF'] and f['cantidad'] > 0]
-            
-            for flujo_final in flujos_finales:
-                # Reconstruir ruta desde el origen hasta este destino final
-                ruta = []
-                nodo_actual = flujo_final['desde']
-                ruta.append(nodo_actual)
-                
-                while nodo_actual != origen:
-                    # Buscar el flujo entrante a este nodo
-                    flujo_entrante = next(
-                        (f for f in familia_data['flujos'] 
-                        if f['hacia'] == nodo_actual and f['cantidad'] > 0),
-                        None
-                    )
-                    if not flujo_entrante:
-                        break
-                    
-                    ruta.insert(0, flujo_entrante['desde'])
-                    nodo_actual = flujo_entrante['desde']
-                
-                if nodo_actual == origen:
-                    ruta.append(flujo_final['hacia'])  # Agregar el nodo final
-                    rutas_completas.append({
-                        'ruta': ruta,
-                        'cantidad': flujo_final['cantidad'],
-                        'destino': flujo_final['hacia']
-                    })
-            
-            # Procesar cada ruta encontrada
-            for ruta_info in rutas_completas:
-                ruta = ruta_info['ruta']
-                cantidad = ruta_info['cantidad']
-                destino = ruta_info['destino']
+        for id_fam, origen in zip(resultados['familias']['id'], resultados['familias']['origen']):
+            # Descomponer el flujo de la familia en rutas completas desde el origen; cuando el
+            # flujo se bifurca en varios nodos de tránsito cada rama conserva su propia cantidad
+            for ruta, cantidad in descomponer_flujo(origen, flujos_familia.get(id_fam, [])):
+                if ruta[-1] not in etiquetasF:
+                    continue
                 
-                # Calcular distancia total
-                distancia = sum(datos['distancias'][ruta[i]][ruta[i+1]] for i in range(len(ruta)-1))
-                
-                # Agregar al reporte
-                reporte.append({
-                    "id_familia": int(id_fam),
-                    "tamaño_familia": h,
-                    "familias_en_ruta": cantidad,
-                    "personas_en_ruta": h * cantidad,
-                    "ruta_str": "->".join(ruta),
-                    "num_nodos_ruta": len(ruta),
-                    "distancia": distancia,
-                    "origen": origen,
-                    "destino": destino
-                })
+                # Agregar al reporte con la distancia total
+                reporte["familia"].append(id_fam)
+                reporte["ruta"].append("->".join(ruta))
+                reporte["cantidad"].append(cantidad)
+                reporte["distancia"].append(sum(datos['distancias'][ruta[i]][ruta[i+1]] for i in range(len(ruta)-1)))
         
         return reporte
 
-    def resolver(self):
-        self.crear_variables()
-        self.definir_funcion_objetivo()
-        self.agregar_restricciones()
-
-        # Resolver el problema
-        self.problema.solve()
+    def flujos_por_familia(self):
+        # Flujos (desde, hacia, cantidad) de cada grupo de familias original; si el modelo se
+        # resolvió por clases, los flujos de cada clase se reparten entre sus grupos
+        flujos_modelo = {}
+        for (id_fam, h, i, j), cantidad in self.valores_X():
+            cantidad = cantidad or 0
+            if cantidad > 0:
+                flujos_modelo.setdefault(id_fam, []).append((i, j, cantidad))
         
-        # Preparar resultados
-        resultados = {
-            "status": LpStatus[self.problema.status],
-            "valor_objetivo": self.problema.objective.value(),
-            "variables_X": {},
-            "variables_Y": {},
-            "resumen": {
-                "nodos_activados": [],
-                "flujos_por_familia": {}
+        if self.miembros_clase is None:
+            return flujos_modelo
+        
+        flujos = {}
+        for id_clase, flujos_clase in flujos_modelo.items():
+            miembros = [
+                (id_fam, int(self.datos_originales['idf'][id_fam]['valor']))
+                for id_fam in self.miembros_clase[id_clase]
+            ]
+            origen = self.datos['idf'][id_clase]['ns']
+            for id_fam, arcos in repartir_flujo_clase(origen, flujos_clase, miembros).items():
+                if arcos:
+                    flujos[id_fam] = [(i, j, cantidad) for (i, j), cantidad in arcos.items()]
+        
+        # Conservar el orden original de los grupos de familias
+        return {id_fam: flujos[id_fam] for id_fam in self.datos_originales['idFamilias'] if id_fam in flujos}
+    
+    def construir(self):
+        # Crear variables, función objetivo y restricciones una sola vez
+        if self.construido:
+            return
+        with medir_fase(self.tiempos, "crear_variables"):
+            self.crear_variables()
+        with medir_fase(self.tiempos, "definir_funcion_objetivo"):
+            self.definir_funcion_objetivo()
+        with medir_fase(self.tiempos, "agregar_restricciones"):
+            self.agregar_restricciones()
+        self.construido = True
+    
+    def admite_actualizacion(self, datos):
+        # Los nuevos datos solo pueden aplicarse sobre el modelo construido si conservan
+        # la red (nodos y distancias) y los grupos de familias con su tamaño y origen
+        anteriores = self.datos_originales
+        for campo in ('etiquetasA', 'etiquetasR', 'etiquetasF', 'distancias', 'idFamilias', 'robusto', 'poda'):
+            if datos.get(campo) != anteriores.get(campo):
+                return False
+        return all(
+            int(datos['idf'][id_fam]['h']) == int(anteriores['idf'][id_fam]['h'])
+            and datos['idf'][id_fam]['ns'] == anteriores['idf'][id_fam]['ns']
+            for id_fam in datos['idFamilias']
+        )
+    
+    def actualizar_parametros(self, datos):
+        # Cambiar capacidades (alpha, beta, gamma, pi), demandas (valor) y costos (ac, costoPorKm)
+        # modificando solo los lados derechos y coeficientes afectados; devuelve los cambios aplicados
+        anteriores = self.datos_originales
+        datos_modelo_anteriores = self.datos
+        self.datos_originales = datos
+        self.datos = agrupar_familias(datos)[0] if self.miembros_clase is not None else datos
+        if not self.construido:
+            return []
+        
+        cambios = []
+        restricciones = self.problema.constraints
+        objetivo = self.problema.objective
+        
+        if datos.get('alpha', 0) != anteriores.get('alpha', 0):
+            for ns in self.datos['etiquetasA']:
+                restricciones[f"capac_llegada_origen_{ns}"].constant = -datos.get('alpha', 0)
+            cambios.append('alpha')
+        
+        if datos.get('beta', 0) != anteriores.get('beta', 0):
+            for nt in self.datos['etiquetasR']:
+                restricciones[f"cap_llegada_punto_transito_{nt}"][self.Y[nt]] = -datos.get('beta', 0)
+            cambios.append('beta')
+        
+        if datos.get('gamma', 0) != anteriores.get('gamma', 0):
+            for nll in self.datos['etiquetasF']:
+                restricciones[f"cap_llegada_centro_seguro_{nll}"].constant = -datos.get('gamma', 0)
+            cambios.append('gamma')
+        
+        for nll in self.datos['etiquetasF']:
+            pi_nll = datos['pi'].get(nll, 0)
+            if pi_nll != anteriores['pi'].get(nll, 0):
+                restricciones[f"Robust_Llegada_C2_{nll}"][self.Y[nll]] = -pi_nll
+                if self.robusto and self.robusto['desviacion_pi']:
+                    restricciones[f"Proteccion_Robust_Llegada_C2_{nll}_capacidad"][self.Y[nll]] = -self.robusto['desviacion_pi'] * pi_nll
+                cambios.append(f"pi_{nll}")
+        
+        for id_fam, (h, ns) in self.familias.items():
+            valor_idf = self.datos['idf'][id_fam]['valor']
+            if valor_idf != datos_modelo_anteriores['idf'][id_fam]['valor']:
+                restricciones[f"Robust_Salidas_C1_{id_fam}_{h}_{ns}"].constant = -valor_idf
+        # Los cambios se informan por grupo de familias de los datos, no por clase agrupada
+        for id_fam in datos['idFamilias']:
+            if datos['idf'][id_fam]['valor'] != anteriores['idf'][id_fam]['valor']:
+                cambios.append(f"valor_{id_fam}")
+        
+        for rf in self.datos['etiquetasR'] + self.datos['etiquetasF']:
+            ac_rf = self.datos['ac'].get(rf, 0)
+            if ac_rf != anteriores['ac'].get(rf, 0):
+                objetivo[self.Y[rf]] = ac_rf
+                cambios.append(f"ac_{rf}")
+        
+        if datos['costoPorKm'] != anteriores['costoPorKm']:
+            distancias = self.datos['distancias']
+            for (id_fam, h, i, j), var in self.X.items():
+                objetivo[var] = datos['costoPorKm'] * distancias[i][j] * h
+            cambios.append('costoPorKm')
+        
+        return cambios
+    
+    def resolver_problema(self, configuracion, inicio_mip):
+        # Resolver con el solver configurado y devolver la configuración y las estadísticas del solver
+        ruta_log = configuracion.ruta_log
+        if ruta_log is None:
+            descriptor, ruta_log = tempfile.mkstemp(prefix="solver_", suffix=".log")
+            os.close(descriptor)
+        try:
+            return {
+                "configuracion": configuracion.a_dict(),
+                "estadisticas": self.ejecutar_solver(configuracion, ruta_log, inicio_mip)
             }
+        finally:
+            if configuracion.ruta_log is None:
+                try:
+                    os.remove(ruta_log)
+                except OSError:
+                    pass
+    
+    def sembrar_inicio(self, solucion_X, solucion_Y):
+        # Valores iniciales de X e Y para que el solver parta de una solución conocida (inicio MIP)
+        for clave, var in self.X.items():
+            var.setInitialValue(solucion_X.get(clave, 0))
+        for rf, var in self.Y.items():
+            var.setInitialValue(solucion_Y.get(rf, 0))
+    
+    def inicio_heuristico(self, configuracion):
+        # Sembrar el plan heurístico como inicio MIP; devuelve su costo y duración (None sin plan)
+        from heuristica import ModeloHeuristico
+        inicio = time.perf_counter()
+        heuristico = ModeloHeuristico(self.datos_originales, agrupar=self.miembros_clase is not None,
+                                      poda=self.parametros_poda)
+        heuristico.planificar(configuracion.limite_tiempo)
+        if heuristico.status not in ESTADOS_CON_SOLUCION:
+            return None
+        self.sembrar_inicio(dict(heuristico.valores_X()), dict(heuristico.valores_Y()))
+        return {"valor_objetivo": heuristico.valor_objetivo, "tiempo": time.perf_counter() - inicio}
+    
+    def ejecutar_solver(self, configuracion, ruta_log, inicio_mip):
+        # Resolver el LpProblem y devolver las estadísticas del solver (modelo_matricial lo sustituye);
+        # el plan heurístico solo se siembra en el modelo determinista sin una solución previa
+        semilla = None
+        if configuracion.inicio_heuristico and not inicio_mip and self.robusto is None:
+            semilla = self.inicio_heuristico(configuracion)
+            inicio_mip = semilla is not None
+        solver = configuracion.crear_solver(ruta_log=ruta_log, inicio_mip=inicio_mip)
+        inicio = time.perf_counter()
+        self.problema.solve(solver)
+        tiempo = time.perf_counter() - inicio
+        estadisticas = configuracion.estadisticas(self.problema, solver, ruta_log, tiempo)
+        if semilla:
+            estadisticas["inicio_heuristico"] = semilla
+        return estadisticas
+    
+    def tamaño_modelo(self):
+        return {
+            "variables": len(self.X) + len(self.Y),
+            "restricciones": len(self.problema.constraints),
+            "no_ceros": sum(len(restriccion) for restriccion in self.problema.constraints.values()),
+            "familias": len(self.datos_originales['idFamilias']),
+            "clases": len(self.familias),
+            "arcos": len(self.arcos)
         }
+    
+    def resolver(self, solver=None, progreso=None, inicio_mip=False, perfilar=None):
+        # perfilar: capturar un perfil de cProfile de la resolución (por defecto según OPTIMIZACION_PERFIL)
+        if perfilar is None:
+            perfilar = perfil_activado()
+        if not perfilar:
+            return self._resolver(solver, progreso, inicio_mip)
+        resultados, perfil = ejecutar_con_perfil(self._resolver, solver, progreso, inicio_mip)
+        resultados['metricas']['perfil'] = perfil
+        return resultados
+    
+    def _resolver(self, solver, progreso, inicio_mip):
+        # solver: instancia de PuLP o ConfiguracionSolver; progreso: función opcional que recibe
+        # el nombre de cada fase; inicio_mip: usar los valores actuales de las variables como inicio
+        tiempos = dict(self.tiempos)
+        self.tiempos = {}
+        if progreso:
+            progreso("construyendo")
+        self.construir()
+
+        # Resolver el problema
+        if progreso:
+            progreso("resolviendo")
+        informe_solver = None
+        with medir_fase(self.tiempos, "resolucion"):
+            if isinstance(solver, ConfiguracionSolver):
+                informe_solver = self.resolver_problema(solver, inicio_mip)
+            else:
+                self.problema.solve(solver)
         
-        # Recoger valores de Y
-        for rf, var in self.Y.items():
-            resultados["variables_Y"][rf] = var.value()
-            if var.value() == 1:
-                resultados["resumen"]["nodos_activados"].append(rf)
+        if progreso:
+            progreso("generando_reporte")
         
-        # Recoger valores de X
-        for (id_fam, h, i, j), var in self.X.items():
-            if var.value() > 0:
-                if id_fam not in resultados["variables_X"]:
-                    resultados["variables_X"][id_fam] = []
-                resultados["variables_X"][id_fam].append({
-                    "desde": i,
-                    "hacia": j,
-                    "cantidad": var.value(),
-                    "personas": h * var.value()
-                })
-                
-                # Resumen por familia
-                if id_fam not in resultados["resumen"]["flujos_por_familia"]:
-                    resultados["resumen"]["flujos_por_familia"][id_fam] = {
-                        "tamaño_familia": h,
-                        "origen": self.datos['idf'][id_fam]['ns'],
-                        "flujos": []
-                    }
-                resultados["resumen"]["flujos_por_familia"][id_fam]["flujos"].append({
-                    "desde": i,
-                    "hacia": j,
-                    "cantidad": var.value(),
-                    "personas": h * var.value()
-                })
+        with medir_fase(self.tiempos, "extraccion"):
+            resultados = self.extraer_resultados()
 
-            # Generar reporte de rutas (solo si la solución es óptima)
-        if resultados["status"] == "Optimal":
-            resultados['reporte_rutas'] = ModeloOptimizacion.generar_reporte_rutas(self.datos, resultados)
+        # Generar reporte de rutas (solo si hay solución: óptima o factible)
+        if resultados["status"] in ESTADOS_CON_SOLUCION:
+            with medir_fase(self.tiempos, "reporte_rutas"):
+                resultados['rutas'] = ModeloOptimizacion.generar_reporte_rutas(self.datos_originales, resultados)
             
             # Validación de consistencia
-            total_personas = sum(fam['personas_en_ruta'] for fam in resultados['reporte_rutas'])
-            total_esperado = sum(int(f['h']) * int(f['valor']) for f in self.datos['idf'].values())
+            tamaños = dict(zip(resultados['familias']['id'], resultados['familias']['tamaño']))
+            total_personas = sum(
+                tamaños[id_fam] * cantidad
+                for id_fam, cantidad in zip(resultados['rutas']['familia'], resultados['rutas']['cantidad'])
+            )
+            total_esperado = sum(int(f['h']) * int(f['valor']) for f in self.datos_originales['idf'].values())
             
             if total_personas != total_esperado:
                 print(f"¡Advertencia! Personas reportadas: {total_personas}, Esperadas: {total_esperado}")
         else:
-            resultados['reporte_rutas'] = []
+            resultados['rutas'] = {"familia": [], "ruta": [], "cantidad": [], "distancia": []}
+        
+        if self.robusto:
+            resultados['parametros_robustos'] = self.robusto
+        
+        # Arcos y nodos descartados antes de construir el modelo
+        resultados['poda'] = self.estadisticas_poda
+        
+        if informe_solver:
+            resultados['solver'] = informe_solver
+        
+        # Tiempos por fase (los de preparación solo en la primera resolución del modelo),
+        # tamaño del modelo y memoria pico
+        tiempos.update(self.tiempos)
+        resultados['metricas'] = {
+            "fases": tiempos,
+            "modelo": self.tamaño_modelo(),
+            "memoria_pico_mb": memoria_pico()
+        }
+        registrar_resolucion(resultados['metricas'], resultados['status'])
+        
+        return resultados
+    
+    def estado_solucion(self):
+        # PuLP informa Optimal también cuando el solver se detiene por tiempo (o por iteraciones)
+        # con una solución entera; esa solución es factible, no óptima
+        if self.problema.status == LpStatusOptimal and self.problema.sol_status != LpSolutionOptimal:
+            return ESTADO_FACTIBLE, self.problema.objective.value()
+        return LpStatus[self.problema.status], self.problema.objective.value()
+    
+    def valores_X(self):
+        for clave, var in self.X.items():
+            yield clave, var.value()
+    
+    def valores_Y(self):
+        for rf, var in self.Y.items():
+            yield rf, var.value()
+    
+    def extraer_resultados(self):
+        # Estado, objetivo y valores de X e Y de la última resolución (sin el reporte de rutas);
+        # los flujos se guardan una sola vez en columnas (familia, desde, hacia, cantidad)
+        status, valor_objetivo = self.estado_solucion()
+        resultados = {
+            "formato": VERSION_FORMATO,
+            "status": status,
+            "valor_objetivo": valor_objetivo,
+            "enfoque": self.enfoque,
+            "variables_Y": {},
+            "resumen": {
+                "nodos_activados": []
+            },
+            "familias": {"id": [], "tamaño": [], "origen": []},
+            "flujos": {"familia": [], "desde": [], "hacia": [], "cantidad": []}
+        }
         
+        # Recoger valores de Y
+        for rf, valor in self.valores_Y():
+            resultados["variables_Y"][rf] = valor
+            if valor == 1:
+                resultados["resumen"]["nodos_activados"].append(rf)
+        
+        # Recoger valores de X
+        familias = resultados["familias"]
+        columnas = resultados["flujos"]
+        for id_fam, flujos in self.flujos_por_familia().items():
+            familia = self.datos_originales['idf'][id_fam]
+            familias["id"].append(id_fam)
+            familias["tamaño"].append(int(familia['h']))
+            familias["origen"].append(familia['ns'])
+            for i, j, cantidad in flujos:
+                columnas["familia"].append(id_fam)
+                columnas["desde"].append(i)
+                columnas["hacia"].append(j)
+                columnas["cantidad"].append(cantidad)
+
         return resultados
 
-def cargar_datos_desde_archivo():
-    try:
-        with open('datos_optimizacion.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return None
+def crear_modelo(datos, enfoque="determinista", configuracion=None, **opciones):
+    # Modelo con el emisor de la configuración: objetos de PuLP o matriz dispersa; el enfoque
+    # en dos fases descompone el determinista en un maestro y subproblemas por origen y el
+    # heurístico da un plan preliminar sin solver MIP
+    if enfoque == "dos_fases":
+        from dos_fases import ModeloDosFases
+        return ModeloDosFases(datos, **opciones)
+    if enfoque == "heuristico":
+        from heuristica import ModeloHeuristico
+        return ModeloHeuristico(datos, **opciones)
+    if configuracion is not None and configuracion.emisor == "matricial":
+        from modelo_matricial import ModeloMatricial
+        return ModeloMatricial(datos, enfoque=enfoque, **opciones)
+    return ModeloOptimizacion(datos, enfoque=enfoque, **opciones)
+
+# Sin almacén ni caché explícitos se usan los compartidos por el proceso
+def cargar_datos_escenario(escenario=ESCENARIO_PREDETERMINADO, almacen=None):
+    return (almacen or obtener_almacen()).obtener_datos(escenario)
 
-def guardar_resultados(resultados):
-    with open('resultados_optimizacion.json', 'w') as f:
-        json.dump(resultados, f, indent=4)
+def guardar_resultados(resultados, escenario=ESCENARIO_PREDETERMINADO, datos=None, almacen=None):
+    # Nueva versión de resultados del escenario, enlazada con los datos que la produjeron
+    return (almacen or obtener_almacen()).guardar_resultados(escenario, resultados, datos)
 
-def ejecutar_optimizacion():
-    datos = cargar_datos_desde_archivo()
+def ejecutar_optimizacion(usar_cache=True, enfoque="determinista", configuracion=None,
+                          escenario=ESCENARIO_PREDETERMINADO, perfilar=None, almacen=None, cache=None):
+    tiempos = {}
+    with medir_fase(tiempos, "carga_datos"):
+        datos = cargar_datos_escenario(escenario, almacen)
+    registro.observar("optimizacion_fase_duracion_segundos", tiempos["carga_datos"], fase="carga_datos")
     if not datos:
         print("No se encontraron datos de entrada. Por favor, ingrese los datos primero.")
         return None
+    configuracion = configuracion or cargar_configuracion()
+    
+    # Reutilizar la solución si el mismo escenario ya se resolvió con la misma configuración
+    cache = (cache or obtener_cache()) if usar_cache else None
+    clave = huella_datos(datos, {"enfoque": enfoque, "solver": configuracion.a_dict(),
+                                 "formato": VERSION_FORMATO}) if cache else None
+    resultados = cache.obtener(clave) if cache else None
+    
+    if resultados is None:
+        modelo = crear_modelo(datos, enfoque=enfoque, configuracion=configuracion)
+        resultados = modelo.resolver(configuracion, perfilar=perfilar)
+        resultados['metricas']['fases'].update(tiempos)
+        if cache and resultados['status'] in ESTADOS_REUTILIZABLES:
+            cache.guardar(clave, resultados)
     
-    modelo = ModeloOptimizacion(datos)
-    resultados = modelo.resolver()
-    guardar_resultados(resultados)
+    # El tiempo de escritura no puede ir en el propio registro: solo se publica en /metrics
+    inicio = time.perf_counter()
+    guardar_resultados(resultados, escenario, datos, almacen)
+    registro.observar("optimizacion_fase_duracion_segundos", time.perf_counter() - inicio, fase="guardado")
     return resultados
@@ -0,0 +1,103 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import heapq
+
+TOLERANCIA_DISTANCIA = 1e-9
+
+# Opciones por defecto de la poda de la red previa a la construcción del modelo; las activadas
+# por defecto conservan el óptimo del modelo sobre la red completa
+PARAMETROS_PODA = {
+    "arcos_hacia_origen": False,   # descartar los arcos que entran en un nodo de salida (A); cambia la
+                                   # formulación: una ruta puede terminar en otro nodo de salida
+    "arcos_desde_llegada": False,  # descartar los arcos que salen de un centro seguro (F); cambia la
+                                   # formulación: una ruta puede atravesar un centro seguro
+    "alcanzabilidad": True,        # descartar, por origen, los arcos que no están en ningún camino del
+                                   # origen a un destino posible (un centro seguro u otro nodo de salida)
+    "factor_distancia": None       # si se indica, descartar los arcos cuyo camino más corto origen -> i -> j -> F
+                                   # supera factor * el camino más corto origen -> F (puede perder el óptimo)
+}
+
+def _distancias_minimas(fuentes, adyacencia, distancias, inverso=False):
+    # Dijkstra desde varias fuentes; con inverso se recorren los arcos al revés (distancia hasta las fuentes)
+    minimas = {nodo: 0 for nodo in fuentes}
+    pendientes = [(0, nodo) for nodo in fuentes]
+    while pendientes:
+        distancia, nodo = heapq.heappop(pendientes)
+        if distancia > minimas[nodo]:
+            continue
+        for vecino in adyacencia.get(nodo, ()):
+            nueva = distancia + (distancias[vecino][nodo] if inverso else distancias[nodo][vecino])
+            if nueva < minimas.get(vecino, float('inf')):
+                minimas[vecino] = nueva
+                heapq.heappush(pendientes, (nueva, vecino))
+    return minimas
+
+def podar_red(datos, arcos, origenes, parametros=None):
+    # Arcos utilizables por las familias de cada origen y estadísticas de la poda
+    parametros = dict(PARAMETROS_PODA, **(parametros or {}))
+    distancias = datos['distancias']
+    conjunto_A = set(datos['etiquetasA'])
+    conjunto_F = set(datos['etiquetasF'])
+
+    # Poda común a todos los orígenes (opcional): ninguna ruta vuelve a un nodo de salida ni continúa tras un centro seguro
+    utiles = arcos
+    estadisticas = {"arcos_red": len(arcos), "arcos_hacia_origen": 0, "arcos_desde_llegada": 0}
+    if parametros['arcos_hacia_origen']:
+        utiles = [(i, j) for i, j in utiles if j not in conjunto_A]
+        estadisticas["arcos_hacia_origen"] = len(arcos) - len(utiles)
+    if parametros['arcos_desde_llegada']:
+        total = len(utiles)
+        utiles = [(i, j) for i, j in utiles if i not in conjunto_F]
+        estadisticas["arcos_desde_llegada"] = total - len(utiles)
+
+    factor = parametros['factor_distancia']
+    arcos_origen = {}
+    inalcanzables = 0
+    dominados = 0
+    sin_ruta = []
+    if not parametros['alcanzabilidad'] and factor is None:
+        arcos_origen = {ns: utiles for ns in origenes}
+    else:
+        sucesores = {}
+        predecesores = {}
+        for i, j in utiles:
+            sucesores.setdefault(i, []).append(j)
+            predecesores.setdefault(j, []).append(i)
+
+        # Distancia mínima de cada nodo a algún centro seguro (los que no aparecen no llegan a ninguno)
+        hasta_F = _distancias_minimas(conjunto_F, predecesores, distancias, inverso=True)
+
+        # En el modelo el flujo de una familia solo se conserva en los nodos de tránsito: termina en un
+        # centro seguro o, si hay arcos que entran en ellos, en otro nodo de salida. Con esos arcos, el
+        # destino posible depende del origen
+        hacia_A = any(j in conjunto_A for j in predecesores)
+
+        for ns in origenes:
+            desde_origen = _distancias_minimas([ns], sucesores, distancias)
+            hasta = hasta_F
+            if hacia_A:
+                hasta = _distancias_minimas(conjunto_F | (conjunto_A - {ns}), predecesores, distancias, inverso=True)
+            if ns not in hasta:
+                sin_ruta.append(ns)
+            arcos_ns = []
+            for i, j in utiles:
+                if i not in desde_origen or j not in hasta:
+                    inalcanzables += 1
+                elif (factor is not None and ns in hasta and desde_origen[i] + distancias[i][j] + hasta[j]
+                        > factor * hasta[ns] + TOLERANCIA_DISTANCIA):
+                    dominados += 1
+                else:
+                    arcos_ns.append((i, j))
+            arcos_origen[ns] = arcos_ns
+
+    # Nodos de tránsito y centros seguros que ninguna familia puede usar
+    usados = {nodo for arcos_ns in arcos_origen.values() for arco in arcos_ns for nodo in arco}
+    estadisticas.update({
+        "arcos_inalcanzables": inalcanzables,
+        "arcos_dominados": dominados,
+        "arcos_por_origen": {ns: len(arcos_ns) for ns, arcos_ns in arcos_origen.items()},
+        "nodos_sin_uso": [nodo for nodo in datos['etiquetasR'] + datos['etiquetasF'] if nodo not in usados],
+        "origenes_sin_ruta": sin_ruta,
+        "parametros": parametros
+    })
+    return arcos_origen, estadisticas
@@ -0,0 +1,393 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from bloqueo_archivos import bloqueo_archivo, intentar_bloqueo, reemplazo_atomico
+from formato_resultados import iterar_rutas, total_rutas
+from metricas import registro
+
+# Cambiar al modificar el contenido de algún informe para no servir archivos de la versión anterior
+VERSION_REPORTES = 1
+
+# Formato -> tipo MIME de la descarga
+FORMATOS_REPORTE = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf"
+}
+
+# Mismas columnas que el CSV que generaba la interfaz
+ENCABEZADOS_RUTAS = [
+    'ID Familia', 'Tamaño Familia', 'Nodos en Ruta', 'Origen', 'Destino',
+    'Ruta Completa', 'Total Personas', 'Distancia (km)', 'Familias en Ruta'
+]
+
+TITULO_REPORTE = "Reporte de Optimización de Rutas de Evacuación"
+SUBTITULOS_REPORTE = (
+    "Tesis Doctoral: Modelos de Optimización matemática para el manejo de emergencias meteorológicas",
+    "Universidad de La Habana, Cuba - Doctorando: Msc. Yasmany Fernández Fernández"
+)
+
+def huella_resultados(resultados):
+    # Hash SHA-256 de lo que aparece en los informes: dos versiones con la misma solución
+    # (y los mismos datos de entrada) comparten los archivos generados
+    canonico = {
+        "version_reportes": VERSION_REPORTES,
+        "status": resultados.get('status'),
+        "valor_objetivo": resultados.get('valor_objetivo'),
+        "enfoque": resultados.get('enfoque'),
+        "nodos_activados": resultados.get('resumen', {}).get('nodos_activados', []),
+        "huella_datos": resultados.get('registro', {}).get('huella_datos'),
+        "familias": resultados.get('familias'),
+        "rutas": resultados.get('rutas')
+    }
+    texto = json.dumps(canonico, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+def fila_ruta(ruta):
+    # Valores de una fila de reporte_rutas en el orden de ENCABEZADOS_RUTAS
+    return [
+        ruta['id_familia'], ruta['tamaño_familia'], ruta['num_nodos_ruta'], ruta['origen'], ruta['destino'],
+        ruta['ruta_str'], ruta['personas_en_ruta'], round(float(ruta['distancia'] or 0), 2), ruta['familias_en_ruta']
+    ]
+
+def totales_evacuados(resultados):
+    personas = familias = 0
+    for ruta in iterar_rutas(resultados):
+        personas += ruta['personas_en_ruta']
+        familias += ruta['familias_en_ruta']
+    return personas, familias
+
+def _lineas_resumen(resultados):
+    personas, familias = totales_evacuados(resultados)
+    nodos = resultados.get('resumen', {}).get('nodos_activados', [])
+    return [
+        ("Estado de la solución", resultados.get('status')),
+        ("Valor objetivo", resultados.get('valor_objetivo')),
+        ("Enfoque", resultados.get('enfoque') or "determinista"),
+        ("Total personas evacuadas", personas),
+        ("Total familias evacuadas", familias),
+        ("Rutas", total_rutas(resultados)),
+        (f"Nodos activados ({len(nodos)})", ", ".join(nodos))
+    ]
+
+def generar_csv(resultados, ruta_archivo, datos=None):
+    # BOM, ';' y todas las celdas entre comillas para que Excel lo abra directamente
+    with open(ruta_archivo, 'w', encoding='utf-8-sig', newline='') as f:
+        escritor = csv.writer(f, delimiter=';', quoting=csv.QUOTE_ALL, lineterminator='\r\n')
+        escritor.writerow(ENCABEZADOS_RUTAS)
+        for ruta in iterar_rutas(resultados):
+            fila = fila_ruta(ruta)
+            fila[7] = f"{fila[7]:.2f}"
+            escritor.writerow(fila)
+
+def generar_xlsx(resultados, ruta_archivo, datos=None):
+    from openpyxl import Workbook
+
+    # Modo de solo escritura: cada fila se vuelca a disco al añadirla
+    libro = Workbook(write_only=True)
+    resumen = libro.create_sheet("Resumen")
+    resumen.column_dimensions['A'].width = 28
+    resumen.column_dimensions['B'].width = 60
+    resumen.append([TITULO_REPORTE])
+    for etiqueta, valor in _lineas_resumen(resultados):
+        resumen.append([etiqueta, valor])
+
+    hoja = libro.create_sheet("Rutas")
+    for columna, ancho in zip("ABCDEFGHI", (12, 14, 13, 12, 12, 50, 14, 14, 16)):
+        hoja.column_dimensions[columna].width = ancho
+    hoja.freeze_panes = 'A2'
+    hoja.append(ENCABEZADOS_RUTAS)
+    for ruta in iterar_rutas(resultados):
+        hoja.append(fila_ruta(ruta))
+    libro.save(ruta_archivo)
+
+def _texto_pdf(valor):
+    # Las fuentes estándar de fpdf solo cubren latin-1
+    return str(valor).encode('latin-1', 'replace').decode('latin-1')
+
+# Columnas de la tabla de rutas del PDF: (encabezado, ancho en mm, campo, alineación)
+COLUMNAS_PDF = (
+    ("ID Familia", 18, 'id_familia', 'C'),
+    ("Tamaño", 15, 'tamaño_familia', 'C'),
+    ("Familias", 16, 'familias_en_ruta', 'C'),
+    ("Personas", 17, 'personas_en_ruta', 'C'),
+    ("Ruta", 88, 'ruta_str', 'L'),
+    ("Nodos", 14, 'num_nodos_ruta', 'C'),
+    ("Distancia", 22, 'distancia', 'R')
+)
+
+def _clase_pdf():
+    from fpdf import FPDF
+
+    class InformePDF(FPDF):
+        # Repite los encabezados de la tabla de rutas en cada página nueva y numera las páginas
+        en_tabla = False
+
+        def header(self):
+            if self.en_tabla:
+                self.encabezado_tabla()
+
+        def footer(self):
+            self.set_y(-12)
+            self.set_font('Arial', 'I', 8)
+            self.set_text_color(120)
+            self.cell(0, 8, _texto_pdf(f"Página {self.page_no()}/{{nb}}"), 0, 0, 'C')
+
+        def encabezado_tabla(self):
+            self.set_font('Arial', 'B', 8)
+            self.set_fill_color(41, 128, 185)
+            self.set_text_color(255)
+            for titulo, ancho, _, _ in COLUMNAS_PDF:
+                self.cell(ancho, 6, _texto_pdf(titulo), 1, 0, 'C', 1)
+            self.ln()
+            self.set_font('Arial', '', 8)
+            self.set_text_color(0)
+
+        def titulo_seccion(self, texto):
+            self.ln(4)
+            self.set_font('Arial', 'B', 13)
+            self.set_text_color(40)
+            self.cell(0, 8, _texto_pdf(texto), 0, 1)
+            self.set_font('Arial', '', 10)
+            self.set_text_color(0)
+
+        def par(self, etiqueta, valor):
+            self.set_font('Arial', 'B', 10)
+            self.cell(62, 6, _texto_pdf(f"{etiqueta}:"), 0, 0)
+            self.set_font('Arial', '', 10)
+            self.multi_cell(0, 6, _texto_pdf(valor))
+
+        def recortar(self, texto, ancho):
+            # La ruta completa puede no caber en la columna; se acorta por el final
+            texto = _texto_pdf(texto)
+            if self.get_string_width(texto) <= ancho - 2:
+                return texto
+            while texto and self.get_string_width(texto + "...") > ancho - 2:
+                texto = texto[:-1]
+            return texto + "..."
+
+    return InformePDF
+
+def _datos_entrada_pdf(pdf, datos):
+    pdf.titulo_seccion("2. Datos de Entrada")
+    A, R, F = datos.get('etiquetasA', []), datos.get('etiquetasR', []), datos.get('etiquetasF', [])
+    pdf.par("Puntos de salida (A)", len(A))
+    pdf.par("Puntos de tránsito (R)", len(R))
+    pdf.par("Puntos de llegada (F)", len(F))
+    pdf.par("Familias", len(datos.get('idFamilias') or datos.get('idf') or []))
+    pdf.par("Costo por km (c)", datos.get('costoPorKm'))
+    pdf.par("Parámetros alpha, beta, gamma", f"{datos.get('alpha')}, {datos.get('beta')}, {datos.get('gamma')}")
+
+    # Costos de acondicionamiento y capacidades por nodo
+    ac, pi = datos.get('ac') or {}, datos.get('pi') or {}
+    nodos = [nodo for nodo in R + F if nodo in ac or nodo in pi]
+    if nodos:
+        pdf.ln(2)
+        pdf.set_font('Arial', 'B', 9)
+        pdf.set_fill_color(230)
+        for titulo in ("Nodo", "Costo de acondicionamiento", "Capacidad (pi)"):
+            pdf.cell(60, 6, _texto_pdf(titulo), 1, 0, 'C', 1)
+        pdf.ln()
+        pdf.set_font('Arial', '', 9)
+        for nodo in nodos:
+            pdf.cell(60, 5, _texto_pdf(nodo), 1, 0, 'C')
+            pdf.cell(60, 5, _texto_pdf(ac.get(nodo, "-")), 1, 0, 'C')
+            pdf.cell(60, 5, _texto_pdf(pi.get(nodo, "-")), 1, 1, 'C')
+
+def generar_pdf(resultados, ruta_archivo, datos=None):
+    pdf = _clase_pdf()('P', 'mm', 'A4')
+    pdf.alias_nb_pages()
+    pdf.set_margins(10, 12, 10)
+    pdf.set_auto_page_break(True, 15)
+    pdf.add_page()
+
+    pdf.set_font('Arial', 'B', 15)
+    pdf.cell(0, 9, _texto_pdf(TITULO_REPORTE), 0, 1, 'C')
+    pdf.set_font('Arial', '', 9)
+    for subtitulo in SUBTITULOS_REPORTE:
+        pdf.cell(0, 5, _texto_pdf(subtitulo), 0, 1, 'C')
+    pdf.cell(0, 6, _texto_pdf(f"Generado el: {datetime.now().strftime('%d/%m/%Y %H:%M')}"), 0, 1, 'C')
+
+    pdf.titulo_seccion("1. Resumen")
+    for etiqueta, valor in _lineas_resumen(resultados):
+        pdf.par(etiqueta, valor)
+
+    if datos:
+        _datos_entrada_pdf(pdf, datos)
+
+    pdf.titulo_seccion("3. Reporte Detallado de Rutas")
+    if not total_rutas(resultados):
+        pdf.cell(0, 6, _texto_pdf("No se encontraron rutas óptimas"), 0, 1)
+    else:
+        pdf.encabezado_tabla()
+        pdf.en_tabla = True
+        for indice, ruta in enumerate(iterar_rutas(resultados)):
+            relleno = indice % 2
+            pdf.set_fill_color(245)
+            for _, ancho, campo, alineacion in COLUMNAS_PDF:
+                valor = ruta[campo]
+                if campo == 'distancia':
+                    texto = f"{float(valor or 0):.2f} km"
+                elif campo == 'ruta_str':
+                    texto = pdf.recortar(valor, ancho)
+                else:
+                    texto = _texto_pdf(valor)
+                pdf.cell(ancho, 5, texto, 1, 0, alineacion, relleno)
+            pdf.ln()
+        pdf.en_tabla = False
+    pdf.output(ruta_archivo, 'F')
+
+GENERADORES_REPORTE = {
+    "csv": generar_csv,
+    "xlsx": generar_xlsx,
+    "pdf": generar_pdf
+}
+
+class CacheReportes:
+    def __init__(self, directorio='cache_reportes', max_entradas=32, max_bytes=512 * 1024 * 1024):
+        # Informes ya generados en disco (<huella>.<formato>) con desalojo LRU por número de
+        # archivos y tamaño total. Varios procesos pueden compartir el directorio: cada informe
+        # se genera una sola vez bajo su propio bloqueo de archivo y se publica con un renombrado
+        self.directorio = directorio
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.generados = 0
+        self.desalojos = 0
+
+    def _ruta(self, huella, formato):
+        return os.path.join(self.directorio, f"{huella}.{formato}")
+
+    def _ruta_bloqueo(self, huella):
+        # Un bloqueo por cada prefijo de la huella (256 como mucho): los archivos de bloqueo se
+        # crean una vez y no se borran nunca, así que dos procesos no pueden acabar con dos
+        # archivos distintos para el mismo informe
+        return os.path.join(self.directorio, f".bloqueo_{huella[:2]}")
+
+    def _abrir(self, ruta):
+        # Abre el informe y lo marca como usado; None si no existe (nunca generado o desalojado).
+        # Una vez abierto sigue siendo legible aunque otro proceso lo desaloje
+        try:
+            archivo = open(ruta, 'rb')
+        except OSError:
+            return None
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        return archivo
+
+    def obtener(self, resultados, formato, datos=None):
+        # Informe de los resultados en el formato pedido, abierto para lectura y generado si hace
+        # falta, y la huella que lo identifica
+        if formato not in GENERADORES_REPORTE:
+            raise ValueError(f"Formato de informe no soportado: {formato} (use {', '.join(FORMATOS_REPORTE)})")
+        huella = huella_resultados(resultados)
+        ruta = self._ruta(huella, formato)
+        archivo = self._abrir(ruta)
+        generado = False
+        if archivo is None:
+            with bloqueo_archivo(self._ruta_bloqueo(huella)):
+                # Otro worker pudo generarlo mientras se esperaba el bloqueo
+                archivo = self._abrir(ruta)
+                if archivo is None:
+                    inicio = time.perf_counter()
+                    with reemplazo_atomico(ruta) as temporal:
+                        GENERADORES_REPORTE[formato](resultados, temporal, datos)
+                    registro.observar("reportes_generacion_segundos", time.perf_counter() - inicio, formato=formato)
+                    archivo = open(ruta, 'rb')
+                    generado = True
+        with self._lock:
+            if generado:
+                self.generados += 1
+            else:
+                self.aciertos += 1
+        if generado:
+            self._desalojar(ruta)
+        return archivo, huella
+
+    def _entradas(self):
+        # (fecha de modificación, tamaño, nombre) de los informes, del menos al más reciente
+        entradas = []
+        if os.path.isdir(self.directorio):
+            for nombre in os.listdir(self.directorio):
+                if nombre.startswith('.'):
+                    continue
+                try:
+                    estado = os.stat(os.path.join(self.directorio, nombre))
+                except OSError:
+                    continue
+                entradas.append((estado.st_mtime, estado.st_size, nombre))
+        return sorted(entradas)
+
+    def _eliminar(self, nombre):
+        # Solo con el bloqueo del informe libre: si otro worker lo está generando se deja para
+        # el siguiente desalojo. En Windows tampoco se puede borrar mientras alguien lo lee
+        with intentar_bloqueo(self._ruta_bloqueo(nombre.split('.')[0])) as obtenido:
+            if not obtenido:
+                return False
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+                return True
+            except OSError:
+                return False
+
+    def _desalojar(self, conservar):
+        # Eliminar los informes menos usados hasta respetar ambos límites, salvo el recién generado
+        with self._lock, bloqueo_archivo(os.path.join(self.directorio, '.bloqueo')):
+            entradas = self._entradas()
+            cantidad = len(entradas)
+            total = sum(tamaño for _, tamaño, _ in entradas)
+            for _, tamaño, nombre in entradas:
+                if cantidad <= self.max_entradas and total <= self.max_bytes:
+                    break
+                if nombre == os.path.basename(conservar) or not self._eliminar(nombre):
+                    continue
+                cantidad -= 1
+                total -= tamaño
+                self.desalojos += 1
+
+    def limpiar(self):
+        with self._lock, bloqueo_archivo(os.path.join(self.directorio, '.bloqueo')):
+            for _, _, nombre in self._entradas():
+                self._eliminar(nombre)
+
+    def estadisticas(self):
+        entradas = self._entradas()
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "generados": self.generados,
+                "desalojos": self.desalojos,
+                "entradas": len(entradas),
+                "bytes": sum(tamaño for _, tamaño, _ in entradas),
+                "max_entradas": self.max_entradas,
+                "max_bytes": self.max_bytes
+            }
+
+_cache_reportes = None
+_lock_cache_reportes = threading.Lock()
+
+def crear_cache_reportes(directorio=None):
+    # Límites configurables con variables de entorno
+    return CacheReportes(
+        directorio=directorio or os.environ.get('CACHE_REPORTES_DIR', 'cache_reportes'),
+        max_entradas=int(os.environ.get('CACHE_REPORTES_MAX_ENTRADAS', 32)),
+        max_bytes=int(os.environ.get('CACHE_REPORTES_MAX_BYTES', 512 * 1024 * 1024))
+    )
+
+def obtener_cache_reportes():
+    # Caché de informes compartida por el proceso para el uso fuera del servidor; cada
+    # aplicación de app.py crea la suya
+    global _cache_reportes
+    with _lock_cache_reportes:
+        if _cache_reportes is None:
+            _cache_reportes = crear_cache_reportes()
+        return _cache_reportes
@@ -0,0 +1,189 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import threading
+from collections import OrderedDict
+import networkx as nx
+from formato_resultados import iterar_rutas
+
+TIPOS_NODO = ("salida", "transito", "llegada")
+DISPOSICIONES = ("capas", "fuerzas")
+
+# Tamaño (en unidades de vis.js) del lienzo sobre el que se escalan las posiciones
+ESCALA = 1000
+
+class ServicioGrafo:
+    def __init__(self, almacen, max_escenarios=8):
+        # Grafo, posiciones y uso de arcos se calculan una vez por versión de datos y de
+        # resultados de cada escenario; se conservan los max_escenarios usados más recientemente
+        self.almacen = almacen
+        self.max_escenarios = max_escenarios
+        self._lock = threading.Lock()
+        self._escenarios = OrderedDict()
+
+    def _estado(self, escenario):
+        # Estado en memoria del escenario, actualizado si cambió alguna versión en el almacén
+        version_datos, version_resultados = self.almacen.versiones(escenario)
+        estado = self._escenarios.get(escenario)
+        if estado is None:
+            estado = self._escenarios[escenario] = {"version_datos": None, "version_resultados": None}
+            while len(self._escenarios) > self.max_escenarios:
+                self._escenarios.popitem(last=False)
+        self._escenarios.move_to_end(escenario)
+
+        if estado["version_datos"] != version_datos or "grafo" not in estado:
+            datos = self.almacen.obtener_datos(escenario, version_datos) if version_datos else None
+            estado.update(version_datos=version_datos, grafo=self._construir_grafo(datos) if datos else None,
+                          posiciones={})
+        if estado["version_resultados"] != version_resultados or "uso" not in estado:
+            resultados = self.almacen.obtener_resultados(escenario, version_resultados) if version_resultados else None
+            estado.update(version_resultados=version_resultados, uso=self._uso_arcos(resultados))
+        return estado
+
+    @staticmethod
+    def _construir_grafo(datos):
+        grafo = nx.DiGraph(datos=datos)
+        for tipo, etiquetas in zip(TIPOS_NODO, (datos['etiquetasA'], datos['etiquetasR'], datos['etiquetasF'])):
+            for nodo in etiquetas:
+                grafo.add_node(nodo, tipo=tipo, capa=TIPOS_NODO.index(tipo))
+        for i, fila in datos['distancias'].items():
+            for j, distancia in fila.items():
+                if distancia and distancia > 0:
+                    grafo.add_edge(i, j, distancia=distancia)
+        return grafo
+
+    @staticmethod
+    def _uso_arcos(resultados):
+        # Personas por arco y rutas de los últimos resultados
+        if resultados is None:
+            return {"arcos": {}, "rutas": []}
+        tamaños = dict(zip(resultados['familias']['id'], resultados['familias']['tamaño']))
+        flujos = resultados['flujos']
+        arcos = {}
+        for id_fam, i, j, cantidad in zip(flujos['familia'], flujos['desde'], flujos['hacia'], flujos['cantidad']):
+            arcos[(i, j)] = arcos.get((i, j), 0) + tamaños[id_fam] * cantidad
+        return {"arcos": arcos, "rutas": list(iterar_rutas(resultados))}
+
+    @staticmethod
+    def _disposicion(estado, disposicion):
+        # Capas: salida, tránsito y llegada en columnas; fuerzas: resorte partiendo de las capas
+        if disposicion not in estado["posiciones"]:
+            grafo = estado["grafo"]
+            if grafo.number_of_nodes() == 0:
+                posiciones = {}
+            else:
+                posiciones = nx.multipartite_layout(grafo, subset_key="capa", scale=ESCALA)
+                if disposicion == "fuerzas":
+                    posiciones = nx.spring_layout(grafo, pos=posiciones, seed=0, scale=ESCALA, weight=None)
+            estado["posiciones"][disposicion] = {
+                nodo: (round(float(x), 1), round(float(y), 1)) for nodo, (x, y) in posiciones.items()
+            }
+        return estado["posiciones"][disposicion]
+
+    @staticmethod
+    def _agrupar_rutas(estado):
+        # Rutas con el mismo recorrido reunidas en una, con sus totales y las familias que la usan
+        uso = estado["uso"]
+        if "agrupadas" not in uso:
+            grafo = estado["grafo"]
+            agrupadas = {}
+            for ruta in uso["rutas"]:
+                grupo = agrupadas.get(ruta["ruta_str"])
+                if grupo is None:
+                    nodos = ruta["ruta_str"].split("->")
+                    distancia = ruta["distancia"] or sum(
+                        grafo.edges[i, j]['distancia'] for i, j in zip(nodos, nodos[1:]) if grafo.has_edge(i, j))
+                    grupo = agrupadas[ruta["ruta_str"]] = {
+                        "id": len(agrupadas) + 1, "ruta_str": ruta["ruta_str"], "nodos": nodos,
+                        "origen": ruta["origen"], "destino": ruta["destino"], "distancia": distancia,
+                        "total_familias": 0, "total_personas": 0, "familias": []
+                    }
+                grupo["total_familias"] += ruta["familias_en_ruta"]
+                grupo["total_personas"] += ruta["personas_en_ruta"]
+                grupo["familias"].append({"id_familia": ruta["id_familia"], "tamaño_familia": ruta["tamaño_familia"],
+                                          "personas_en_ruta": ruta["personas_en_ruta"]})
+            uso["agrupadas"] = list(agrupadas.values())
+        return uso["agrupadas"]
+
+    def consultar_rutas(self, escenario, destino=None, agrupar=False, desde=0, limite=100):
+        # Rutas de los últimos resultados (por familia o agrupadas por recorrido) por páginas
+        with self._lock:
+            estado = self._estado(escenario)
+            if estado["grafo"] is None:
+                return None
+            rutas = self._agrupar_rutas(estado) if agrupar else estado["uso"]["rutas"]
+            rutas = [ruta for ruta in rutas if destino is None or ruta["destino"] == destino]
+            return {
+                "escenario": escenario,
+                "version_resultados": estado["version_resultados"],
+                "agrupadas": agrupar,
+                "rutas": rutas[desde:desde + limite],
+                "total_rutas": len(rutas),
+                "desde": desde,
+                "limite": limite
+            }
+
+    def consultar(self, escenario, tipos=None, solo_usados=False, destino=None, caja=None,
+                  desde=0, limite=500, disposicion="capas"):
+        # Nodos con posición y las aristas y rutas que cumplen los filtros; aristas y rutas se
+        # devuelven por páginas (desde, limite) con sus totales para pedir el resto
+        if disposicion not in DISPOSICIONES:
+            raise ValueError(f"Disposición no soportada: {disposicion}. Opciones: {', '.join(DISPOSICIONES)}")
+        for tipo in tipos or ():
+            if tipo not in TIPOS_NODO:
+                raise ValueError(f"Tipo de nodo no soportado: {tipo}. Opciones: {', '.join(TIPOS_NODO)}")
+
+        with self._lock:
+            estado = self._estado(escenario)
+            if estado["grafo"] is None:
+                return None
+            posiciones = self._disposicion(estado, disposicion)
+            grafo = estado["grafo"]
+            uso = estado["uso"]
+
+            # Nodos por tipo y dentro del rectángulo (x0, y0, x1, y1)
+            nodos = []
+            for nodo, atributos in grafo.nodes(data=True):
+                if tipos and atributos['tipo'] not in tipos:
+                    continue
+                x, y = posiciones[nodo]
+                if caja and not (caja[0] <= x <= caja[2] and caja[1] <= y <= caja[3]):
+                    continue
+                nodos.append({"id": nodo, "tipo": atributos['tipo'], "x": x, "y": y})
+            seleccionados = {nodo["id"] for nodo in nodos}
+
+            # Rutas hacia el destino pedido; si hay destino, solo interesan los arcos de esas rutas
+            rutas = [ruta for ruta in uso["rutas"] if destino is None or ruta["destino"] == destino]
+            arcos_destino = None
+            if destino is not None:
+                arcos_destino = set()
+                for ruta in rutas:
+                    nodos_ruta = ruta["ruta_str"].split("->")
+                    arcos_destino.update(zip(nodos_ruta, nodos_ruta[1:]))
+
+            aristas = []
+            for i, j, atributos in grafo.edges(data=True):
+                if i not in seleccionados or j not in seleccionados:
+                    continue
+                personas = uso["arcos"].get((i, j), 0)
+                if (solo_usados and not personas) or (arcos_destino is not None and (i, j) not in arcos_destino):
+                    continue
+                aristas.append({"desde": i, "hacia": j, "distancia": atributos['distancia'], "personas": personas})
+            rutas = [
+                ruta for ruta in rutas
+                if all(nodo in seleccionados for nodo in ruta["ruta_str"].split("->"))
+            ]
+
+            return {
+                "escenario": escenario,
+                "version_datos": estado["version_datos"],
+                "version_resultados": estado["version_resultados"],
+                "nodos": nodos,
+                "aristas": aristas[desde:desde + limite],
+                "rutas": rutas[desde:desde + limite],
+                "total_nodos": len(nodos),
+                "total_aristas": len(aristas),
+                "total_rutas": len(rutas),
+                "desde": desde,
+                "limite": limite,
+                "disposicion": disposicion
+            }
@@ -0,0 +1,44 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import copy
+import threading
+import time
+from optimizacion import ModeloOptimizacion
+from configuracion_solver import cargar_configuracion
+
+class SesionModelo:
+    def __init__(self, agrupar=True):
+        # Conserva el LpProblem construido entre resoluciones para los análisis "qué pasa si"
+        self.agrupar = agrupar
+        self.modelo = None
+        self.resoluciones = 0
+        self._lock = threading.Lock()
+
+    def resolver(self, datos, configuracion=None):
+        # Resolver los datos reutilizando el modelo anterior cuando solo cambian capacidades,
+        # demandas o costos; la solución previa se pasa al solver como inicio MIP
+        datos = copy.deepcopy(datos)
+        configuracion = configuracion or cargar_configuracion()
+        with self._lock:
+            inicio = time.perf_counter()
+            if self.modelo is not None and self.modelo.admite_actualizacion(datos):
+                cambios = self.modelo.actualizar_parametros(datos)
+                reconstruido = False
+            else:
+                self.modelo = ModeloOptimizacion(datos, agrupar=self.agrupar)
+                cambios = []
+                reconstruido = True
+
+            resultados = self.modelo.resolver(configuracion, inicio_mip=not reconstruido)
+            self.resoluciones += 1
+            resultados['sesion'] = {
+                "reconstruido": reconstruido,
+                "cambios": cambios,
+                "resoluciones": self.resoluciones,
+                "tiempo": time.perf_counter() - inicio
+            }
+            return resultados
+
+    def descartar(self):
+        with self._lock:
+            self.modelo = None
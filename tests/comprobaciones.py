@@ -0,0 +1,35 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import pytest
+from formato_resultados import iterar_rutas, vista_flujos_por_familia
+
+def comprobar_rutas(datos, resultados):
+    # Cada ruta sale del origen de su grupo por arcos existentes y llega a un centro seguro; por
+    # grupo, las rutas envían a todas sus familias y reproducen sus flujos arco a arco, y ningún
+    # centro recibe más personas que su capacidad. Supone redes sin arcos hacia los orígenes ni
+    # desde los centros seguros (benchmarks.generador)
+    flujos_rutas = {}
+    enviadas = {}
+    llegadas = {}
+    for ruta in iterar_rutas(resultados):
+        id_fam = str(ruta['id_familia'])
+        nodos = ruta['ruta_str'].split("->")
+        assert nodos[0] == datos['idf'][id_fam]['ns']
+        assert nodos[-1] in datos['etiquetasF']
+        assert len(set(nodos)) == len(nodos)
+        assert ruta['familias_en_ruta'] > 0
+        assert all(datos['distancias'][i][j] > 0 for i, j in zip(nodos, nodos[1:]))
+        assert ruta['distancia'] == pytest.approx(sum(datos['distancias'][i][j] for i, j in zip(nodos, nodos[1:])))
+        enviadas[id_fam] = enviadas.get(id_fam, 0) + ruta['familias_en_ruta']
+        llegadas[nodos[-1]] = llegadas.get(nodos[-1], 0) + ruta['personas_en_ruta']
+        arcos = flujos_rutas.setdefault(id_fam, {})
+        for i, j in zip(nodos, nodos[1:]):
+            arcos[(i, j)] = arcos.get((i, j), 0) + ruta['familias_en_ruta']
+
+    for id_fam in datos['idFamilias']:
+        assert enviadas.get(id_fam, 0) == pytest.approx(int(datos['idf'][id_fam]['valor']))
+    for nll, personas in llegadas.items():
+        assert personas <= datos['pi'][nll] + 1e-6
+    for id_fam, familia in vista_flujos_por_familia(resultados).items():
+        arcos = {(flujo['desde'], flujo['hacia']): flujo['cantidad'] for flujo in familia['flujos'] if flujo['cantidad'] > 1e-6}
+        assert arcos == pytest.approx(flujos_rutas.get(id_fam, {}))
@@ -0,0 +1,75 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import copy
+from types import SimpleNamespace
+from pymongo.errors import DuplicateKeyError
+
+# Sustituto en memoria de una base de pymongo con las operaciones que usa AlmacenMongo:
+# filtros por igualdad y $lte, proyecciones de inclusión, orden y un índice único
+
+def _cumple(documento, filtro):
+    for campo, condicion in filtro.items():
+        valor = documento.get(campo)
+        if isinstance(condicion, dict):
+            if '$lte' in condicion and not (valor is not None and valor <= condicion['$lte']):
+                return False
+        elif valor != condicion:
+            return False
+    return True
+
+def _proyectar(documento, proyeccion):
+    if not proyeccion:
+        return copy.deepcopy(documento)
+    return {campo: copy.deepcopy(valor) for campo, valor in documento.items() if campo in proyeccion or campo == '_id'}
+
+class CursorFalso:
+    # Como en el servidor, se ordena antes de aplicar la proyección
+    def __init__(self, documentos, proyeccion):
+        self._documentos = documentos
+        self._proyeccion = proyeccion
+
+    def sort(self, campo, sentido=1):
+        self._documentos.sort(key=lambda documento: documento.get(campo), reverse=sentido < 0)
+        return self
+
+    def __iter__(self):
+        return (_proyectar(documento, self._proyeccion) for documento in self._documentos)
+
+class ColeccionFalsa:
+    def __init__(self):
+        self.documentos = []
+        self.unicos = []
+        self.indices = []
+
+    def create_index(self, claves, unique=False):
+        campos = tuple(campo for campo, _ in claves)
+        self.indices.append(campos)
+        if unique:
+            self.unicos.append(campos)
+
+    def insert_one(self, documento):
+        for campos in self.unicos:
+            clave = tuple(documento.get(campo) for campo in campos)
+            if any(tuple(otro.get(campo) for campo in campos) == clave for otro in self.documentos):
+                raise DuplicateKeyError(f"clave duplicada {clave}")
+        self.documentos.append(dict(copy.deepcopy(documento), _id=len(self.documentos) + 1))
+        return SimpleNamespace(inserted_id=len(self.documentos))
+
+    def find(self, filtro=None, proyeccion=None):
+        return CursorFalso([d for d in self.documentos if _cumple(d, filtro or {})], proyeccion)
+
+    def find_one(self, filtro=None, proyeccion=None, sort=None):
+        documentos = [d for d in self.documentos if _cumple(d, filtro or {})]
+        for campo, sentido in reversed(sort or []):
+            documentos.sort(key=lambda documento: documento.get(campo), reverse=sentido < 0)
+        return _proyectar(documentos[0], proyeccion) if documentos else None
+
+    def delete_many(self, filtro):
+        antes = len(self.documentos)
+        self.documentos = [d for d in self.documentos if not _cumple(d, filtro)]
+        return SimpleNamespace(deleted_count=antes - len(self.documentos))
+
+class BaseDatosFalsa(dict):
+    def __missing__(self, nombre):
+        self[nombre] = ColeccionFalsa()
+        return self[nombre]
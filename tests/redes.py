@@ -0,0 +1,39 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import random
+
+def red_densa(semilla, num_A=3, num_R=3, num_F=3, densidad=0.6):
+    # Red aleatoria densa con arcos en cualquier sentido (también hacia nodos de salida y desde
+    # centros seguros), a diferencia de benchmarks.generador; capacidades ajustadas a la demanda
+    aleatorio = random.Random(semilla)
+    etiquetasA = [f"A{i}" for i in range(1, num_A + 1)]
+    etiquetasR = [f"R{i}" for i in range(1, num_R + 1)]
+    etiquetasF = [f"F{i}" for i in range(1, num_F + 1)]
+    etiquetas = etiquetasA + etiquetasR + etiquetasF
+    distancias = {i: {j: 0 for j in etiquetas} for i in etiquetas}
+    for i in etiquetas:
+        for j in etiquetas:
+            if i != j and aleatorio.random() < densidad:
+                distancias[i][j] = aleatorio.randint(1, 50)
+
+    idf = {}
+    for a in etiquetasA:
+        for h in range(1, 4):
+            for _ in range(aleatorio.randint(0, 2)):
+                id_fam = str(len(idf) + 1)
+                idf[id_fam] = {"h": str(h), "ns": a, "valor": aleatorio.randint(1, 4)}
+    total = sum(int(familia['h']) * familia['valor'] for familia in idf.values())
+    return {
+        "etiquetasA": etiquetasA,
+        "etiquetasR": etiquetasR,
+        "etiquetasF": etiquetasF,
+        "distancias": distancias,
+        "idf": idf,
+        "idFamilias": list(idf),
+        "costoPorKm": 1.0,
+        "ac": {rf: aleatorio.randint(10, 100) for rf in etiquetasR + etiquetasF},
+        "pi": {f: aleatorio.randint(total // num_F, total) for f in etiquetasF},
+        "alpha": total,
+        "beta": aleatorio.randint(total // 2, total),
+        "gamma": aleatorio.randint(total // 2, total)
+    }
@@ -0,0 +1,117 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import pytest
+from almacen_escenarios import AlmacenSQLite, AlmacenMongo
+from cache_resultados import huella_datos
+from mongo_falso import BaseDatosFalsa
+
+# El mismo contrato para los dos adaptadores del almacén de escenarios
+
+@pytest.fixture(params=["sqlite", "mongo"])
+def almacen(request, tmp_path):
+    if request.param == "sqlite":
+        return AlmacenSQLite(str(tmp_path / "escenarios.db"), max_versiones=3)
+    return AlmacenMongo(BaseDatosFalsa(), max_versiones=3)
+
+def _datos(alpha=10):
+    return {
+        "etiquetasA": ["A1"], "etiquetasR": ["R1"], "etiquetasF": ["F1"],
+        "distancias": {"A1": {"R1": 5, "F1": 0}, "R1": {"F1": 3}},
+        "idf": {"1": {"h": 2, "ns": "A1", "valor": 3}}, "idFamilias": ["1"],
+        "ac": {"R1": 1, "F1": 2}, "pi": {"F1": 50}, "alpha": alpha, "beta": 50, "gamma": 50, "costoPorKm": 1.0
+    }
+
+def _resultados(valor_objetivo=19.0):
+    return {
+        "formato": 1, "status": "Optimal", "valor_objetivo": valor_objetivo,
+        "resumen": {"nodos_activados": ["R1", "F1"]},
+        "familias": {"id": ["1"], "tamaño": [2], "origen": ["A1"]},
+        "flujos": {"familia": ["1", "1"], "desde": ["A1", "R1"], "hacia": ["R1", "F1"], "cantidad": [3, 3]},
+        "rutas": {"familia": ["1"], "ruta": ["A1->R1->F1"], "cantidad": [3], "distancia": [8]}
+    }
+
+def test_versiones_de_datos(almacen):
+    assert almacen.obtener_datos("e1") is None
+    assert almacen.versiones("e1") == (None, None)
+    assert almacen.guardar_datos("e1", _datos(10)) == 1
+    # Los mismos datos no crean una versión nueva
+    assert almacen.guardar_datos("e1", _datos(10)) == 1
+    assert almacen.guardar_datos("e1", _datos(20)) == 2
+    assert almacen.obtener_datos("e1")['alpha'] == 20
+    assert almacen.obtener_datos("e1", 1)['alpha'] == 10
+    assert almacen.obtener_datos("e1", "1")['alpha'] == 10
+    assert almacen.obtener_datos("e2") is None
+    assert almacen.versiones("e1") == (2, None)
+
+def test_resultados_enlazados_y_lectura_parcial(almacen):
+    almacen.guardar_datos("e1", _datos(10))
+    almacen.guardar_datos("e1", _datos(20))
+    assert almacen.guardar_resultados("e1", _resultados(), _datos(10)) == 1
+    completos = almacen.obtener_resultados("e1")
+    assert completos['status'] == "Optimal"
+    assert completos['rutas'] == _resultados()['rutas']
+    assert completos['flujos'] == _resultados()['flujos']
+    assert completos['registro']['version'] == 1
+    assert completos['registro']['version_datos'] == 1
+    assert completos['registro']['huella_datos'] == huella_datos(_datos(10))
+
+    parciales = almacen.obtener_resultados("e1", partes=("familias", "rutas"))
+    assert 'flujos' not in parciales
+    assert parciales['familias'] == _resultados()['familias']
+
+    # Resultados sin datos de entrada asociados
+    assert almacen.guardar_resultados("e1", _resultados(7.0)) == 2
+    assert almacen.obtener_resultados("e1")['registro']['version_datos'] is None
+    assert almacen.obtener_resultados("e1", 1)['valor_objetivo'] == 19.0
+    assert almacen.obtener_resultados("e2") is None
+
+def test_solo_se_conservan_las_ultimas_versiones(almacen):
+    for alpha in range(1, 6):
+        almacen.guardar_datos("e1", _datos(alpha))
+    assert [d['version'] for d in almacen.historial("e1")['datos']] == [3, 4, 5]
+    assert almacen.obtener_datos("e1", 1) is None
+    assert almacen.obtener_datos("e1", 3)['alpha'] == 3
+
+def test_historial_busqueda_listado_y_eliminacion(almacen):
+    almacen.guardar_datos("e1", _datos(10))
+    almacen.guardar_datos("e2", _datos(10))
+    almacen.guardar_resultados("e2", _resultados(), _datos(10))
+
+    historial = almacen.historial("e2")
+    assert [d['version'] for d in historial['datos']] == [1]
+    assert historial['resultados'][0]['status'] == "Optimal"
+    assert historial['resultados'][0]['valor_objetivo'] == 19.0
+    assert historial['resultados'][0]['version_datos'] == 1
+
+    encontrados = almacen.buscar_por_huella(huella_datos(_datos(10)))
+    assert sorted((e['escenario'], e['version']) for e in encontrados) == [("e1", 1), ("e2", 1)]
+
+    listado = {e['escenario']: e for e in almacen.listar_escenarios()}
+    assert set(listado) == {"e1", "e2"}
+    assert listado["e2"]['version_datos'] == 1
+    assert listado["e2"]['version_resultados'] == 1
+    assert listado["e1"]['version_resultados'] is None
+
+    assert almacen.eliminar("e2")
+    assert not almacen.eliminar("e2")
+    assert almacen.versiones("e2") == (None, None)
+    assert [e['escenario'] for e in almacen.listar_escenarios()] == ["e1"]
+
+def test_mongo_reintenta_la_version_tomada_por_otra_escritura():
+    base = BaseDatosFalsa()
+    almacen = AlmacenMongo(base)
+    almacen.guardar_datos("e1", _datos(10))
+    # Otra escritura toma la versión 2 entre la lectura de la última versión y la inserción
+    coleccion = base['datos']
+    buscar = coleccion.find_one
+    llamadas = []
+
+    def buscar_desfasado(filtro=None, proyeccion=None, sort=None):
+        llamadas.append(filtro)
+        documento = buscar(filtro, proyeccion, sort)
+        if len(llamadas) == 2:
+            coleccion.insert_one({"escenario": "e1", "version": 2, "huella": "otra", "creado": 0, "contenido": b""})
+        return documento
+
+    coleccion.find_one = buscar_desfasado
+    assert almacen.guardar_datos("e1", _datos(20)) == 3
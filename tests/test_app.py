@@ -0,0 +1,72 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import os
+from app import crear_app
+from metricas import etiqueta_worker
+from redes import red_densa
+
+def _datos():
+    return {
+        "etiquetasA": ["A1"], "etiquetasR": ["R1"], "etiquetasF": ["F1"],
+        "distancias": {"A1": {"R1": 5, "F1": 0}, "R1": {"F1": 3}},
+        "idf": {"1": {"h": 2, "ns": "A1", "valor": 3}}, "idFamilias": ["1"],
+        "ac": {"R1": 1, "F1": 2}, "pi": {"F1": 50}, "alpha": 10, "beta": 50, "gamma": 50, "costoPorKm": 1.0
+    }
+
+def _app(directorio):
+    return crear_app({"DIRECTORIO_DATOS": str(directorio), "ALMACEN_ESCENARIOS_RUTA": None,
+                      "CACHE_RESULTADOS_DIR": None, "CACHE_REPORTES_DIR": None})
+
+def test_aplicaciones_con_directorios_distintos_no_comparten_estado(tmp_path):
+    entorno = dict(os.environ)
+    app_1 = _app(tmp_path / "uno")
+    app_2 = _app(tmp_path / "dos")
+    assert dict(os.environ) == entorno
+
+    estado_1, estado_2 = app_1.extensions['herramienta'], app_2.extensions['herramienta']
+    assert estado_1.almacen is not estado_2.almacen
+    assert estado_1.cache.directorio == os.path.join(str(tmp_path / "uno"), 'cache_resultados')
+    assert estado_2.cache_reportes.directorio == os.path.join(str(tmp_path / "dos"), 'cache_reportes')
+    assert estado_1.gestor_trabajos.almacen is estado_1.almacen
+
+    cliente_1, cliente_2 = app_1.test_client(), app_2.test_client()
+    assert cliente_1.post('/guardar_datos', json=_datos()).get_json()['status'] == "success"
+    assert cliente_1.get('/cargar_datos').get_json()['data'] == _datos()
+    assert cliente_2.get('/cargar_datos').get_json()['data'] is None
+
+    # La resolución usa el almacén y la caché de su aplicación
+    respuesta = cliente_1.get('/ejecutar_optimizacion?formato=compacto').get_json()
+    assert respuesta['resultados']['status'] == "Optimal"
+    assert cliente_1.get('/cache_resultados').get_json()['cache']['entradas'] == 1
+    assert cliente_2.get('/cache_resultados').get_json()['cache']['entradas'] == 0
+    assert cliente_2.get('/ejecutar_optimizacion').status_code == 400
+
+def test_grafo_por_paginas_y_rutas_agrupadas(tmp_path):
+    cliente = _app(tmp_path).test_client()
+    cliente.post('/guardar_datos', json=red_densa(1))
+    assert cliente.get('/ejecutar_optimizacion').status_code == 200
+
+    # Solo la página pedida de aristas, con el total para pedir el resto
+    primera = cliente.get('/grafo?limite=5').get_json()
+    assert len(primera['aristas']) == 5 < primera['total_aristas']
+    assert all({"x", "y"} <= set(nodo) for nodo in primera['nodos'])
+    usados = cliente.get('/grafo?usados=1&limite=1000').get_json()
+    assert usados['aristas'] and all(arista['personas'] > 0 for arista in usados['aristas'])
+
+    por_familia = cliente.get('/grafo/rutas?limite=1000').get_json()
+    agrupadas = cliente.get('/grafo/rutas?agrupar=1&limite=1000').get_json()
+    assert agrupadas['total_rutas'] == len({ruta['ruta_str'] for ruta in por_familia['rutas']})
+    assert sum(ruta['total_personas'] for ruta in agrupadas['rutas']) == sum(
+        ruta['personas_en_ruta'] for ruta in por_familia['rutas'])
+    destino = agrupadas['rutas'][0]['destino']
+    filtradas = cliente.get(f'/grafo/rutas?agrupar=1&destino={destino}&limite=1').get_json()
+    assert len(filtradas['rutas']) == 1 and filtradas['rutas'][0]['destino'] == destino
+    assert cliente.get('/obtener_datos_grafo').status_code == 404
+
+def test_metricas_identifican_al_worker(tmp_path):
+    cliente = _app(tmp_path).test_client()
+    cliente.get('/cargar_datos')
+    texto = cliente.get('/metrics').get_data(as_text=True)
+    series = [linea for linea in texto.splitlines() if linea and not linea.startswith('#')]
+    assert series and all(f'worker="{etiqueta_worker()}"' in linea for linea in series)
+    assert any(linea.startswith('http_peticiones_total{') and 'ruta="/cargar_datos"' in linea for linea in series)
@@ -0,0 +1,53 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import copy
+import pytest
+from almacen_escenarios import AlmacenSQLite
+from cache_resultados import CacheResultados, huella_datos
+from configuracion_solver import ConfiguracionSolver
+from optimizacion import ModeloOptimizacion, ejecutar_optimizacion
+from benchmarks.generador import generar_datos
+from benchmarks.benchmark_escalado import SIN_PODA
+from comprobaciones import comprobar_rutas
+
+def _datos():
+    return generar_datos(num_A=3, num_R=3, num_F=2, grupos_por_origen=4, semilla=5)
+
+def _equivalentes(datos):
+    # Los mismos datos como los enviaría el formulario: claves en otro orden, números como
+    # texto o como float y sin las distancias 0 (sin conexión)
+    otros = {campo: copy.deepcopy(datos[campo]) for campo in reversed(list(datos))}
+    otros['distancias'] = {
+        i: {j: str(d) for j, d in reversed(list(fila.items())) if d}
+        for i, fila in datos['distancias'].items()
+    }
+    for familia in otros['idf'].values():
+        familia['valor'] = str(familia['valor'])
+        familia['h'] = int(familia['h'])
+    otros['alpha'] = float(otros['alpha'])
+    otros['beta'] = str(otros['beta'])
+    return otros
+
+def test_huella_canonica():
+    datos = _datos()
+    assert huella_datos(_equivalentes(datos)) == huella_datos(datos)
+    distinto = copy.deepcopy(datos)
+    distinto['idf']['1']['valor'] += 1
+    assert huella_datos(distinto) != huella_datos(datos)
+    assert huella_datos(datos, {"enfoque": "robusto"}) != huella_datos(datos, {"enfoque": "determinista"})
+
+def test_acierto_con_datos_equivalentes_da_el_optimo_de_referencia(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / "escenarios.db"))
+    cache = CacheResultados(str(tmp_path / "cache"))
+    datos = _datos()
+    almacen.guardar_datos("e1", datos)
+    almacen.guardar_datos("e2", _equivalentes(datos))
+    configuracion = ConfiguracionSolver()
+
+    primera = ejecutar_optimizacion(configuracion=configuracion, escenario="e1", almacen=almacen, cache=cache)
+    segunda = ejecutar_optimizacion(configuracion=configuracion, escenario="e2", almacen=almacen, cache=cache)
+    assert cache.estadisticas()["aciertos"] == 1
+    referencia = ModeloOptimizacion(datos, agrupar=False, poda=SIN_PODA).resolver(configuracion, perfilar=False)
+    assert primera['valor_objetivo'] == pytest.approx(referencia['valor_objetivo'])
+    assert segunda['valor_objetivo'] == pytest.approx(referencia['valor_objetivo'])
+    comprobar_rutas(datos, segunda)
@@ -0,0 +1,30 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+from pulp import LpStatusInfeasible, LpStatusNotSolved
+from optimizacion import crear_modelo
+from configuracion_solver import ConfiguracionSolver
+from benchmarks.generador import generar_datos
+
+def _resolver_sin_ruteo(monkeypatch, status):
+    # Ningún ruteo de la fase 2 termina con solución; el conjunto acaba con el estado indicado
+    from dos_fases import ModeloDosFases
+    monkeypatch.setattr(ModeloDosFases, "_fase_2_por_origen", lambda self, Y, configuracion: None)
+    monkeypatch.setattr(ModeloDosFases, "_fase_2_conjunta",
+                        lambda self, Y, inicio, configuracion: (None, float('inf'), status))
+    datos = generar_datos(num_A=3, num_R=3, num_F=2, grupos_por_origen=4, semilla=1)
+    datos['dos_fases'] = {"max_iteraciones": 3}
+    return crear_modelo(datos, enfoque="dos_fases").resolver(ConfiguracionSolver("cbc"), perfilar=False)
+
+def test_ruteo_sin_solucion_no_excluye_combinaciones(monkeypatch):
+    # Un límite de tiempo sin incumbente no prueba nada: sin cortes y sin cota inventada
+    resultados = _resolver_sin_ruteo(monkeypatch, LpStatusNotSolved)
+    assert resultados['status'] == "Not Solved"
+    assert resultados['dos_fases']['cortes'] == 0
+    assert resultados['dos_fases']['interrumpido']
+    assert resultados['dos_fases']['cota_superior'] is None
+
+def test_ruteo_infactible_excluye_combinaciones(monkeypatch):
+    resultados = _resolver_sin_ruteo(monkeypatch, LpStatusInfeasible)
+    assert resultados['dos_fases']['cortes'] > 0
+    assert not resultados['dos_fases']['interrumpido']
+    assert resultados['status'] in ("Infeasible", "Not Solved")
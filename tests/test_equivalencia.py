@@ -0,0 +1,56 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import pytest
+from configuracion_solver import ConfiguracionSolver
+from modelo_matricial import ModeloMatricial
+from optimizacion import ModeloOptimizacion
+from benchmarks.generador import generar_datos
+from benchmarks.benchmark_escalado import SIN_PODA
+from comprobaciones import comprobar_rutas
+from redes import red_densa
+
+# Cada camino nuevo (agrupación en clases, poda de la red, emisor matricial) frente al MILP de
+# referencia: grupos de familias sin agrupar sobre la red completa, construido con PuLP
+
+CBC = ConfiguracionSolver(backend="cbc")
+HIGHS = ConfiguracionSolver(backend="highs")
+
+VARIANTES = {
+    "agrupado": lambda datos: (ModeloOptimizacion(datos), CBC),
+    "sin_agrupar_con_poda": lambda datos: (ModeloOptimizacion(datos, agrupar=False), CBC),
+    "agrupado_sin_poda": lambda datos: (ModeloOptimizacion(datos, poda=SIN_PODA), CBC),
+    "matricial_cbc": lambda datos: (ModeloMatricial(datos), CBC),
+    "matricial_highs": lambda datos: (ModeloMatricial(datos), HIGHS),
+}
+
+def _referencia(datos):
+    return ModeloOptimizacion(datos, agrupar=False, poda=SIN_PODA).resolver(CBC, perfilar=False)
+
+def _generados(semilla):
+    return generar_datos(num_A=4, num_R=4, num_F=3, grupos_por_origen=6, semilla=semilla)
+
+@pytest.mark.parametrize("variante", VARIANTES)
+@pytest.mark.parametrize("semilla", range(4))
+def test_mismo_optimo_y_rutas_factibles(semilla, variante):
+    datos = _generados(semilla)
+    referencia = _referencia(datos)
+    assert referencia['status'] == "Optimal"
+    comprobar_rutas(datos, referencia)
+
+    modelo, configuracion = VARIANTES[variante](datos)
+    resultados = modelo.resolver(configuracion, perfilar=False)
+    assert resultados['status'] == "Optimal"
+    assert resultados['valor_objetivo'] == pytest.approx(referencia['valor_objetivo'], rel=1e-6)
+    comprobar_rutas(datos, resultados)
+
+@pytest.mark.parametrize("variante", VARIANTES)
+@pytest.mark.parametrize("semilla", range(4))
+def test_mismo_optimo_en_redes_densas(semilla, variante):
+    # Arcos en cualquier sentido: puede haber óptimos con rutas entre orígenes, solo se compara el costo
+    datos = red_densa(semilla)
+    referencia = _referencia(datos)
+    modelo, configuracion = VARIANTES[variante](datos)
+    resultados = modelo.resolver(configuracion, perfilar=False)
+    assert resultados['status'] == referencia['status']
+    if referencia['status'] == "Optimal":
+        assert resultados['valor_objetivo'] == pytest.approx(referencia['valor_objetivo'], rel=1e-6)
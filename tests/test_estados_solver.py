@@ -0,0 +1,46 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import pytest
+from pulp import PULP_CBC_CMD, LpSolutionIntegerFeasible
+from almacen_escenarios import AlmacenSQLite
+from cache_resultados import CacheResultados, ESTADOS_REUTILIZABLES
+from configuracion_solver import ConfiguracionSolver
+from formato_resultados import ESTADO_FACTIBLE, total_rutas
+from modelo_matricial import ESTADOS_HIGHS, ESTADOS_SCIPY
+from optimizacion import crear_modelo, ejecutar_optimizacion
+from redes import red_densa
+
+# Un solver detenido por su límite de tiempo con una solución entera no la ha probado óptima:
+# se informa como Factible y no se reutiliza desde la caché
+
+@pytest.fixture
+def cbc_detenido_por_tiempo(monkeypatch):
+    # CBC escribe "Stopped on time - objective value ..." y PuLP lo lee como Optimal con una
+    # solución solo factible; se reproduce sobre la lectura real de la solución
+    get_status = PULP_CBC_CMD.get_status
+    def detenido(self, archivo):
+        return get_status(self, archivo)[0], LpSolutionIntegerFeasible
+    monkeypatch.setattr(PULP_CBC_CMD, "get_status", detenido)
+
+@pytest.mark.parametrize("emisor", ["pulp", "matricial"])
+def test_cbc_detenido_por_tiempo_es_factible(cbc_detenido_por_tiempo, emisor):
+    configuracion = ConfiguracionSolver(backend="cbc", emisor=emisor)
+    resultados = crear_modelo(red_densa(1), configuracion=configuracion).resolver(configuracion)
+    assert resultados["status"] == ESTADO_FACTIBLE
+    assert resultados["valor_objetivo"] is not None
+    assert total_rutas(resultados) > 0
+
+def test_solucion_factible_no_se_guarda_en_cache(cbc_detenido_por_tiempo, tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / "escenarios.db"))
+    cache = CacheResultados(str(tmp_path / "cache"))
+    almacen.guardar_datos("e1", red_densa(1))
+    resultados = ejecutar_optimizacion(configuracion=ConfiguracionSolver(), escenario="e1", almacen=almacen, cache=cache)
+    assert resultados["status"] == ESTADO_FACTIBLE
+    assert cache.estadisticas()["entradas"] == 0
+    assert almacen.versiones("e1")[1] == 1
+
+def test_limites_de_highs_no_son_optimos():
+    for estado in ("kTimeLimit", "kIterationLimit", "kObjectiveBound", "kObjectiveTarget"):
+        assert ESTADOS_HIGHS[estado] == ESTADO_FACTIBLE
+    assert ESTADOS_SCIPY[1] == ESTADO_FACTIBLE
+    assert ESTADO_FACTIBLE not in ESTADOS_REUTILIZABLES
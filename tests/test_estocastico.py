@@ -0,0 +1,83 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import json
+import pytest
+from app import crear_app
+from configuracion_solver import ConfiguracionSolver
+from estocastico import resolver_escenarios, EstadisticasEscenarios, ESTADO_ERROR
+
+def _datos():
+    return {
+        "etiquetasA": ["A1"], "etiquetasR": ["R1"], "etiquetasF": ["F1"],
+        "distancias": {"A1": {"R1": 5, "F1": 0}, "R1": {"F1": 3}},
+        "idf": {"1": {"h": 2, "ns": "A1", "valor": 3}}, "idFamilias": ["1"],
+        "ac": {"R1": 1, "F1": 2}, "pi": {"F1": 50}, "alpha": 10, "beta": 50, "gamma": 50, "costoPorKm": 1.0
+    }
+
+def _resultado(costo, probabilidad=None):
+    return {"escenario": 0, "probabilidad": probabilidad, "status": "Optimal", "valor_objetivo": costo,
+            "nodos_activados": ["R1"], "rutas": [{"ruta_str": "A1 -> R1", "familias_en_ruta": 1, "personas_en_ruta": 2}]}
+
+def test_probabilidad_cero_no_pesa():
+    estadisticas = EstadisticasEscenarios()
+    estadisticas.agregar(_resultado(10.0, probabilidad=1.0))
+    estadisticas.agregar(_resultado(1000.0, probabilidad=0.0))
+    resumen = estadisticas.resumen()
+    assert resumen["factibles"] == 2
+    assert resumen["costo_esperado"] == pytest.approx(10.0)
+    assert resumen["frecuencia_activacion"]["R1"] == pytest.approx(1.0)
+
+def test_sin_probabilidad_todos_pesan_igual():
+    estadisticas = EstadisticasEscenarios()
+    estadisticas.agregar(_resultado(10.0))
+    estadisticas.agregar(_resultado(20.0))
+    assert estadisticas.resumen()["costo_esperado"] == pytest.approx(15.0)
+
+def test_escenario_con_error_no_detiene_el_lote():
+    escenarios = [{"valor": {"1": 4}}, {"valor": {"no_existe": 4}, "probabilidad": 0.5}, {"pi": {"F1": 40}}]
+    resultados = sorted(resolver_escenarios(_datos(), escenarios, max_procesos=1, configuracion=ConfiguracionSolver()),
+                        key=lambda resultado: resultado["escenario"])
+    assert [resultado["status"] for resultado in resultados] == ["Optimal", ESTADO_ERROR, "Optimal"]
+    assert resultados[1]["probabilidad"] == 0.5
+    assert resultados[1]["mensaje"]
+
+    estadisticas = EstadisticasEscenarios()
+    for resultado in resultados:
+        estadisticas.agregar(resultado)
+    resumen = estadisticas.resumen()
+    assert resumen["escenarios"] == 3 and resumen["factibles"] == 2
+    assert resumen["estados"][ESTADO_ERROR] == 1
+
+def _cliente(directorio, **configuracion):
+    app = crear_app(dict({"DIRECTORIO_DATOS": str(directorio), "ALMACEN_ESCENARIOS_RUTA": None,
+                          "CACHE_RESULTADOS_DIR": None, "CACHE_REPORTES_DIR": None}, **configuracion))
+    return app, app.test_client()
+
+def test_lote_con_parametros_de_formulario(tmp_path):
+    _, cliente = _cliente(tmp_path)
+    respuesta = cliente.post('/ejecutar_estocastico', json={"datos": _datos(), "num_escenarios": "2", "max_procesos": "1"})
+    lineas = [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+    assert lineas[-1]["status"] == "success" and lineas[-1]["resumen"]["escenarios"] == 2
+
+def test_lote_rechaza_parametros_fuera_de_rango(tmp_path):
+    _, cliente = _cliente(tmp_path, MAX_ESCENARIOS_ESTOCASTICO=5)
+    for parametros in ({"max_procesos": "0"}, {"max_procesos": "muchos"}, {"num_escenarios": 6},
+                       {"num_escenarios": 0}, {"escenarios": [{}] * 6}):
+        respuesta = cliente.post('/ejecutar_estocastico', json=dict(parametros, datos=_datos()))
+        assert respuesta.status_code == 400
+
+def test_lotes_simultaneos_limitados(tmp_path):
+    app, cliente = _cliente(tmp_path, MAX_LOTES_ESTOCASTICOS=1)
+    lotes = app.extensions['herramienta'].lotes_estocasticos
+    assert lotes.acquire(blocking=False)
+    try:
+        respuesta = cliente.post('/ejecutar_estocastico', json={"datos": _datos(), "num_escenarios": 1})
+        assert respuesta.status_code == 429
+    finally:
+        lotes.release()
+    respuesta = cliente.post('/ejecutar_estocastico', json={"datos": _datos(), "num_escenarios": 1, "max_procesos": 1})
+    respuesta.get_data()
+    respuesta.close()
+    # Al cerrarse la respuesta el lote queda libre
+    assert lotes.acquire(blocking=False)
+    lotes.release()
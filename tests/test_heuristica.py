@@ -0,0 +1,16 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+from optimizacion import crear_modelo
+from configuracion_solver import ConfiguracionSolver
+from cache_resultados import ESTADOS_REUTILIZABLES
+from formato_resultados import ESTADO_FACTIBLE, total_rutas
+from benchmarks.generador import generar_datos
+
+def test_plan_sin_optimalidad_probada_es_factible():
+    datos = generar_datos(num_A=4, num_R=4, num_F=3, grupos_por_origen=8, semilla=0)
+    resultados = crear_modelo(datos, enfoque="heuristico").resolver(ConfiguracionSolver("cbc"), perfilar=False)
+    assert resultados['heuristica']['gap'] > 0
+    assert resultados['status'] == ESTADO_FACTIBLE
+    assert ESTADO_FACTIBLE not in ESTADOS_REUTILIZABLES
+    # Las rutas del plan se reportan aunque no sea óptimo
+    assert total_rutas(resultados) > 0
@@ -0,0 +1,45 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import pytest
+from pulp import PULP_CBC_CMD
+from optimizacion import ModeloOptimizacion
+from benchmarks.generador import generar_datos
+from benchmarks.benchmark_escalado import SIN_PODA
+from redes import red_densa
+
+def _resolver(datos, poda):
+    resultados = ModeloOptimizacion(datos, agrupar=False, poda=poda).resolver(PULP_CBC_CMD(msg=False), perfilar=False)
+    return resultados['status'], resultados['valor_objetivo']
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_poda_por_defecto_conserva_el_optimo(semilla):
+    # Redes con arcos hacia los nodos de salida y desde los centros seguros
+    datos = red_densa(semilla)
+    status, objetivo = _resolver(datos, None)
+    status_sin_poda, objetivo_sin_poda = _resolver(datos, SIN_PODA)
+    assert status == status_sin_poda
+    if status == "Optimal":
+        assert objetivo == pytest.approx(objetivo_sin_poda)
+
+def test_poda_descarta_arcos_inalcanzables():
+    datos = generar_datos(num_A=4, num_R=4, num_F=2, grupos_por_origen=3, semilla=2)
+    modelo = ModeloOptimizacion(datos, agrupar=False)
+    variables = modelo.estadisticas_poda['variables_X']
+    assert variables['con_poda'] < variables['sin_poda']
+    assert _resolver(datos, None)[1] == pytest.approx(_resolver(datos, SIN_PODA)[1])
+
+def test_alcanzabilidad_admite_rutas_que_terminan_en_otro_origen():
+    # El flujo solo se conserva en los nodos de tránsito: en la formulación, A1 -> R1 -> A2 es una
+    # ruta válida aunque R1 no llegue a ningún centro seguro, y aquí es la más barata
+    etiquetas = ["A1", "A2", "R1", "F1"]
+    distancias = {i: {j: 0 for j in etiquetas} for i in etiquetas}
+    distancias["A1"]["F1"] = 100
+    distancias["A1"]["R1"] = 1
+    distancias["R1"]["A2"] = 1
+    datos = {
+        "etiquetasA": ["A1", "A2"], "etiquetasR": ["R1"], "etiquetasF": ["F1"], "distancias": distancias,
+        "idf": {"1": {"h": "2", "ns": "A1", "valor": 3}}, "idFamilias": ["1"], "costoPorKm": 1.0,
+        "ac": {"R1": 5, "F1": 5}, "pi": {"F1": 100}, "alpha": 100, "beta": 100, "gamma": 100
+    }
+    assert _resolver(datos, None) == ("Optimal", pytest.approx(2 * 3 * 2 + 5))
+    assert _resolver(datos, SIN_PODA)[1] == pytest.approx(_resolver(datos, None)[1])
@@ -0,0 +1,88 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import os
+import threading
+import pytest
+from app import crear_app
+from bloqueo_archivos import bloqueo_archivo
+from configuracion_solver import ConfiguracionSolver
+from optimizacion import ModeloOptimizacion
+from reportes import CacheReportes, huella_resultados
+from redes import red_densa
+
+@pytest.fixture(scope="module")
+def resultados():
+    configuracion = ConfiguracionSolver()
+    return [ModeloOptimizacion(red_densa(semilla)).resolver(configuracion) for semilla in (1, 2, 3)]
+
+def _archivos_bloqueo(directorio):
+    return sorted(nombre for nombre in os.listdir(directorio) if nombre.startswith('.bloqueo_'))
+
+def test_acierto_y_desalojo(tmp_path, resultados):
+    cache = CacheReportes(str(tmp_path), max_entradas=2)
+    for resultado in resultados:
+        cache.obtener(resultado, "csv")[0].close()
+    archivo, _ = cache.obtener(resultados[2], "csv")
+    archivo.close()
+    estadisticas = cache.estadisticas()
+    assert (estadisticas["generados"], estadisticas["aciertos"]) == (3, 1)
+    assert estadisticas["entradas"] == 2 and estadisticas["desalojos"] == 1
+    assert not os.path.exists(cache._ruta(huella_resultados(resultados[0]), "csv"))
+
+def test_desalojo_respeta_informes_en_uso(tmp_path, resultados):
+    cache = CacheReportes(str(tmp_path), max_entradas=1)
+    cache.obtener(resultados[0], "csv")[0].close()
+    huella = huella_resultados(resultados[0])
+
+    # Otro worker tiene el bloqueo del primer informe (por ejemplo, regenerándolo)
+    tomado, liberar = threading.Event(), threading.Event()
+    def ocupar():
+        with bloqueo_archivo(cache._ruta_bloqueo(huella)):
+            tomado.set()
+            liberar.wait()
+    hilo = threading.Thread(target=ocupar)
+    hilo.start()
+    tomado.wait()
+    try:
+        abierto, _ = cache.obtener(resultados[1], "csv")
+        abierto.close()
+        assert os.path.exists(cache._ruta(huella, "csv"))
+        assert cache.estadisticas()["desalojos"] == 0
+    finally:
+        liberar.set()
+        hilo.join()
+
+    # Liberado, el siguiente desalojo sí lo elimina; los archivos de bloqueo se conservan
+    bloqueos = _archivos_bloqueo(str(tmp_path))
+    cache.obtener(resultados[2], "csv")[0].close()
+    assert not os.path.exists(cache._ruta(huella, "csv"))
+    assert set(bloqueos) <= set(_archivos_bloqueo(str(tmp_path)))
+    cache.limpiar()
+    assert cache.estadisticas()["entradas"] == 0
+    assert set(bloqueos) <= set(_archivos_bloqueo(str(tmp_path)))
+
+@pytest.mark.skipif(os.name == 'nt', reason="Windows no permite borrar un archivo abierto")
+def test_informe_abierto_sigue_legible_tras_desalojo(tmp_path, resultados):
+    cache = CacheReportes(str(tmp_path), max_entradas=1)
+    archivo, huella = cache.obtener(resultados[0], "csv")
+    cache.obtener(resultados[1], "csv")[0].close()
+    assert not os.path.exists(cache._ruta(huella, "csv"))
+    with archivo:
+        assert "ID Familia".encode() in archivo.read()
+
+def test_exportar_desde_la_aplicacion(tmp_path):
+    app = crear_app({"DIRECTORIO_DATOS": str(tmp_path), "ALMACEN_ESCENARIOS_RUTA": None,
+                     "CACHE_RESULTADOS_DIR": None, "CACHE_REPORTES_DIR": None})
+    cliente = app.test_client()
+    cliente.post('/guardar_datos', json=red_densa(1))
+    assert cliente.get('/ejecutar_optimizacion').status_code == 200
+
+    respuesta = cliente.get('/exportar/csv')
+    assert respuesta.status_code == 200
+    assert respuesta.content_length == len(respuesta.data) > 0
+    etag = respuesta.headers['ETag']
+    respuesta.close()
+    repetida = cliente.get('/exportar/csv', headers={"If-None-Match": etag})
+    assert repetida.status_code == 304
+    repetida.close()
+    assert cliente.get('/cache_resultados').get_json()['reportes']['aciertos'] == 1
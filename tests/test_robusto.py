@@ -0,0 +1,22 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import pytest
+from pulp import PULP_CBC_CMD
+from optimizacion import ModeloOptimizacion
+from benchmarks.generador import generar_datos
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_objetivo_robusto_no_depende_de_la_agrupacion(semilla):
+    # Varios grupos por origen con el mismo tamaño: la agrupación tendría clases que fusionar
+    datos = generar_datos(num_A=3, num_R=3, num_F=2, grupos_por_origen=6, tamaño_maximo=2, semilla=semilla)
+    # Margen sobre las capacidades ajustadas del generador para que el peor caso sea factible
+    for parametro in ('alpha', 'beta', 'gamma'):
+        datos[parametro] *= 2
+    datos['robusto'] = {"presupuesto": 2, "desviacion_valor": 0.2, "desviacion_pi": 0.1}
+    objetivos = []
+    for agrupar in (False, True):
+        modelo = ModeloOptimizacion(datos, agrupar=agrupar, enfoque="robusto")
+        resultados = modelo.resolver(PULP_CBC_CMD(msg=False), perfilar=False)
+        assert resultados['status'] == "Optimal"
+        objetivos.append(resultados['valor_objetivo'])
+    assert objetivos[0] == pytest.approx(objetivos[1])
@@ -0,0 +1,49 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import pytest
+from optimizacion import descomponer_flujo, repartir_flujo_clase
+
+def _flujos_por_arco(rutas):
+    arcos = {}
+    for ruta, cantidad in rutas:
+        for i, j in zip(ruta, ruta[1:]):
+            arcos[(i, j)] = arcos.get((i, j), 0) + cantidad
+    return arcos
+
+def test_flujo_bifurcado_en_rutas_completas():
+    flujos = [("A1", "R1", 3), ("A1", "R2", 2), ("R1", "F1", 3), ("R2", "F1", 1), ("R2", "F2", 1)]
+    rutas = descomponer_flujo("A1", flujos)
+    assert sorted((tuple(ruta), cantidad) for ruta, cantidad in rutas) == [
+        (("A1", "R1", "F1"), 3), (("A1", "R2", "F1"), 1), (("A1", "R2", "F2"), 1)
+    ]
+
+def test_flujo_encadenado_entre_transitos():
+    # Ramas que se separan y vuelven a unirse: las cantidades por arco se conservan
+    flujos = [("A1", "R1", 4), ("R1", "R2", 1), ("R1", "R3", 3), ("R2", "R3", 1), ("R3", "F1", 2), ("R3", "F2", 2)]
+    rutas = descomponer_flujo("A1", flujos)
+    assert all(ruta[0] == "A1" and ruta[-1] in ("F1", "F2") for ruta, _ in rutas)
+    assert sum(cantidad for _, cantidad in rutas) == 4
+    assert _flujos_por_arco(rutas) == {(i, j): cantidad for i, j, cantidad in flujos}
+
+def test_ciclos_cancelados():
+    flujos = [("A1", "R1", 5), ("R1", "R2", 7), ("R2", "R1", 2), ("R2", "F1", 5)]
+    rutas = descomponer_flujo("A1", flujos)
+    assert [(ruta, cantidad) for ruta, cantidad in rutas] == [(["A1", "R1", "R2", "F1"], 5)]
+
+def test_reparto_de_una_clase_entre_sus_grupos():
+    flujos = [("A1", "R1", 3), ("A1", "R2", 4), ("R1", "F1", 3), ("R2", "F1", 2), ("R2", "F2", 2)]
+    miembros = [("1", 2), ("2", 4), ("3", 1)]
+    repartido = repartir_flujo_clase("A1", flujos, miembros)
+
+    total = {}
+    for id_fam, valor in miembros:
+        arcos = repartido[id_fam]
+        # Cada grupo sale del origen con todas sus familias y conserva el flujo en el tránsito
+        assert sum(cantidad for (i, _), cantidad in arcos.items() if i == "A1") == pytest.approx(valor)
+        for nodo in ("R1", "R2"):
+            entrada = sum(cantidad for (_, j), cantidad in arcos.items() if j == nodo)
+            salida = sum(cantidad for (i, _), cantidad in arcos.items() if i == nodo)
+            assert entrada == pytest.approx(salida)
+        for arco, cantidad in arcos.items():
+            total[arco] = total.get(arco, 0) + cantidad
+    assert total == pytest.approx({(i, j): cantidad for i, j, cantidad in flujos})
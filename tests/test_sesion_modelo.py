@@ -0,0 +1,38 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import copy
+import pytest
+from configuracion_solver import ConfiguracionSolver
+from optimizacion import ModeloOptimizacion
+from sesion_modelo import SesionModelo
+from redes import red_densa
+
+def _familias_de_una_clase(datos):
+    # Dos grupos de familias con el mismo origen y tamaño: el modelo agrupado los resuelve como una clase
+    por_clave = {}
+    for id_fam in datos['idFamilias']:
+        familia = datos['idf'][id_fam]
+        por_clave.setdefault((familia['ns'], familia['h']), []).append(id_fam)
+    return next(ids for ids in por_clave.values() if len(ids) > 1)
+
+def test_cambios_por_grupo_de_familias_original():
+    datos = red_densa(2)
+    primera, segunda = _familias_de_una_clase(datos)[:2]
+    sesion = SesionModelo(agrupar=True)
+    configuracion = ConfiguracionSolver()
+    sesion.resolver(datos, configuracion)
+
+    nuevos = copy.deepcopy(datos)
+    nuevos['idf'][segunda]['valor'] += 1
+    resultados = sesion.resolver(nuevos, configuracion)
+    assert resultados['sesion']['reconstruido'] is False
+    assert resultados['sesion']['cambios'] == [f"valor_{segunda}"]
+    referencia = ModeloOptimizacion(nuevos, agrupar=False).resolver(configuracion)
+    assert resultados['valor_objetivo'] == pytest.approx(referencia['valor_objetivo'])
+
+    # Intercambiar valores dentro de una clase no cambia el modelo, pero sí los datos de ambos grupos
+    intercambiados = copy.deepcopy(nuevos)
+    intercambiados['idf'][primera]['valor'], intercambiados['idf'][segunda]['valor'] = (
+        nuevos['idf'][segunda]['valor'], nuevos['idf'][primera]['valor'])
+    cambios = sesion.resolver(intercambiados, configuracion)['sesion']['cambios']
+    assert sorted(cambios) == sorted([f"valor_{primera}", f"valor_{segunda}"])
@@ -0,0 +1,53 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import threading
+from almacen_escenarios import AlmacenSQLite
+from cache_resultados import CacheResultados
+from configuracion_solver import ConfiguracionSolver
+from trabajos import GestorTrabajos, CANCELADO, COMPLETADO
+
+def _datos():
+    return {
+        "etiquetasA": ["A1"], "etiquetasR": ["R1"], "etiquetasF": ["F1"],
+        "distancias": {"A1": {"R1": 5, "F1": 0}, "R1": {"F1": 3}},
+        "idf": {"1": {"h": 2, "ns": "A1", "valor": 3}}, "idFamilias": ["1"],
+        "ac": {"R1": 1, "F1": 2}, "pi": {"F1": 50}, "alpha": 10, "beta": 50, "gamma": 50, "costoPorKm": 1.0
+    }
+
+class CacheConAcierto(CacheResultados):
+    # Devuelve siempre los mismos resultados, como si el escenario ya estuviera resuelto
+    def obtener(self, clave):
+        return {"formato": 1, "status": "Optimal", "valor_objetivo": 19.0, "metricas": {}}
+
+def _gestor(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / "escenarios.db"))
+    gestor = GestorTrabajos(max_trabajos=1, cache=CacheConAcierto(str(tmp_path / "cache")),
+                            directorio=str(tmp_path / "trabajos"), almacen=almacen)
+    return gestor, almacen
+
+def _enviar_con_ejecutor_ocupado(gestor):
+    # Un trabajo previo ocupa el único hilo: el enviado queda en cola hasta liberar el evento
+    liberar = threading.Event()
+    gestor._ejecutor.submit(liberar.wait)
+    id_trabajo = gestor.enviar(_datos(), configuracion=ConfiguracionSolver())
+    return id_trabajo, liberar
+
+def test_acierto_de_cache_completa_el_trabajo(tmp_path):
+    gestor, almacen = _gestor(tmp_path)
+    id_trabajo, liberar = _enviar_con_ejecutor_ocupado(gestor)
+    liberar.set()
+    gestor._trabajos[id_trabajo]["futuro"].result(timeout=30)
+    assert gestor.estado(id_trabajo)["fase"] == COMPLETADO
+    assert almacen.versiones("predeterminado")[1] == 1
+
+def test_cancelacion_de_otro_proceso_antes_del_acierto_de_cache(tmp_path):
+    gestor, almacen = _gestor(tmp_path)
+    id_trabajo, liberar = _enviar_con_ejecutor_ocupado(gestor)
+    # Marca de cancelación que deja otro worker del servidor
+    with open(gestor._ruta(id_trabajo, "cancelar"), 'w'):
+        pass
+    liberar.set()
+    gestor._trabajos[id_trabajo]["futuro"].result(timeout=30)
+    assert gestor.estado(id_trabajo)["fase"] == CANCELADO
+    assert gestor.resultados(id_trabajo) is None
+    assert almacen.versiones("predeterminado") == (None, None)
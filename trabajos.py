@@ -0,0 +1,309 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+import multiprocessing
+import os
+import queue
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from optimizacion import crear_modelo, guardar_resultados
+from cache_resultados import huella_datos, ESTADOS_REUTILIZABLES
+from formato_resultados import VERSION_FORMATO
+from almacen_escenarios import ESCENARIO_PREDETERMINADO, obtener_almacen
+from bloqueo_archivos import escribir_json_atomico, leer_json
+from configuracion_solver import ConfiguracionSolver, cargar_configuracion, leer_progreso_cbc
+from metricas import perfil_activado, registrar_resolucion
+
+# Fases por las que pasa un trabajo de optimización
+EN_COLA = "en_cola"
+GUARDANDO = "guardando"           # resultados tomados de la caché, guardándose en el almacén
+COMPLETADO = "completado"
+CANCELADO = "cancelado"
+ERROR = "error"
+FASES_FINALES = (COMPLETADO, CANCELADO, ERROR)
+
+# Campos de un trabajo que se publican para que cualquier worker del servidor pueda responder por él
+CAMPOS_PUBLICOS = ("id", "escenario", "enfoque", "solver", "fase", "creado", "inicio", "fin", "mensaje",
+                   "ruta_log", "progreso_solver", "version_resultados")
+
+def _proceso_optimizacion(datos, enfoque, configuracion, ruta_log, perfilar, cola):
+    # Se ejecuta en un proceso aparte; en POSIX abre un grupo de procesos propio para
+    # que al cancelar también se detenga el ejecutable del solver
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    try:
+        configuracion = ConfiguracionSolver.desde_dict(configuracion)
+        configuracion.ruta_log = ruta_log
+        modelo = crear_modelo(datos, enfoque=enfoque, configuracion=configuracion)
+        resultados = modelo.resolver(
+            configuracion,
+            progreso=lambda fase: cola.put(("fase", fase)),
+            perfilar=perfilar
+        )
+        cola.put(("resultado", resultados))
+    except Exception as e:
+        cola.put(("error", str(e)))
+
+class GestorTrabajos:
+    def __init__(self, max_trabajos=2, max_historial=100, cache=None, directorio=None, almacen=None):
+        # Como mucho max_trabajos resoluciones simultáneas; el resto espera en cola. Con un
+        # directorio, el estado de cada trabajo se publica en él para que los demás procesos
+        # que sirven la aplicación puedan consultarlo, leer sus resultados o cancelarlo.
+        # Sin almacén, los resultados van al compartido por el proceso
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_trabajos, thread_name_prefix="optimizacion")
+        self.cache = cache
+        self.almacen = almacen
+        self._contexto = multiprocessing.get_context("spawn")
+        self._trabajos = {}
+        self._lock = threading.Lock()
+        self.max_historial = max_historial
+        self.directorio = directorio
+
+    def enviar(self, datos, enfoque="determinista", configuracion=None, escenario=ESCENARIO_PREDETERMINADO,
+               perfilar=None):
+        configuracion = configuracion or cargar_configuracion()
+        id_trabajo = uuid.uuid4().hex
+        trabajo = {
+            "id": id_trabajo,
+            "escenario": escenario,
+            "enfoque": enfoque,
+            "solver": configuracion.a_dict(),
+            "fase": EN_COLA,
+            "creado": time.time(),
+            "inicio": None,
+            "fin": None,
+            "mensaje": None,
+            "resultados": None,
+            "ruta_log": None,
+            "proceso": None,
+            "cancelado": False,
+            "perfilar": perfil_activado() if perfilar is None else perfilar
+        }
+        with self._lock:
+            self._trabajos[id_trabajo] = trabajo
+            self._limpiar_historial()
+            self._publicar(trabajo)
+        trabajo["futuro"] = self._ejecutor.submit(self._ejecutar, trabajo, datos, enfoque, configuracion)
+        return id_trabajo
+
+    def _limpiar_historial(self):
+        # Olvidar los trabajos terminados más antiguos
+        terminados = [t for t in self._trabajos.values() if t["fase"] in FASES_FINALES]
+        terminados.sort(key=lambda t: t["fin"])
+        for trabajo in terminados[:max(0, len(terminados) - self.max_historial)]:
+            del self._trabajos[trabajo["id"]]
+            self._retirar(trabajo["id"])
+
+    def _ruta(self, id_trabajo, extension="json"):
+        return os.path.join(self.directorio, f"{id_trabajo}.{extension}")
+
+    def _publicar(self, trabajo):
+        # Se llama con el lock tomado, en el mismo paso que el cambio de estado: ningún proceso
+        # responde con una fase que otro aún no puede ver. La escritura es atómica
+        if self.directorio:
+            escribir_json_atomico(self._ruta(trabajo["id"]), self._registro(trabajo))
+
+    def _registro(self, trabajo):
+        registro = {campo: trabajo.get(campo) for campo in CAMPOS_PUBLICOS}
+        registro["estado_solucion"] = trabajo["resultados"]["status"] if trabajo["resultados"] else None
+        return registro
+
+    def _retirar(self, id_trabajo):
+        if not self.directorio:
+            return
+        for extension in ("json", "cancelar"):
+            try:
+                os.remove(self._ruta(id_trabajo, extension))
+            except OSError:
+                pass
+
+    def _registro_compartido(self, id_trabajo):
+        # Estado publicado por el proceso que ejecuta el trabajo
+        if not self.directorio or not _id_valido(id_trabajo):
+            return None
+        return leer_json(self._ruta(id_trabajo))
+
+    def _cancelacion_solicitada(self, trabajo):
+        # Otro proceso pidió cancelar el trabajo dejando una marca junto a su estado
+        return bool(self.directorio) and os.path.exists(self._ruta(trabajo["id"], "cancelar"))
+
+    def _ejecutar(self, trabajo, datos, enfoque, configuracion):
+        # Un trabajo cancelado mientras esperaba en cola no se ejecuta, tampoco desde la caché
+        if self._cancelacion_solicitada(trabajo):
+            self.cancelar(trabajo["id"])
+        if trabajo["cancelado"]:
+            return
+
+        # Un escenario ya resuelto se completa sin lanzar el solver
+        clave = huella_datos(datos, {"enfoque": enfoque, "solver": configuracion.a_dict(),
+                                     "formato": VERSION_FORMATO}) if self.cache else None
+        resultados = self.cache.obtener(clave) if self.cache else None
+        if resultados is not None:
+            with self._lock:
+                if trabajo["cancelado"]:
+                    return
+                # A partir de aquí el trabajo ya no se puede cancelar
+                trabajo["inicio"] = time.time()
+                trabajo["fase"] = GUARDANDO
+                self._publicar(trabajo)
+            trabajo["version_resultados"] = guardar_resultados(resultados, trabajo["escenario"], datos, self.almacen)
+            self._finalizar(trabajo, COMPLETADO, resultados=resultados)
+            return
+
+        with self._lock:
+            if trabajo["cancelado"]:
+                return
+            descriptor, trabajo["ruta_log"] = tempfile.mkstemp(prefix="solver_", suffix=".log")
+            os.close(descriptor)
+            cola = self._contexto.Queue()
+            proceso = self._contexto.Process(
+                target=_proceso_optimizacion,
+                args=(datos, enfoque, configuracion.a_dict(), trabajo["ruta_log"], trabajo["perfilar"], cola),
+                daemon=True
+            )
+            trabajo["inicio"] = time.time()
+            trabajo["fase"] = "iniciando"
+            trabajo["proceso"] = proceso
+            proceso.start()
+            self._publicar(trabajo)
+
+        try:
+            while True:
+                try:
+                    tipo, contenido = cola.get(timeout=0.5)
+                except queue.Empty:
+                    if self._cancelacion_solicitada(trabajo) and not trabajo["cancelado"]:
+                        self.cancelar(trabajo["id"])
+                    if not proceso.is_alive():
+                        self._finalizar(trabajo, CANCELADO if trabajo["cancelado"] else ERROR,
+                                        mensaje=None if trabajo["cancelado"] else "El proceso de optimización terminó inesperadamente")
+                        break
+                    continue
+
+                if tipo == "fase":
+                    with self._lock:
+                        trabajo["fase"] = contenido
+                        self._publicar(trabajo)
+                elif tipo == "resultado":
+                    # Las métricas se midieron en el proceso hijo: se publican en el registro de este
+                    registrar_resolucion(contenido.get('metricas', {}), contenido['status'])
+                    if self.cache and contenido['status'] in ESTADOS_REUTILIZABLES:
+                        self.cache.guardar(clave, contenido)
+                    trabajo["version_resultados"] = guardar_resultados(contenido, trabajo["escenario"], datos, self.almacen)
+                    self._finalizar(trabajo, COMPLETADO, resultados=contenido)
+                    break
+                else:
+                    self._finalizar(trabajo, ERROR, mensaje=contenido)
+                    break
+        except Exception as e:
+            self._finalizar(trabajo, ERROR, mensaje=str(e))
+        finally:
+            proceso.join(timeout=5)
+            # Conservar las estadísticas finales del solver antes de borrar el registro
+            if trabajo["resultados"] and "solver" in trabajo["resultados"]:
+                trabajo["progreso_solver"] = trabajo["resultados"]["solver"]["estadisticas"]
+            elif configuracion.backend == "cbc":
+                trabajo["progreso_solver"] = leer_progreso_cbc(trabajo["ruta_log"])
+            try:
+                os.remove(trabajo["ruta_log"])
+            except OSError:
+                pass
+            with self._lock:
+                self._publicar(trabajo)
+
+    def _finalizar(self, trabajo, fase, resultados=None, mensaje=None):
+        with self._lock:
+            trabajo["fase"] = fase
+            trabajo["fin"] = time.time()
+            trabajo["resultados"] = resultados
+            trabajo["mensaje"] = mensaje
+            trabajo["proceso"] = None
+            self._publicar(trabajo)
+
+    def estado(self, id_trabajo):
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            trabajo = self._registro(trabajo) if trabajo else None
+        trabajo = trabajo or self._registro_compartido(id_trabajo)
+        if trabajo is None:
+            return None
+
+        ahora = time.time()
+        fin = trabajo["fin"] or ahora
+        inicio = trabajo["inicio"] or fin
+        estado = {
+            "id": trabajo["id"],
+            "escenario": trabajo["escenario"],
+            "enfoque": trabajo["enfoque"],
+            "solver": trabajo["solver"],
+            "fase": trabajo["fase"],
+            "tiempo_transcurrido": round(fin - inicio, 3),
+            "tiempo_en_cola": round(inicio - trabajo["creado"], 3),
+            "mensaje": trabajo["mensaje"],
+            "estado_solucion": trabajo["estado_solucion"]
+        }
+
+        # Mejor solución entera y gap del solver mientras resuelve
+        if trabajo["fase"] == "resolviendo" and trabajo["ruta_log"] and trabajo["solver"]["backend"] == "cbc":
+            estado["solver"] = leer_progreso_cbc(trabajo["ruta_log"])
+        elif trabajo.get("progreso_solver"):
+            estado["solver"] = trabajo["progreso_solver"]
+        return estado
+
+    def resultados(self, id_trabajo):
+        trabajo = self._trabajos.get(id_trabajo)
+        if trabajo is not None:
+            return trabajo["resultados"]
+        # Trabajo de otro proceso: sus resultados ya están en el almacén de escenarios
+        registro = self._registro_compartido(id_trabajo)
+        if registro is None or registro["fase"] != COMPLETADO or registro["version_resultados"] is None:
+            return None
+        return (self.almacen or obtener_almacen()).obtener_resultados(registro["escenario"], registro["version_resultados"])
+
+    def cancelar(self, id_trabajo):
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            if trabajo is None:
+                return self._solicitar_cancelacion(id_trabajo)
+            if trabajo["fase"] in FASES_FINALES or trabajo["fase"] == GUARDANDO:
+                return False
+            trabajo["cancelado"] = True
+
+            # Trabajo aún en cola: basta con retirarlo del ejecutor
+            if trabajo["proceso"] is None:
+                if trabajo.get("futuro"):
+                    trabajo["futuro"].cancel()
+                trabajo["fase"] = CANCELADO
+                trabajo["fin"] = time.time()
+                self._publicar(trabajo)
+                return True
+
+            proceso = trabajo["proceso"]
+
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(proceso.pid, signal.SIGKILL)
+            else:
+                proceso.terminate()
+        except (ProcessLookupError, PermissionError):
+            proceso.terminate()
+        return True
+
+    def _solicitar_cancelacion(self, id_trabajo):
+        # El trabajo lo ejecuta otro proceso: se deja la marca que este comprueba mientras espera
+        registro = self._registro_compartido(id_trabajo)
+        if registro is None or registro["fase"] in FASES_FINALES or registro["fase"] == GUARDANDO:
+            return False
+        with open(self._ruta(id_trabajo, "cancelar"), 'w'):
+            pass
+        return True
+
+def _id_valido(id_trabajo):
+    # Los identificadores llegan en la URL: solo se aceptan los que genera enviar()
+    try:
+        return uuid.UUID(hex=id_trabajo).hex == id_trabajo
+    except ValueError:
+        return False
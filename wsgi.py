@@ -0,0 +1,24 @@
+# Copyright (c) 2025 Yasmany Fernández Fernández, Jefferson Iván Narváez Quendi, Sira M. Allende Alonso, Ridelio Miranda Pérez
+# Licencia MIT - Ver archivo LICENSE para detalles
+#
+# Punto de entrada para servir la aplicación en producción, sin el servidor de desarrollo
+# ni la apertura del navegador:
+#
+#   python wsgi.py                                   (waitress, multiplataforma, varios hilos)
+#   gunicorn -w 4 -b 0.0.0.0:8000 wsgi:app           (Linux, varios procesos)
+#
+# Host, puerto y directorio de datos se toman de HERRAMIENTA_HOST, HERRAMIENTA_PORT y
+# HERRAMIENTA_DIRECTORIO_DATOS. Los workers comparten el directorio de datos: el almacén de
+# escenarios, la caché de resultados y el estado de los trabajos en segundo plano.
+# Las métricas de /metrics, en cambio, son de cada worker: una respuesta solo incluye las series
+# del worker que la atendió, con la etiqueta worker="<host>:<pid>". Para obtener totales, sirva
+# cada worker en su propio puerto, recójalos todos y súmelos con sum without (worker) (...).
+import os
+from app import crear_app
+
+app = crear_app()
+
+if __name__ == '__main__':
+    from waitress import serve
+    serve(app, host=app.config['HOST'], port=int(app.config['PORT']),
+          threads=int(os.environ.get('HERRAMIENTA_HILOS', 8)))